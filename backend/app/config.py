@@ -9,6 +9,11 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a connection before giving up
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout to drop stale ones
     
     # API Keys
     OPENAI_API_KEY: Optional[str] = None
@@ -21,7 +26,83 @@ class Settings(BaseSettings):
     FROM_EMAIL: EmailStr = "noreply@example.com"
     FROM_NAME: str = "Insurance Specialist"
     CONTACT_PHONE: str = "(555) 123-4567"
-    
+
+    # Batch send settings
+    BATCH_SEND_WORKERS: int = 10
+    GROQ_REQUESTS_PER_MINUTE: int = 30  # Per model, unless listed below
+    GROQ_MODEL_REQUESTS_PER_MINUTE: Dict[str, int] = {}  # Per-model overrides, e.g. {"llama3-8b-8192": 30}
+    SENDGRID_SENDS_PER_SECOND: int = 10
+
+    # Batch preview settings
+    BATCH_PREVIEW_CONCURRENCY: int = 10  # Drafts generated at once by /emails/generate-batch
+    BATCH_PREVIEW_MAX_PROSPECTS: int = 1000
+
+    # SendGrid transport settings
+    SENDGRID_API_URL: str = "https://api.sendgrid.com"  # Point at benchmarks.mock_sendgrid locally
+    SENDGRID_MAX_CONNECTIONS: int = 20
+    SENDGRID_TIMEOUT_SECONDS: float = 30.0
+    SENDGRID_MAX_RETRIES: int = 4  # Retries on 429, 5xx and connection errors
+    SENDGRID_RETRY_BACKOFF_SECONDS: float = 0.5  # Doubles on every retry
+    SENDGRID_PERSONALIZATIONS_PER_REQUEST: int = 100  # SendGrid allows up to 1000
+    SENDGRID_BATCH_LINGER_SECONDS: float = 0.5  # How long a batch send waits to fill a request
+
+    # Prospect import settings
+    IMPORT_CHUNK_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 100  # Per-row errors returned from a CSV import
+
+    # Job worker settings
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0
+    JOB_STALE_AFTER_SECONDS: int = 300
+    JOB_HEARTBEAT_INTERVAL_SECONDS: float = 30.0  # Well under JOB_STALE_AFTER_SECONDS
+    JOB_MAX_POLL_BACKOFF_SECONDS: float = 60.0  # Longest wait after repeated queue errors
+    WORKER_METRICS_PORT: Optional[int] = None  # Serve the worker's Prometheus metrics on this port
+
+    # Industry classification
+    INDUSTRY_TAXONOMY_PATH: Optional[str] = None  # JSON {category: [patterns]} replacing the built-in taxonomy
+    INDUSTRY_CLASSIFIER_CACHE_SIZE: int = 100000  # Distinct industry strings memoized
+
+    # LLM routing: "<provider>:<model>" per task, where provider is groq or local
+    LLM_EMAIL_MODEL: str = "groq:llama3-70b-8192"
+    LLM_ADVICE_MODEL: str = "groq:llama3-8b-8192"  # Short advice doesn't need the large model
+    LLM_CALL_SCRIPT_MODEL: str = "groq:llama3-70b-8192"
+    LLM_LOCAL_LATENCY_MS: float = 500.0  # Simulated response time of the local provider
+
+    # Ask providers for JSON-constrained output where they support it
+    LLM_JSON_MODE: bool = True
+
+    # Generate the email and rep advice in one model call instead of two
+    LLM_COMBINED_GENERATION: bool = True
+
+    # LLM response cache settings
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_SQL_ENABLED: bool = False
+    LLM_CACHE_SQL_MAX_ENTRIES: int = 100000
+
+    # LLM usage accounting settings
+    LLM_CAMPAIGN_TOKEN_BUDGET: Optional[int] = None  # Default token budget of a send-batch job, None for unlimited
+    LLM_USAGE_FLUSH_SIZE: int = 500  # Usage rows written per insert
+    LLM_USAGE_FLUSH_SECONDS: float = 2.0  # How long usage rows wait to be written
+    # USD per million input and output tokens, per "<provider>:<model>"
+    LLM_TOKEN_PRICES: Dict[str, Dict[str, float]] = {
+        "groq:llama3-70b-8192": {"input": 0.59, "output": 0.79},
+        "groq:llama3-8b-8192": {"input": 0.05, "output": 0.08},
+    }
+
+    # SendGrid event webhook settings
+    WEBHOOK_DEDUPE_RETENTION_HOURS: int = 72  # SendGrid retries failed deliveries for up to 72 hours
+
+    # Engagement event rollup settings
+    ENGAGEMENT_ROLLUP_BATCH_SIZE: int = 5000  # Events folded into scores per transaction
+    ENGAGEMENT_ROLLUP_INTERVAL_SECONDS: float = 10.0  # How often each worker rolls up pending events
+
+    # Tracing settings
+    TRACING_EXPORTER: str = "none"  # none, console, otlp (configured by OTEL_EXPORTER_OTLP_*) or memory
+    TRACING_SAMPLE_RATIO: float = 0.1  # Share of traces recorded
+    TRACING_SERVICE_NAME: str = "xi-outreach"
+    TRACING_MEMORY_MAX_SPANS: int = 10000  # Finished spans kept by the memory exporter
+
     # CORS settings
     CORS_ORIGINS: Union[List[str], str] = ["http://localhost:3000"]
     
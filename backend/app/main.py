@@ -1,18 +1,29 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.routers import prospects, emails, calls
+from app.routers import prospects, emails, calls, jobs, metrics, stats
 from app.database import engine
-from app.models import prospect, engagement
+from app.metrics import label_route
+from app.tracing import setup_tracing
+from app.services.llm_cache import llm_cache as response_cache
+from app.services.container import services
 
-# Create database tables
-prospect.Base.metadata.create_all(bind=engine)
-engagement.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The schema is managed by migrations (alembic upgrade head), not at startup
+    app.state.services = services
+    yield
+    await services.aclose()
+    await engine.dispose()
 
 app = FastAPI(
     title="XI Outreach API",
     description="API for AI-driven cold email personalization for insurance companies",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
+    # Label metrics with the route that produced them
+    dependencies=[Depends(label_route)]
 )
 
 # Configure CORS
@@ -23,12 +34,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
+# Trace requests, database statements and outbound HTTP calls when enabled
+setup_tracing(app, engine)
+
 # Include routers
 app.include_router(prospects.router)
 app.include_router(emails.router)
 app.include_router(calls.router)
+app.include_router(jobs.router)
+app.include_router(metrics.router)
+app.include_router(stats.router)
 
 @app.get("/")
 async def root():
@@ -37,3 +55,10 @@ async def root():
         "documentation": "/docs",
         "redoc": "/redoc"
     }
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """
+    Hit/miss counters and size of the LLM response cache.
+    """
+    return response_cache.stats()
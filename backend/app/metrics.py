@@ -0,0 +1,118 @@
+"""
+Prometheus metrics for the outreach pipeline.
+
+Stage timings and counters are labelled with the route that triggered them
+and the prospect's industry category. Both labels live in context variables:
+the route is set once per request by the label_route dependency (or by the worker for
+background jobs) and the industry wherever a prospect is picked up, so code
+deep in the services can record metrics without threading labels through.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterable, Optional
+from prometheus_client import Counter, Histogram
+from starlette.requests import Request
+from app.services.industry_classifier import industry_classifier
+
+
+route_label: ContextVar[str] = ContextVar("route_label", default="none")
+industry_label: ContextVar[str] = ContextVar("industry_label", default="unknown")
+
+# Pipeline stages run from milliseconds (database) to tens of seconds (LLM calls)
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+STAGE_SECONDS = Histogram(
+    "outreach_stage_seconds",
+    "Time spent in each stage of the outreach pipeline",
+    ["stage", "route", "industry"],
+    buckets=STAGE_BUCKETS
+)
+
+FALLBACKS = Counter(
+    "outreach_fallbacks_total",
+    "Generations that fell back to a template",
+    ["kind", "route", "industry"]
+)
+
+LLM_CACHE_LOOKUPS = Counter(
+    "outreach_llm_cache_lookups_total",
+    "LLM response cache lookups by result",
+    ["result", "route", "industry"]
+)
+
+PROVIDER_ERRORS = Counter(
+    "outreach_provider_errors_total",
+    "Failed calls to external providers",
+    ["provider", "route", "industry"]
+)
+
+LLM_TOKENS = Counter(
+    "outreach_llm_tokens_total",
+    "Tokens sent to and received from LLM providers",
+    ["model", "direction", "route", "industry"]
+)
+
+
+def set_route(route: str) -> None:
+    route_label.set(route)
+
+
+def set_industry(industry: Optional[str]) -> None:
+    """
+    Label metrics recorded from here on in the current task with the
+    industry's category, which keeps the label's cardinality bounded.
+    """
+    industry_label.set(industry_classifier.classify(industry))
+
+
+def industry_of(industries: Iterable[Optional[str]]) -> str:
+    """
+    The shared category of several prospects' industries, or "mixed".
+    """
+    categories = set(industry_classifier.classify_many(industries))
+    return categories.pop() if len(categories) == 1 else "mixed"
+
+
+@contextmanager
+def stage(name: str, industry: Optional[str] = None):
+    """
+    Time the enclosed block as a pipeline stage, including when it raises.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.labels(name, route_label.get(), industry or industry_label.get()).observe(
+            time.perf_counter() - started
+        )
+
+
+def count_fallback(kind: str) -> None:
+    FALLBACKS.labels(kind, route_label.get(), industry_label.get()).inc()
+
+
+def count_cache_lookup(hit: bool) -> None:
+    LLM_CACHE_LOOKUPS.labels("hit" if hit else "miss", route_label.get(), industry_label.get()).inc()
+
+
+def count_provider_error(provider: str, industry: Optional[str] = None) -> None:
+    PROVIDER_ERRORS.labels(provider, route_label.get(), industry or industry_label.get()).inc()
+
+
+def count_llm_tokens(model_id: str, input_tokens: int, output_tokens: int) -> None:
+    if input_tokens:
+        LLM_TOKENS.labels(model_id, "input", route_label.get(), industry_label.get()).inc(input_tokens)
+    if output_tokens:
+        LLM_TOKENS.labels(model_id, "output", route_label.get(), industry_label.get()).inc(output_tokens)
+
+
+async def label_route(request: Request) -> None:
+    """
+    App-wide dependency that sets the route label to the matched route's path
+    template, e.g. /emails/generate or /prospects/{prospect_id}, so ids don't
+    end up in labels. It runs after routing has put the route in the scope, in
+    the same context as the endpoint.
+    """
+    path = getattr(request.scope.get("route"), "path", None)
+    set_route(f"{request.method} {path}" if path else "unmatched")
@@ -1,2 +1,8 @@
 from app.models.prospect import Prospect
 from app.models.engagement import Engagement
+from app.models.engagement_summary import EngagementSummary
+from app.models.job import Job, JobItem
+from app.models.llm_cache import LLMCacheEntry
+from app.models.webhook_event import ProcessedWebhookEvent
+from app.models.engagement_event import EngagementEvent
+from app.models.llm_usage import LLMUsage
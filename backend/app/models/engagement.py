@@ -19,6 +19,7 @@ class Engagement(Base):
     responded = Column(Boolean, default=False)
     engagement_score = Column(Float, default=0.0)  # Calculated engagement level
     notes = Column(Text, nullable=True)  # Additional notes or feedback
+    message_id = Column(String(100), nullable=True, index=True)  # SendGrid X-Message-Id, for webhook events
     
     # Relationship with prospect
     prospect = relationship("Prospect", back_populates="engagements")
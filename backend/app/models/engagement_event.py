@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, ForeignKey, Text, Index
+from datetime import datetime
+from app.database import Base
+
+
+class EngagementEvent(Base):
+    """
+    Append-only log of what happened to an engagement (opens, clicks, replies,
+    call outcomes). Rows are never updated except to mark them rolled up into
+    the engagement and prospect scores.
+    """
+    __tablename__ = "engagement_events"
+    __table_args__ = (
+        # Rollup scans for events that are not folded in yet, oldest first
+        Index("ix_engagement_events_pending", "rolled_up_at", "id"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    engagement_id = Column(Integer, ForeignKey("engagements.id"), index=True)
+    prospect_id = Column(Integer, ForeignKey("prospects.id", ondelete="CASCADE"), index=True)
+    event_type = Column(String(20))  # open, click, reply, connected, interested
+    score_delta = Column(Float, default=0.0)  # Score this event adds to its engagement
+    occurred_at = Column(DateTime, default=datetime.utcnow)
+    note = Column(Text, nullable=True)  # Free text, e.g. call outcome notes
+    rolled_up_at = Column(DateTime, nullable=True)
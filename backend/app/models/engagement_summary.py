@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, DateTime, Float, ForeignKey
+from datetime import datetime
+from app.database import Base
+
+
+class EngagementSummary(Base):
+    """
+    Per-prospect rollup of the engagements table, maintained incrementally
+    whenever an engagement is recorded or tracked.
+    """
+    __tablename__ = "engagement_summaries"
+
+    prospect_id = Column(Integer, ForeignKey("prospects.id", ondelete="CASCADE"), primary_key=True)
+    total_count = Column(Integer, default=0)
+    email_count = Column(Integer, default=0)
+    call_count = Column(Integer, default=0)
+    opened_count = Column(Integer, default=0)  # Engagements that were opened
+    clicked_count = Column(Integer, default=0)  # Engagements that were clicked
+    responded_count = Column(Integer, default=0)  # Engagements that got a response
+    total_score = Column(Float, default=0.0)  # Sum of engagement scores
+    last_engagement_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy.orm import relationship
+from datetime import datetime
+from app.database import Base
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    type = Column(String(50), index=True)  # send_batch, etc.
+    status = Column(String(20), default="pending", index=True)  # pending, running, completed, failed
+    total = Column(Integer, default=0)
+    processed = Column(Integer, default=0)
+    failed = Column(Integer, default=0)
+    worker_id = Column(String(100), nullable=True)  # Worker currently holding the job
+    heartbeat_at = Column(DateTime, nullable=True)  # Last sign of life from that worker
+    error = Column(Text, nullable=True)
+    token_budget = Column(Integer, nullable=True)  # LLM tokens the job may spend before it stops generating
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+
+    # Relationship with job items
+    items = relationship("JobItem", back_populates="job")
+
+
+class JobItem(Base):
+    __tablename__ = "job_items"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("jobs.id"), index=True)
+    prospect_id = Column(Integer, ForeignKey("prospects.id", ondelete="SET NULL"), nullable=True)  # Kept as history if the prospect is deleted
+    status = Column(String(20), default="pending", index=True)  # pending, sent, failed
+    engagement_id = Column(Integer, ForeignKey("engagements.id"), nullable=True)
+    error = Column(Text, nullable=True)
+    processed_at = Column(DateTime, nullable=True)
+
+    # Relationship with job
+    job = relationship("Job", back_populates="items")
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, String, DateTime, Text
+from datetime import datetime
+from app.database import Base
+
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache_entries"
+
+    key = Column(String(64), primary_key=True)  # sha256 of model, system message and prompt
+    model = Column(String(100))
+    response = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    expires_at = Column(DateTime, index=True)
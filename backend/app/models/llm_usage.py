@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Float, Boolean
+from datetime import datetime
+from app.database import Base
+
+
+class LLMUsage(Base):
+    """
+    One row per LLM request, including ones served from the response cache,
+    with the tokens and time it took. Aggregated by model, campaign,
+    industry and prospect for /stats/llm and campaign token budgets.
+    """
+    __tablename__ = "llm_usage"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    task = Column(String(20))  # email, advice, call_script
+    model_id = Column(String(100), index=True)  # "<provider>:<model>"
+    # Not a foreign key: usage stays on record after its prospect is deleted
+    prospect_id = Column(Integer, nullable=True, index=True)
+    campaign = Column(String(100), nullable=True, index=True)  # e.g. "job:42"
+    industry = Column(String(50), nullable=True)  # Industry category of the prospect
+    input_tokens = Column(Integer, default=0)
+    output_tokens = Column(Integer, default=0)
+    latency_ms = Column(Float, default=0.0)
+    cached = Column(Boolean, default=False)  # Served from the response cache, no tokens spent
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
 # from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -21,3 +21,9 @@ class Prospect(Base):
     
     # Relationship with engagements
     engagements = relationship("Engagement", back_populates="prospect")
+    
+    # Serves industry-filtered pages walked in id order. Pattern ops let Postgres
+    # use it for prefix LIKE under any collation, not just C
+    __table_args__ = (
+        Index("ix_prospects_industry_id", "industry", "id", postgresql_ops={"industry": "varchar_pattern_ops"}),
+    )
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime
+from datetime import datetime
+from app.database import Base
+
+
+class ProcessedWebhookEvent(Base):
+    """
+    Ids of SendGrid webhook events that were already applied, so that
+    redelivered events are ignored.
+    """
+    __tablename__ = "processed_webhook_events"
+
+    sg_event_id = Column(String(100), primary_key=True)
+    event = Column(String(50))
+    received_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,23 @@
+"""
+Rebuild the per-prospect engagement summaries from the engagements table.
+
+Summaries are kept up to date as engagements are written, so this is only
+needed to backfill existing data or to repair drift:
+
+    python -m app.rebuild_summaries
+"""
+import asyncio
+from app.database import SessionLocal, engine
+from app.services.engagement_summary_service import EngagementSummaryService
+
+
+async def main():
+    async with SessionLocal() as db:
+        count = await EngagementSummaryService().rebuild(db)
+
+    print(f"Rebuilt engagement summaries for {count} prospects")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import List, Dict
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.prospect import Prospect
 from app.models.engagement import Engagement
-from app.services.call_service import CallService
+from app.services.container import services
+from app.services.streaming import format_sse
 
 router = APIRouter(
     prefix="/calls",
@@ -13,29 +16,29 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-call_service = CallService()
 
 @router.post("/generate-script", response_model=Dict)
-async def generate_call_script(prospect_id: int, db: Session = Depends(get_db)):
+async def generate_call_script(prospect_id: int, bypass_cache: bool = False, db: AsyncSession = Depends(get_db)):
     """
     Generate a personalized call script for a prospect without making a call.
+    Set bypass_cache to force a fresh generation instead of a cached script.
     """
     try:
         # Get the prospect
-        prospect = db.query(Prospect).filter(Prospect.id == prospect_id).first()
+        prospect = await db.scalar(select(Prospect).where(Prospect.id == prospect_id))
         if not prospect:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Prospect with ID {prospect_id} not found"
             )
         
-        # Get engagement history
-        engagement_history = db.query(Engagement).filter(
-            Engagement.prospect_id == prospect_id
-        ).order_by(Engagement.sent_at.desc()).all()
+        # Get engagement summary
+        engagement_summary = await services.summary_service.get(db, prospect_id)
         
         # Generate call script
-        script_content = await call_service.generate_call_script(prospect, engagement_history)
+        script_content = await services.call_service.generate_call_script(
+            prospect, engagement_summary, bypass_cache=bypass_cache
+        )
         
         return {
             "prospect_id": prospect_id,
@@ -55,14 +58,57 @@ async def generate_call_script(prospect_id: int, db: Session = Depends(get_db)):
             detail=f"Failed to generate call script: {str(e)}"
         )
 
+@router.get("/generate-script/stream")
+async def stream_call_script(prospect_id: int, bypass_cache: bool = False, db: AsyncSession = Depends(get_db)):
+    """
+    Stream a personalized call script for a prospect as Server-Sent Events.
+    
+    Emits script events carrying text deltas as the model writes them, then a
+    done event with the same payload as /calls/generate-script.
+    """
+    prospect = await db.scalar(select(Prospect).where(Prospect.id == prospect_id))
+    if not prospect:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Prospect with ID {prospect_id} not found"
+        )
+    
+    engagement_summary = await services.summary_service.get(db, prospect_id)
+    
+    async def events():
+        try:
+            async for event, data in services.call_service.stream_call_script(
+                prospect, engagement_summary, bypass_cache=bypass_cache
+            ):
+                if event != "done":
+                    yield format_sse(event, {"delta": data})
+                    continue
+                
+                yield format_sse("done", {
+                    "prospect_id": prospect_id,
+                    "company_name": prospect.company_name,
+                    "industry": prospect.industry,
+                    "script_title": data["title"],
+                    "script_content": data["script"]
+                })
+        except Exception as e:
+            print(f"Error streaming call script: {e}")
+            yield format_sse("error", {"detail": f"Failed to generate call script: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/make-call", response_model=Dict)
-async def make_call(prospect_id: int, db: Session = Depends(get_db)):
+async def make_call(prospect_id: int, db: AsyncSession = Depends(get_db)):
     """
     Generate a script and initiate a call to a prospect.
     """
     try:
         # Get the prospect
-        prospect = db.query(Prospect).filter(Prospect.id == prospect_id).first()
+        prospect = await db.scalar(select(Prospect).where(Prospect.id == prospect_id))
         if not prospect:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -75,16 +121,14 @@ async def make_call(prospect_id: int, db: Session = Depends(get_db)):
                 detail=f"No phone number available for prospect {prospect.company_name}"
             )
         
-        # Get engagement history
-        engagement_history = db.query(Engagement).filter(
-            Engagement.prospect_id == prospect_id
-        ).order_by(Engagement.sent_at.desc()).all()
+        # Get engagement summary
+        engagement_summary = await services.summary_service.get(db, prospect_id)
         
         # Generate call script
-        script_content = await call_service.generate_call_script(prospect, engagement_history)
+        script_content = await services.call_service.generate_call_script(prospect, engagement_summary)
         
         # Make the call
-        engagement = await call_service.make_call(db, prospect, script_content)
+        engagement = await services.call_service.make_call(db, prospect, script_content)
         
         return {
             "prospect_id": prospect_id,
@@ -107,11 +151,11 @@ async def make_call(prospect_id: int, db: Session = Depends(get_db)):
         )
 
 @router.post("/update-outcome", response_model=Dict)
-async def update_call_outcome(engagement_id: int, outcome: Dict, db: Session = Depends(get_db)):
+async def update_call_outcome(engagement_id: int, outcome: Dict, db: AsyncSession = Depends(get_db)):
     """
     Update the outcome of a call after it's completed.
     """
-    engagement = db.query(Engagement).filter(Engagement.id == engagement_id).first()
+    engagement = await db.scalar(select(Engagement).where(Engagement.id == engagement_id))
     if not engagement or engagement.type != "call":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -119,15 +163,16 @@ async def update_call_outcome(engagement_id: int, outcome: Dict, db: Session = D
         )
     
     try:
-        await call_service.update_call_outcome(db, engagement_id, outcome)
+        await services.call_service.update_call_outcome(db, engagement_id, outcome)
+        await db.refresh(engagement)
         
-        # Refresh the engagement to get updated data
-        db.refresh(engagement)
+        # Include outcome events the rollup has not folded in yet
+        pending_score = await services.event_service.pending_score(db, engagement_id)
         
         return {
             "engagement_id": engagement_id,
             "status": "updated",
-            "engagement_score": engagement.engagement_score,
+            "engagement_score": (engagement.engagement_score or 0.0) + pending_score,
             "notes": engagement.notes
         }
     except Exception as e:
@@ -1,12 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from typing import List, Dict
-from sqlalchemy.orm import Session
+import json
+import uuid
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
 from app.models.prospect import Prospect
 from app.models.engagement import Engagement
-from app.schemas.email import EmailRequest, EmailResponse, EmailBulkRequest
-from app.services.workflow_service import WorkflowService
+from app.schemas.email import EmailRequest, EmailResponse, EmailBulkRequest, EmailBatchPreviewRequest
+from app.services.container import services
+from app.services.llm_usage import TokenBudgetExceeded, llm_usage
+from app.services.streaming import format_sse
 
 router = APIRouter(
     prefix="/emails",
@@ -14,15 +21,18 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-workflow_service = WorkflowService()
+# Missing prospect ids listed in a send-batch 404
+MAX_REPORTED_MISSING_IDS = 20
+
 
 @router.post("/generate", response_model=Dict)
-async def generate_email(prospect_id: int, db: Session = Depends(get_db)):
+async def generate_email(prospect_id: int, bypass_cache: bool = False, db: AsyncSession = Depends(get_db)):
     """
     Generate a personalized email for a prospect without sending it.
+    Set bypass_cache to force a fresh generation instead of a cached draft.
     """
     try:
-        result = await workflow_service.process_prospect(db, prospect_id)
+        result = await services.workflow_service.process_prospect(db, prospect_id, bypass_cache=bypass_cache)
         
         return {
             "prospect_id": prospect_id,
@@ -43,13 +53,118 @@ async def generate_email(prospect_id: int, db: Session = Depends(get_db)):
             detail=f"Failed to generate email: {str(e)}"
         )
 
+@router.post("/generate-batch")
+async def generate_email_batch(request: EmailBatchPreviewRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Generate draft emails for several prospects without sending them.
+    
+    Drafts are streamed back as newline-delimited JSON in the order they
+    finish, with a bounded number generated at once. Prospects that don't
+    exist get a not_found line.
+    
+    LLM usage is recorded under campaign when one is named, and generation
+    stops with budget_exceeded lines once it spends token_budget tokens.
+    """
+    if len(request.prospect_ids) > settings.BATCH_PREVIEW_MAX_PROSPECTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.BATCH_PREVIEW_MAX_PROSPECTS} prospects can be previewed at once"
+        )
+    
+    loaded = await services.workflow_service.load_prospects(db, request.prospect_ids)
+    missing = sorted(set(request.prospect_ids) - loaded.keys())
+    
+    campaign = None
+    if request.campaign:
+        campaign = await llm_usage.load_campaign(
+            db,
+            request.campaign,
+            request.token_budget if request.token_budget is not None else settings.LLM_CAMPAIGN_TOKEN_BUDGET
+        )
+    elif request.token_budget is not None:
+        campaign = await llm_usage.load_campaign(db, f"preview:{uuid.uuid4().hex[:12]}", request.token_budget)
+    
+    # Generation doesn't need the database, so give the connection back before it starts
+    await db.close()
+    
+    async def result_lines():
+        # Set here so the generation tasks inherit it
+        llm_usage.set_campaign(campaign)
+        
+        for prospect_id in missing:
+            yield json.dumps({"prospect_id": prospect_id, "status": "not_found"}) + "\n"
+        
+        async for prospect_id, result in services.workflow_service.generate_many(
+            loaded, bypass_cache=request.bypass_cache
+        ):
+            if isinstance(result, TokenBudgetExceeded):
+                line = {"prospect_id": prospect_id, "status": "budget_exceeded", "error": str(result)}
+            elif isinstance(result, Exception):
+                line = {"prospect_id": prospect_id, "status": "failed", "error": str(result)}
+            else:
+                line = {
+                    "prospect_id": prospect_id,
+                    "status": "generated",
+                    "company_name": result["prospect"].company_name,
+                    "industry": result["prospect"].industry,
+                    "email_subject": result["email_content"]["subject"],
+                    "email_body": result["email_content"]["body"],
+                    "engagement_advice": result["engagement_advice"]
+                }
+            yield json.dumps(line) + "\n"
+    
+    return StreamingResponse(result_lines(), media_type="application/x-ndjson")
+
+@router.get("/generate/stream")
+async def stream_email(prospect_id: int, bypass_cache: bool = False, db: AsyncSession = Depends(get_db)):
+    """
+    Stream a personalized email for a prospect as Server-Sent Events.
+    
+    Emits subject, body and advice events carrying text deltas as the model
+    writes them, then a done event with the same payload as /emails/generate.
+    """
+    try:
+        prospect, engagement_summary = await services.workflow_service.load_prospect(db, prospect_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    
+    async def events():
+        try:
+            async for event, data in services.ai_service.stream_email(
+                prospect, engagement_summary, bypass_cache=bypass_cache
+            ):
+                if event != "done":
+                    yield format_sse(event, {"delta": data})
+                    continue
+                
+                yield format_sse("done", {
+                    "prospect_id": prospect_id,
+                    "company_name": prospect.company_name,
+                    "industry": prospect.industry,
+                    "email_subject": data["email_content"]["subject"],
+                    "email_body": data["email_content"]["body"],
+                    "engagement_advice": data["engagement_advice"]
+                })
+        except Exception as e:
+            print(f"Error streaming email: {e}")
+            yield format_sse("error", {"detail": f"Failed to generate email: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/send", response_model=Dict)
-async def send_email(prospect_id: int, db: Session = Depends(get_db)):
+async def send_email(prospect_id: int, db: AsyncSession = Depends(get_db)):
     """
     Generate and send a personalized email to a prospect.
     """
     try:
-        result = await workflow_service.send_personalized_email(db, prospect_id)
+        result = await services.workflow_service.send_personalized_email(db, prospect_id)
         
         return {
             "prospect_id": prospect_id,
@@ -73,41 +188,40 @@ async def send_email(prospect_id: int, db: Session = Depends(get_db)):
         )
 
 @router.post("/send-batch", response_model=List[Dict])
-async def send_batch_emails(request: EmailBulkRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
-    """
-    Generate and send personalized emails to multiple prospects as a background task.
-    """
-    # Validate that prospects exist
-    for prospect_id in request.prospect_ids:
-        prospect = db.query(Prospect).filter(Prospect.id == prospect_id).first()
-        if not prospect:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Prospect with ID {prospect_id} not found"
-            )
-    
-    # Add the task to background tasks
-    background_tasks.add_task(
-        workflow_service.send_batch_emails,
-        db,
-        request.prospect_ids
-    )
+async def send_batch_emails(request: EmailBulkRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Queue personalized emails to multiple prospects as a background job.
+    Progress is available from /jobs/{job_id} once a worker picks it up.
+    """
+    # Validate that prospects exist, in one query rather than one per id
+    _, missing = await services.workflow_service.check_prospects(db, request.prospect_ids)
+    if missing:
+        missing = sorted(missing)
+        shown = ", ".join(str(prospect_id) for prospect_id in missing[:MAX_REPORTED_MISSING_IDS])
+        more = f" and {len(missing) - MAX_REPORTED_MISSING_IDS} more" if len(missing) > MAX_REPORTED_MISSING_IDS else ""
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Prospects with IDs {shown}{more} not found"
+        )
     
-    return [{"prospect_id": pid, "status": "processing"} for pid in request.prospect_ids]
+    # Persist the job so it survives restarts and can be claimed by any worker
+    job = await services.job_service.enqueue_batch_send(db, request.prospect_ids, token_budget=request.token_budget)
+    
+    return [{"prospect_id": pid, "status": "processing", "job_id": job.id} for pid in request.prospect_ids]
 
 @router.get("/engagement/{engagement_id}", response_model=Dict)
-async def get_email_engagement(engagement_id: int, db: Session = Depends(get_db)):
+async def get_email_engagement(engagement_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get the engagement data for a specific email.
     """
-    engagement = db.query(Engagement).filter(Engagement.id == engagement_id).first()
+    engagement = await db.scalar(select(Engagement).where(Engagement.id == engagement_id))
     if not engagement or engagement.type != "email":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Email engagement with ID {engagement_id} not found"
         )
     
-    prospect = db.query(Prospect).filter(Prospect.id == engagement.prospect_id).first()
+    prospect = await db.scalar(select(Prospect).where(Prospect.id == engagement.prospect_id))
     
     return {
         "engagement_id": engagement.id,
@@ -122,11 +236,11 @@ async def get_email_engagement(engagement_id: int, db: Session = Depends(get_db)
     }
 
 @router.post("/engagement/{engagement_id}/track", response_model=Dict)
-async def track_email_engagement(engagement_id: int, event_type: str, db: Session = Depends(get_db)):
+async def track_email_engagement(engagement_id: int, event_type: str, db: AsyncSession = Depends(get_db)):
     """
     Track email engagement events (open, click, reply).
     """
-    engagement = db.query(Engagement).filter(Engagement.id == engagement_id).first()
+    engagement = await db.scalar(select(Engagement).where(Engagement.id == engagement_id))
     if not engagement or engagement.type != "email":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -139,22 +253,42 @@ async def track_email_engagement(engagement_id: int, event_type: str, db: Sessio
             detail=f"Invalid event type: {event_type}. Must be 'open', 'click', or 'reply'"
         )
     
-    # Update the engagement
-    if event_type == "open":
-        engagement.opened = True
-        engagement.engagement_score += 1.0
-    elif event_type == "click":
-        engagement.clicked = True
-        engagement.engagement_score += 2.0
-    elif event_type == "reply":
-        engagement.responded = True
-        engagement.engagement_score += 5.0
+    # Append the event; the rollup stage folds it into the scores
+    await services.event_service.record(db, engagement, event_type)
+    
+    await db.commit()
     
-    db.commit()
+    pending_score = await services.event_service.pending_score(db, engagement.id)
     
     return {
         "engagement_id": engagement.id,
         "event_type": event_type,
         "status": "success",
-        "engagement_score": engagement.engagement_score
+        "engagement_score": (engagement.engagement_score or 0.0) + pending_score
     }
+
+@router.post("/webhook/sendgrid", response_model=Dict)
+async def sendgrid_event_webhook(request: Request, db: AsyncSession = Depends(get_db)):
+    """
+    Receive a batch of events from the SendGrid Event Webhook.
+    
+    Open and click events are matched to email engagements by message id and
+    prospect_id custom arg (or the engagement_id custom arg of older sends) and
+    recorded once per sg_event_id, so SendGrid's redeliveries are safe. Other
+    event types are ignored.
+    """
+    try:
+        events = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Webhook body must be a JSON array of events"
+        )
+    
+    if not isinstance(events, list):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Webhook body must be a JSON array of events"
+        )
+    
+    return await services.ingestion_service.ingest(db, events)
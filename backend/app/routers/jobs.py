@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.job import Job, JobItem
+from app.schemas.job import JobResponse, JobResultsResponse
+
+router = APIRouter(
+    prefix="/jobs",
+    tags=["jobs"],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Get the status and progress of a background job.
+    """
+    job = await db.scalar(select(Job).where(Job.id == job_id))
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+
+    return job
+
+@router.get("/{job_id}/results", response_model=JobResultsResponse)
+async def get_job_results(job_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Get the per-prospect results of a background job.
+    """
+    job = await db.scalar(select(Job).where(Job.id == job_id))
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+
+    items = (await db.scalars(
+        select(JobItem).where(JobItem.job_id == job_id).order_by(JobItem.id)
+    )).all()
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "results": items
+    }
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Response, status
+from typing import Dict, List
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app import tracing
+from app.database import get_pool_stats
+from app.services.prompt_templates import prompt_template_stats
+from app.services.structured_output import structured_output
+
+router = APIRouter(
+    prefix="/metrics",
+    tags=["metrics"],
+)
+
+@router.get("")
+async def prometheus_metrics():
+    """
+    Pipeline stage latencies and fallback, cache and provider error counters
+    in the Prometheus text format.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+@router.get("/db-pool", response_model=Dict)
+async def db_pool_metrics():
+    """
+    Database connection pool usage and checkout latency.
+    """
+    return get_pool_stats()
+
+@router.get("/structured-output", response_model=Dict)
+async def structured_output_metrics():
+    """
+    How often model replies failed to parse, per output schema, and how many
+    of those were recovered by the repair retry rather than falling back.
+    """
+    return structured_output.stats()
+
+@router.get("/prompts", response_model=Dict)
+async def prompt_metrics():
+    """
+    Estimated input tokens per prompt template, split into the static system
+    message shared by every request and the rendered per-prospect part.
+    """
+    return prompt_template_stats()
+
+@router.get("/traces", response_model=List[Dict])
+async def recent_traces(limit: int = 20):
+    """
+    The most recent sampled traces with per-span timings. Only available
+    when TRACING_EXPORTER is "memory".
+    """
+    if tracing.memory_exporter is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Traces are only kept in memory when TRACING_EXPORTER is memory"
+        )
+    return tracing.memory_exporter.traces(limit)
@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from sqlalchemy.orm import Session
-import csv
-from io import StringIO
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from typing import List, Literal, Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import json
 
-from app.database import get_db
+from app.database import get_db, SessionLocal
 from app.models.prospect import Prospect
-from app.schemas.prospect import ProspectCreate, ProspectResponse, ProspectUpdate, ProspectImport
-from app.services.workflow_service import WorkflowService
+from app.schemas.prospect import ProspectCreate, ProspectResponse, ProspectUpdate, ProspectImport, ProspectImportResult, ProspectListItem
+from app.services.container import services
+from app.services.import_service import copy_to_temp_file
+from app.services.industry_classifier import DEFAULT_CATEGORY, industry_classifier
 
 router = APIRouter(
     prefix="/prospects",
@@ -15,15 +19,16 @@ router = APIRouter(
     responses={404: {"description": "Not found"}},
 )
 
-workflow_service = WorkflowService()
+# Columns that can be requested through the fields parameter of GET /prospects
+PROSPECT_LIST_FIELDS = set(ProspectListItem.model_fields)
 
 @router.post("/", response_model=ProspectResponse, status_code=status.HTTP_201_CREATED)
-async def create_prospect(prospect_data: ProspectCreate, db: Session = Depends(get_db)):
+async def create_prospect(prospect_data: ProspectCreate, db: AsyncSession = Depends(get_db)):
     """
     Create a new prospect.
     """
     # Check if prospect exists
-    existing_prospect = db.query(Prospect).filter(Prospect.company_name == prospect_data.company_name).first()
+    existing_prospect = await db.scalar(select(Prospect).where(Prospect.company_name == prospect_data.company_name))
     if existing_prospect:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -33,35 +38,99 @@ async def create_prospect(prospect_data: ProspectCreate, db: Session = Depends(g
     # Create new prospect
     prospect = Prospect(**prospect_data.dict())
     db.add(prospect)
-    db.commit()
-    db.refresh(prospect)
+    await db.commit()
+    await db.refresh(prospect)
     
     return prospect
 
-@router.get("/", response_model=List[ProspectResponse])
+@router.get("/", response_model=List[ProspectListItem], response_model_exclude_unset=True)
 async def get_prospects(
+    response: Response,
     skip: int = 0, 
-    limit: int = 100, 
+    limit: int = Query(100, ge=1, le=1000), 
+    after_id: Optional[int] = None,
     industry: str = None,
-    db: Session = Depends(get_db)
+    industry_match: Literal["prefix", "exact"] = "prefix",
+    fields: Optional[str] = None,
+    include_total: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Retrieve a list of prospects with optional filtering by industry.
-    """
-    query = db.query(Prospect)
+    Retrieve a list of prospects ordered by ID with optional filtering by industry.
     
+    Pass the X-Next-Cursor response header back as after_id to fetch the next
+    page; unlike skip, this costs the same at any depth. The industry filter
+    matches exactly or by prefix so it can use the industry index. fields takes
+    a comma-separated list of columns to return, and include_total adds an
+    X-Total-Count header.
+    """
+    filters = []
     if industry:
-        query = query.filter(Prospect.industry.ilike(f"%{industry}%"))
+        if industry_match == "exact":
+            filters.append(Prospect.industry == industry)
+        else:
+            filters.append(Prospect.industry.startswith(industry, autoescape=True))
+    
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in PROSPECT_LIST_FIELDS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+        columns = [Prospect.id] + [getattr(Prospect, field) for field in requested if field != "id"]
+        query = select(*columns)
+    else:
+        query = select(Prospect)
+    
+    query = query.where(*filters).order_by(Prospect.id).limit(limit)
+    if after_id is not None:
+        query = query.where(Prospect.id > after_id)
+    elif skip:
+        query = query.offset(skip)
+    
+    result = await db.execute(query)
+    prospects = [dict(row._mapping) for row in result] if fields else result.scalars().all()
+    
+    if len(prospects) == limit:
+        last = prospects[-1]
+        response.headers["X-Next-Cursor"] = str(last["id"] if fields else last.id)
+    
+    if include_total:
+        total = await db.scalar(select(func.count()).select_from(Prospect).where(*filters))
+        response.headers["X-Total-Count"] = str(total)
     
-    prospects = query.offset(skip).limit(limit).all()
     return prospects
 
+@router.get("/segments", response_model=dict)
+async def get_segments(db: AsyncSession = Depends(get_db)):
+    """
+    Count prospects per industry category. Prospects are grouped by their
+    industry string in the database, so each distinct industry is classified once.
+    """
+    rows = (await db.execute(
+        select(Prospect.industry, func.count()).group_by(Prospect.industry)
+    )).all()
+    categories = industry_classifier.classify_many(industry for industry, _ in rows)
+    
+    segments = {category: 0 for category in industry_classifier.categories}
+    segments[DEFAULT_CATEGORY] = 0
+    for category, (_, count) in zip(categories, rows):
+        segments[category] += count
+    
+    return {
+        "total": sum(segments.values()),
+        "distinct_industries": len(rows),
+        "segments": segments
+    }
+
 @router.get("/{prospect_id}", response_model=ProspectResponse)
-async def get_prospect(prospect_id: int, db: Session = Depends(get_db)):
+async def get_prospect(prospect_id: int, db: AsyncSession = Depends(get_db)):
     """
     Get a specific prospect by ID.
     """
-    prospect = db.query(Prospect).filter(Prospect.id == prospect_id).first()
+    prospect = await db.scalar(select(Prospect).where(Prospect.id == prospect_id))
     if not prospect:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,12 +143,12 @@ async def get_prospect(prospect_id: int, db: Session = Depends(get_db)):
 async def update_prospect(
     prospect_id: int, 
     prospect_data: ProspectUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update a prospect's information.
     """
-    prospect = db.query(Prospect).filter(Prospect.id == prospect_id).first()
+    prospect = await db.scalar(select(Prospect).where(Prospect.id == prospect_id))
     if not prospect:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -91,112 +160,101 @@ async def update_prospect(
     for key, value in update_data.items():
         setattr(prospect, key, value)
     
-    db.commit()
-    db.refresh(prospect)
+    await db.commit()
+    await db.refresh(prospect)
     
     return prospect
 
 @router.delete("/{prospect_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_prospect(prospect_id: int, db: Session = Depends(get_db)):
+async def delete_prospect(prospect_id: int, db: AsyncSession = Depends(get_db)):
     """
     Delete a prospect.
     """
-    prospect = db.query(Prospect).filter(Prospect.id == prospect_id).first()
+    prospect = await db.scalar(select(Prospect).where(Prospect.id == prospect_id))
     if not prospect:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Prospect with ID {prospect_id} not found"
         )
     
-    db.delete(prospect)
-    db.commit()
+    await db.delete(prospect)
+    await db.commit()
     
     return None
 
-@router.post("/import", response_model=List[ProspectResponse], status_code=status.HTTP_201_CREATED)
-async def import_prospects(prospect_data: ProspectImport, db: Session = Depends(get_db)):
+@router.post("/import", response_model=ProspectImportResult, status_code=status.HTTP_201_CREATED)
+async def import_prospects(prospect_data: ProspectImport, db: AsyncSession = Depends(get_db)):
     """
-    Import multiple prospects at once.
+    Import multiple prospects at once. Prospects whose company name already
+    exists are skipped.
     """
-    created_prospects = []
-    
-    for p_data in prospect_data.prospects:
-        # Check if prospect exists
-        existing_prospect = db.query(Prospect).filter(Prospect.company_name == p_data.company_name).first()
-        if existing_prospect:
-            continue
-        
-        # Create new prospect
-        prospect = Prospect(**p_data.dict())
-        db.add(prospect)
-        created_prospects.append(prospect)
-    
-    db.commit()
+    rows = (
+        {**p_data.dict(), "website": str(p_data.website) if p_data.website else None}
+        for p_data in prospect_data.prospects
+    )
     
-    # Refresh all prospects to get their IDs
-    for prospect in created_prospects:
-        db.refresh(prospect)
-    
-    return created_prospects
+    return await services.import_service.import_prospects(db, rows)
 
-@router.post("/import-csv", response_model=List[ProspectResponse], status_code=status.HTTP_201_CREATED)
+@router.post("/import-csv", response_model=ProspectImportResult, status_code=status.HTTP_201_CREATED)
 async def import_prospects_csv(
-    file: str,  # This would normally be a UploadFile in a real API, but we're simplifying
-    db: Session = Depends(get_db)
+    file: UploadFile = File(...),
+    progress: bool = False,
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    Import prospects from a CSV file.
+    Import prospects from an uploaded CSV file.
     Format: company_name,industry,website,contact_person,email,phone
-    """
-    created_prospects = []
     
-    # Parse CSV from string (in a real API, this would read from the uploaded file)
-    csv_reader = csv.DictReader(StringIO(file))
+    The upload is parsed and written in chunks, so memory stays flat regardless
+    of file size. Invalid rows are skipped and reported. With progress=true the
+    response is newline-delimited JSON with a progress line after every chunk.
+    """
+    csv_file = file.file
+    if progress:
+        # FastAPI closes the upload when the handler returns, before the stream is read
+        csv_file = await run_in_threadpool(copy_to_temp_file, file.file)
     
-    for row in csv_reader:
-        # Check if required fields exist
-        if "company_name" not in row or "industry" not in row:
-            continue
-        
-        # Check if prospect exists
-        existing_prospect = db.query(Prospect).filter(Prospect.company_name == row["company_name"]).first()
-        if existing_prospect:
-            continue
-        
-        # Create new prospect
-        prospect = Prospect(
-            company_name=row["company_name"],
-            industry=row["industry"],
-            website=row.get("website"),
-            contact_person=row.get("contact_person"),
-            email=row.get("email"),
-            phone=row.get("phone")
+    try:
+        reader = await services.import_service.open_csv(csv_file)
+    except ValueError as e:
+        if progress:
+            csv_file.close()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
-        
-        db.add(prospect)
-        created_prospects.append(prospect)
     
-    db.commit()
+    if progress:
+        async def progress_lines():
+            # The stream outlives the request-scoped session, so it gets its own
+            try:
+                async with SessionLocal() as stream_db:
+                    async for report in services.import_service.import_csv(stream_db, reader):
+                        yield json.dumps(report) + "\n"
+            finally:
+                csv_file.close()
+        
+        return StreamingResponse(progress_lines(), media_type="application/x-ndjson")
     
-    # Refresh all prospects to get their IDs
-    for prospect in created_prospects:
-        db.refresh(prospect)
+    result = None
+    async for report in services.import_service.import_csv(db, reader):
+        result = report
     
-    return created_prospects
+    return result
 
 @router.get("/{prospect_id}/classification", response_model=dict)
-async def classify_prospect(prospect_id: int, db: Session = Depends(get_db)):
+async def classify_prospect(prospect_id: int, db: AsyncSession = Depends(get_db)):
     """
     Classify a prospect's industry for more specific targeting.
     """
-    prospect = db.query(Prospect).filter(Prospect.id == prospect_id).first()
+    prospect = await db.scalar(select(Prospect).where(Prospect.id == prospect_id))
     if not prospect:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Prospect with ID {prospect_id} not found"
         )
     
-    classification = workflow_service.classify_prospect(prospect)
+    classification = services.workflow_service.classify_prospect(prospect)
     
     return {
         "prospect_id": prospect_id,
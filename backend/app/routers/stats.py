@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends
+from typing import Dict, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.services.llm_usage import llm_usage
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["stats"],
+)
+
+@router.get("/llm", response_model=Dict)
+async def llm_usage_stats(
+    campaign: Optional[str] = None,
+    since_hours: Optional[float] = None,
+    top_prospects: int = 20,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    LLM calls, tokens, latency and cost per model and task, per campaign
+    (send-batch jobs are recorded as job:<id>) and for the most expensive
+    prospects, plus average tokens per call by industry category.
+    """
+    return await llm_usage.stats(db, campaign=campaign, since_hours=since_hours, top_prospects=top_prospects)
@@ -1,3 +1,4 @@
-from app.schemas.prospect import ProspectBase, ProspectCreate, ProspectUpdate, ProspectResponse, ProspectImport
+from app.schemas.prospect import ProspectBase, ProspectCreate, ProspectUpdate, ProspectResponse, ProspectImport, ProspectImportError, ProspectImportResult, ProspectListItem
 from app.schemas.email import EmailBase, EmailTemplate, EmailRequest, EmailResponse, EmailBulkRequest
 from app.schemas.engagement import EngagementBase, EngagementCreate, EngagementUpdate, EngagementResponse
+from app.schemas.job import JobResponse, JobItemResponse, JobResultsResponse
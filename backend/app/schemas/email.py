@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List, Dict
 from datetime import datetime
 
@@ -32,3 +32,10 @@ class EmailResponse(BaseModel):
 class EmailBulkRequest(BaseModel):
     prospect_ids: List[int]
     template_id: Optional[int] = None
+    token_budget: Optional[int] = Field(None, gt=0)  # LLM tokens the job may spend, defaults to LLM_CAMPAIGN_TOKEN_BUDGET
+
+class EmailBatchPreviewRequest(BaseModel):
+    prospect_ids: List[int]
+    bypass_cache: bool = False
+    campaign: Optional[str] = Field(None, max_length=100)  # Name the batch's LLM usage is recorded under
+    token_budget: Optional[int] = Field(None, gt=0)
@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class JobResponse(BaseModel):
+    id: int
+    type: str
+    status: str
+    total: int
+    processed: int
+    failed: int
+    worker_id: Optional[str] = None
+    error: Optional[str] = None
+    token_budget: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class JobItemResponse(BaseModel):
+    prospect_id: Optional[int] = None  # None once the prospect is deleted
+    status: str
+    engagement_id: Optional[int] = None
+    error: Optional[str] = None
+    processed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class JobResultsResponse(BaseModel):
+    job_id: int
+    status: str
+    results: List[JobItemResponse]
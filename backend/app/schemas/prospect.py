@@ -29,5 +29,34 @@ class ProspectResponse(ProspectBase):
     class Config:
         from_attributes = True
 
+class ProspectListItem(BaseModel):
+    """
+    Prospect as returned by the list endpoint, where a sparse field
+    projection may leave any column but id out.
+    """
+    id: int
+    company_name: Optional[str] = None
+    industry: Optional[str] = None
+    website: Optional[HttpUrl] = None
+    contact_person: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
 class ProspectImport(BaseModel):
     prospects: List[ProspectCreate]
+
+class ProspectImportError(BaseModel):
+    row: int
+    error: str
+
+class ProspectImportResult(BaseModel):
+    total: int
+    inserted: int
+    skipped: int
+    invalid: int = 0
+    errors: List[ProspectImportError] = []
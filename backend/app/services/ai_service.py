@@ -1,256 +1,305 @@
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, Optional, Tuple, Type
 from app.config import settings
+from app.metrics import count_cache_lookup, count_fallback, count_provider_error, set_industry, stage
 from app.models.prospect import Prospect
-from app.models.engagement import Engagement
+from app.models.engagement_summary import EngagementSummary
+from app.services.industry_profiles import industry_profile
+from app.services.llm_cache import llm_cache
+from app.services.llm_providers import LLMProvider, get_provider
+from app.services.llm_usage import TokenBudgetExceeded, llm_usage
+from app.services.prompt_templates import (
+    ADVICE_TEMPLATE,
+    EMAIL_TEMPLATE,
+    EMAIL_WITH_ADVICE_TEMPLATE,
+    PromptTemplate
+)
+from app.services.streaming import JsonFieldStreamer
+from app.services.structured_output import (
+    EmailOutput,
+    EmailWithAdviceOutput,
+    SchemaT,
+    StructuredOutputError,
+    structured_output
+)
+from app.tracing import set_attributes, traced
+import time
 
-# Import langchain and groq components
-from langchain_groq import ChatGroq
-from langchain_core.messages import SystemMessage, HumanMessage
-import json
-import re
-import os
+
+DEFAULT_ENGAGEMENT_ADVICE = """
+            Follow up within 3 business days. Use phone for direct contact, then email if no response. 
+            Emphasize industry-specific benefits and ROI. Address cost objections by focusing on risk mitigation value.
+            """
+
+
+# How to pitch a prospect given how they have engaged so far
+ENGAGEMENT_APPROACHES = {
+    "initial": {
+        "approach": "initial",
+        "tone": "informative and friendly",
+        "focus": "introduction and value proposition",
+        "call_to_action": "schedule a brief call"
+    },
+    "warm follow-up": {
+        "approach": "warm follow-up",
+        "tone": "appreciative and consultative",
+        "focus": "deepening the relationship",
+        "call_to_action": "schedule a detailed consultation"
+    },
+    "interested follow-up": {
+        "approach": "interested follow-up",
+        "tone": "helpful and proactive",
+        "focus": "addressing specific interests",
+        "call_to_action": "schedule a quick call to discuss specific solutions"
+    },
+    "awareness follow-up": {
+        "approach": "awareness follow-up",
+        "tone": "informative with new value points",
+        "focus": "building interest with more specific benefits",
+        "call_to_action": "check out more resources or schedule a call"
+    },
+    "re-engagement": {
+        "approach": "re-engagement",
+        "tone": "direct and attention-grabbing",
+        "focus": "new angle or value proposition",
+        "call_to_action": "simple response or quick call"
+    }
+}
+
+# Appended to the original prompt when a structured reply has to be repaired
+REPAIR_INSTRUCTIONS = """
+
+Your previous reply could not be used: {error}
+
+Previous reply:
+{reply}
+
+Reply again with only the corrected JSON object in the output format you were given.
+"""
+
+# Pipeline stage each generation task is timed as
+TASK_STAGES = {
+    "email": "llm_generate",
+    "advice": "llm_advice",
+    "call_script": "llm_call_script",
+}
+
+# Longest previous reply quoted back in a repair prompt
+MAX_REPAIR_REPLY_CHARS = 4000
 
 
 class AIService:
     def __init__(self):
-        self.model = "llama3-70b-8192"  # Default Groq model 
-        self.chat_model = ChatGroq(
-            api_key=settings.GROQ_API_KEY,
-            model_name=self.model
-        )
+        # Model used for each kind of generation, see the LLM routing settings
+        self.providers = {
+            "email": get_provider(settings.LLM_EMAIL_MODEL),
+            "advice": get_provider(settings.LLM_ADVICE_MODEL),
+            "call_script": get_provider(settings.LLM_CALL_SCRIPT_MODEL),
+        }
+
+    def provider(self, task: str) -> LLMProvider:
+        return self.providers[task]
 
-    def _get_industry_specifics(self, industry: str) -> Dict:
+    @traced()
+    async def complete(
+        self,
+        system: str,
+        prompt: str,
+        bypass_cache: bool = False,
+        task: str = "email",
+        json_mode: bool = False
+    ) -> str:
         """
-        Get industry-specific keywords, pain points, and selling points
-        for personalization based on the industry.
+        Run a single system + user prompt through the task's model and return the text.
+        Identical requests are served from the LLM cache unless bypass_cache is set.
+        Raises TokenBudgetExceeded instead of calling the model once the current
+        campaign has spent its token budget.
         """
-        industry_map = {
-            "technology": {
-                "keywords": ["innovation", "digital transformation", "security", "scalability"],
-                "pain_points": ["data breaches", "tech obsolescence", "rapid growth risks"],
-                "selling_points": [
-                    "Tech-specific liability coverage",
-                    "Cyber insurance tailored for tech companies",
-                    "Coverage that scales with your company"
-                ]
-            },
-            "finance": {
-                "keywords": ["security", "compliance", "ROI", "risk management"],
-                "pain_points": ["regulatory compliance", "financial liability", "client trust"],
-                "selling_points": [
-                    "Comprehensive financial liability protection",
-                    "Specialized coverage for financial institutions",
-                    "Client trust protection insurance"
-                ]
-            },
-            "healthcare": {
-                "keywords": ["compliance", "patient care", "efficiency", "risk mitigation"],
-                "pain_points": ["medical malpractice", "HIPAA compliance", "healthcare costs"],
-                "selling_points": [
-                    "HIPAA-compliant insurance solutions",
-                    "Medical malpractice coverage",
-                    "Healthcare-specific liability insurance"
-                ]
-            },
-            "retail": {
-                "keywords": ["customer experience", "inventory", "liability", "business continuity"],
-                "pain_points": ["property damage", "business interruption", "product liability"],
-                "selling_points": [
-                    "Retail-specific property insurance",
-                    "Business interruption coverage",
-                    "Product liability protection"
-                ]
-            },
-            "manufacturing": {
-                "keywords": ["efficiency", "safety", "supply chain", "equipment"],
-                "pain_points": ["workplace injuries", "equipment failure", "supply chain disruptions"],
-                "selling_points": [
-                    "Worker's compensation tailored for manufacturing",
-                    "Equipment breakdown coverage",
-                    "Supply chain interruption insurance"
-                ]
-            }
-        }
+        provider = self.provider(task)
+        use_cache = settings.LLM_CACHE_ENABLED and not bypass_cache
+        key = llm_cache.make_key(provider.model_id, system, prompt)
+        set_attributes(**{"llm.task": task, "llm.model_id": provider.model_id})
 
-        # Normalize the industry name for matching
-        industry_lower = industry.lower()
+        if use_cache:
+            cached = await llm_cache.get(key)
+            count_cache_lookup(cached is not None)
+            set_attributes(**{"llm.cache_hit": cached is not None})
+            if cached is not None:
+                llm_usage.record(task, provider.model_id, 0, 0, 0.0, cached=True)
+                return cached
 
-        # Try to find an exact match
-        if industry_lower in industry_map:
-            return industry_map[industry_lower]
+        llm_usage.check_budget()
+        usage = {}
+        started = time.perf_counter()
+        try:
+            with stage(TASK_STAGES[task]):
+                content = await provider.complete(system, prompt, json_mode=json_mode, usage=usage)
+        except Exception:
+            count_provider_error(provider.name)
+            raise
+        llm_usage.record(
+            task,
+            provider.model_id,
+            usage.get("input_tokens", 0),
+            usage.get("output_tokens", 0),
+            (time.perf_counter() - started) * 1000
+        )
 
-        # If no exact match, try to find a partial match
-        for key in industry_map:
-            if key in industry_lower or industry_lower in key:
-                return industry_map[key]
+        # Always refresh the cache, so a bypassed request replaces a stale entry
+        if settings.LLM_CACHE_ENABLED:
+            await llm_cache.put(key, provider.model_id, content)
 
-        # Default to generic if no match found
-        return {
-            "keywords": ["protection", "coverage", "risk management"],
-            "pain_points": ["liability risks", "unexpected costs", "business interruptions"],
-            "selling_points": [
-                "Comprehensive business insurance",
-                "Customized insurance solutions",
-                "Risk management expertise"
-            ]
-        }
+        return content
 
-    def _get_engagement_approach(self, engagement_history: List[Engagement]) -> Dict:
+    @traced()
+    async def complete_structured(
+        self,
+        system: str,
+        prompt: str,
+        schema: Type[SchemaT],
+        bypass_cache: bool = False,
+        task: str = "email"
+    ) -> SchemaT:
         """
-        Determine the appropriate approach based on previous engagement history.
+        Run a prompt that asks for JSON and return the reply validated against schema.
+        Raises StructuredOutputError if the reply is still unusable after one repair retry.
         """
-        if not engagement_history:
-            return {
-                "approach": "initial",
-                "tone": "informative and friendly",
-                "focus": "introduction and value proposition",
-                "call_to_action": "schedule a brief call"
-            }
+        content = await self.complete(
+            system, prompt, bypass_cache=bypass_cache, task=task, json_mode=settings.LLM_JSON_MODE
+        )
+        return await self._parse_structured(system, prompt, content, schema, task)
 
-        # Check if they've opened/clicked emails
-        opened_count = sum(1 for e in engagement_history if e.opened)
-        clicked_count = sum(1 for e in engagement_history if e.clicked)
-        responded_count = sum(1 for e in engagement_history if e.responded)
+    @traced()
+    async def _parse_structured(self, system: str, prompt: str, content: str, schema: Type[SchemaT], task: str) -> SchemaT:
+        """
+        Validate a reply against schema. A malformed reply gets a single repair
+        call that quotes the error and the reply back to the model, and the
+        repaired reply replaces the malformed one in the cache.
+        """
+        try:
+            with stage("parse"):
+                parsed = structured_output.parse(content, schema)
+            structured_output.record(schema, "ok")
+            return parsed
+        except StructuredOutputError as e:
+            error = e
 
-        if responded_count > 0:
-            return {
-                "approach": "warm follow-up",
-                "tone": "appreciative and consultative",
-                "focus": "deepening the relationship",
-                "call_to_action": "schedule a detailed consultation"
-            }
-        elif clicked_count > 0:
-            return {
-                "approach": "interested follow-up",
-                "tone": "helpful and proactive",
-                "focus": "addressing specific interests",
-                "call_to_action": "schedule a quick call to discuss specific solutions"
-            }
-        elif opened_count > 0:
-            return {
-                "approach": "awareness follow-up",
-                "tone": "informative with new value points",
-                "focus": "building interest with more specific benefits",
-                "call_to_action": "check out more resources or schedule a call"
-            }
-        else:
-            return {
-                "approach": "re-engagement",
-                "tone": "direct and attention-grabbing",
-                "focus": "new angle or value proposition",
-                "call_to_action": "simple response or quick call"
-            }
+        repair_prompt = prompt + REPAIR_INSTRUCTIONS.format(
+            error=error.detail,
+            reply=content[:MAX_REPAIR_REPLY_CHARS]
+        )
+        try:
+            repaired = await self.complete(
+                system, repair_prompt, bypass_cache=True, task=task, json_mode=settings.LLM_JSON_MODE
+            )
+            with stage("parse"):
+                parsed = structured_output.parse(repaired, schema)
+        except Exception:
+            structured_output.record(schema, "failed")
+            raise
 
-    async def generate_personalized_email(self, prospect: Prospect, engagement_history: List[Engagement]) -> Dict:
+        structured_output.record(schema, "repaired")
+        if settings.LLM_CACHE_ENABLED:
+            provider = self.provider(task)
+            key = llm_cache.make_key(provider.model_id, system, prompt)
+            await llm_cache.put(key, provider.model_id, parsed.model_dump_json())
+        return parsed
+
+    async def stream(self, system: str, prompt: str, bypass_cache: bool = False, task: str = "email") -> AsyncIterator[str]:
         """
-        Generate a personalized email for a prospect based on their industry and engagement history.
+        Stream the task's model response to a system + user prompt chunk by chunk.
+        A cached response is yielded as a single chunk.
         """
-        # Get industry-specific information
-        industry_specifics = self._get_industry_specifics(prospect.industry)
-
-        # Get engagement-based approach
-        engagement_approach = self._get_engagement_approach(engagement_history)
-
-        # Define potential objections based on industry
-        potential_objections = {
-            "technology": ["We already have cyber insurance", "Our tech stack is secure", "Insurance is too expensive"],
-            "finance": ["We're already heavily insured", "We handle risk internally", "Regulatory compliance is sufficient"],
-            "healthcare": ["Our existing malpractice coverage is enough", "We're too small to need comprehensive coverage", "HIPAA compliance is our priority"],
-            "retail": ["Our business is too small", "We don't have valuable physical assets", "Online retail has different needs"],
-            "manufacturing": ["We have long-standing insurance partners", "Our safety record is excellent", "Our equipment is well-maintained"]
-        }
+        provider = self.provider(task)
+        key = llm_cache.make_key(provider.model_id, system, prompt)
 
-        # Get objections for this industry or use generic ones
-        industry_lower = prospect.industry.lower()
-        objections = next((v for k, v in potential_objections.items() if k in industry_lower), 
-                         ["We already have insurance", "It's too expensive", "We don't see the value"])
-
-        # Prepare the prompt for the AI
-        prompt = f"""
-        Generate a personalized cold email for an insurance company reaching out to {prospect.company_name} in the {prospect.industry} industry.
-        
-        Company details:
-        - Name: {prospect.company_name}
-        - Industry: {prospect.industry}
-        - Contact Person: {prospect.contact_person or "Decision Maker"}
-        
-        Approach: {engagement_approach["approach"]}
-        Tone: {engagement_approach["tone"]}
-        Focus: {engagement_approach["focus"]}
-        
-        Industry-specific information:
-        - Keywords to emphasize: {", ".join(industry_specifics["keywords"])}
-        - Industry pain points to address: {", ".join(industry_specifics["pain_points"])}
-        - Selling points to highlight: {", ".join(industry_specifics["selling_points"])}
-        
-        Address these potential objections subtly:
-        - {objections[0]}
-        - {objections[1]}
-        - {objections[2]}
-        
-        Email structure:
-        1. Personalized greeting
-        2. Industry-specific hook relating to insurance needs
-        3. Value proposition tailored to their industry
-        4. Specific offering addressing their potential pain points
-        5. Call to action: {engagement_approach["call_to_action"]}
-        6. Professional signature
-        
-        Keep the email concise (150-200 words), professional, and focused on value.
-        
-        Output format:
-        {{"subject": "Email subject line", "body": "Full email body"}}
-        """
+        if settings.LLM_CACHE_ENABLED and not bypass_cache:
+            cached = await llm_cache.get(key)
+            count_cache_lookup(cached is not None)
+            if cached is not None:
+                llm_usage.record(task, provider.model_id, 0, 0, 0.0, cached=True)
+                yield cached
+                return
 
+        llm_usage.check_budget()
+        chunks = []
+        usage = {}
+        started = time.perf_counter()
         try:
-            messages = [
-                SystemMessage(content="You are an expert in writing personalized insurance sales outreach emails."),
-                HumanMessage(content=prompt)
-            ]
-            
-            response = await self.chat_model.ainvoke(messages)
-            content = response.content
-
-            # Extract JSON from the content - if the AI didn't return proper JSON,
-            # we'll need to parse it
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                try:
-                    email_data = json.loads(json_match.group(0))
-                except json.JSONDecodeError:
-                    # If JSON parsing fails, try to extract subject and body manually
-                    subject_match = re.search(r'subject[:"]*([^"]*)["\n]', content, re.IGNORECASE)
-                    body_match = re.search(r'body[:"]*([^"]*)["\n]', content, re.IGNORECASE | re.DOTALL)
-                    
-                    email_data = {
-                        "subject": subject_match.group(1).strip() if subject_match else "Insurance Solution for " + prospect.company_name,
-                        "body": body_match.group(1).strip() if body_match else content
-                    }
-            else:
-                # If no JSON found, try to extract subject and body manually
-                subject_match = re.search(r'subject[:"]*([^"]*)["\n]', content, re.IGNORECASE)
-                body_match = re.search(r'body[:"]*([^"]*)["\n]', content, re.IGNORECASE | re.DOTALL)
-                
-                email_data = {
-                    "subject": subject_match.group(1).strip() if subject_match else "Insurance Solution for " + prospect.company_name,
-                    "body": body_match.group(1).strip() if body_match else content
-                }
+            with stage(TASK_STAGES[task]):
+                async for chunk in provider.stream(system, prompt, usage=usage):
+                    chunks.append(chunk)
+                    yield chunk
+        except Exception:
+            count_provider_error(provider.name)
+            raise
+        llm_usage.record(
+            task,
+            provider.model_id,
+            usage.get("input_tokens", 0),
+            usage.get("output_tokens", 0),
+            (time.perf_counter() - started) * 1000
+        )
 
-            # Add metadata for further personalization and tracking
-            email_data["metadata"] = {
-                "industry_specifics": industry_specifics,
-                "engagement_approach": engagement_approach,
-                "potential_objections": objections
-            }
+        if settings.LLM_CACHE_ENABLED:
+            await llm_cache.put(key, provider.model_id, "".join(chunks))
 
-            return email_data
+    def _get_engagement_approach(self, engagement_summary: Optional[EngagementSummary]) -> Dict:
+        """
+        Determine the appropriate approach based on the prospect's engagement summary.
+        """
+        if not engagement_summary or not engagement_summary.total_count:
+            return ENGAGEMENT_APPROACHES["initial"]
 
-        except Exception as e:
-            print(f"Error generating personalized email: {e}")
-            # Fallback to a template-based approach
-            return {
-                "subject": f"Custom Insurance Solutions for {prospect.company_name}",
-                "body": f"""
+        # Check if they've opened/clicked emails
+        if (engagement_summary.responded_count or 0) > 0:
+            return ENGAGEMENT_APPROACHES["warm follow-up"]
+        elif (engagement_summary.clicked_count or 0) > 0:
+            return ENGAGEMENT_APPROACHES["interested follow-up"]
+        elif (engagement_summary.opened_count or 0) > 0:
+            return ENGAGEMENT_APPROACHES["awareness follow-up"]
+        else:
+            return ENGAGEMENT_APPROACHES["re-engagement"]
+
+    def _build_email_prompt(
+        self,
+        template: PromptTemplate,
+        prospect: Prospect,
+        engagement_summary: Optional[EngagementSummary]
+    ) -> Tuple[str, str, Dict]:
+        """
+        Render an email template for a prospect. Returns the system message, the
+        user message and the personalization metadata attached to the generated email.
+        """
+        profile = industry_profile(prospect.industry)
+        engagement_approach = self._get_engagement_approach(engagement_summary)
+
+        system, prompt = template.render(
+            company_name=prospect.company_name,
+            industry=prospect.industry,
+            contact_person=prospect.contact_person or "Decision Maker",
+            approach=engagement_approach["approach"],
+            tone=engagement_approach["tone"],
+            focus=engagement_approach["focus"],
+            call_to_action=engagement_approach["call_to_action"],
+            **profile["prompt_fields"]
+        )
+
+        metadata = {
+            "industry_specifics": profile["industry_specifics"],
+            "engagement_approach": engagement_approach,
+            "potential_objections": profile["objections"]
+        }
+
+        return system, prompt, metadata
+
+    def _fallback_email(self, prospect: Prospect) -> Dict:
+        """
+        Template-based email used when generation fails.
+        """
+        industry_specifics = industry_profile(prospect.industry)["industry_specifics"]
+        return {
+            "subject": f"Custom Insurance Solutions for {prospect.company_name}",
+            "body": f"""
                 Dear {prospect.contact_person or "Decision Maker"},
                 
                 I hope this email finds you well. I'm reaching out because we've helped several companies in the {prospect.industry} industry optimize their insurance coverage.
@@ -262,41 +311,161 @@ class AIService:
                 Best regards,
                 Insurance Specialist
                 """
+        }
+
+    @traced()
+    async def generate_personalized_email(
+        self,
+        prospect: Prospect,
+        engagement_summary: Optional[EngagementSummary],
+        bypass_cache: bool = False
+    ) -> Dict:
+        """
+        Generate a personalized email for a prospect based on their industry and engagement history.
+        """
+        system, prompt, metadata = self._build_email_prompt(EMAIL_TEMPLATE, prospect, engagement_summary)
+
+        try:
+            email = await self.complete_structured(
+                system,
+                prompt,
+                EmailOutput,
+                bypass_cache=bypass_cache
+            )
+            email_data = email.model_dump()
+
+            # Add metadata for further personalization and tracking
+            email_data["metadata"] = metadata
+
+            return email_data
+
+        except TokenBudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"Error generating personalized email: {e}")
+            count_fallback("email")
+            # Fallback to a template-based approach
+            return self._fallback_email(prospect)
+
+    @traced()
+    async def generate_email_with_advice(
+        self,
+        prospect: Prospect,
+        engagement_summary: Optional[EngagementSummary],
+        bypass_cache: bool = False
+    ) -> Dict:
+        """
+        Generate a personalized email and the follow-up advice for the sales rep
+        in a single model call. The advice is returned under the "advice" key.
+        """
+        system, prompt, metadata = self._build_email_prompt(EMAIL_WITH_ADVICE_TEMPLATE, prospect, engagement_summary)
+
+        try:
+            email = await self.complete_structured(
+                system,
+                prompt,
+                EmailWithAdviceOutput,
+                bypass_cache=bypass_cache
+            )
+            email_data = email.model_dump()
+
+            # Add metadata for further personalization and tracking
+            email_data["metadata"] = metadata
+
+            return email_data
+
+        except TokenBudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"Error generating personalized email with advice: {e}")
+            count_fallback("email")
+            return {
+                **self._fallback_email(prospect),
+                "advice": DEFAULT_ENGAGEMENT_ADVICE
             }
 
-    async def generate_engagement_advice(self, prospect: Prospect, email_content: Dict) -> str:
+    def _build_advice_prompt(self, prospect: Prospect, email_content: Dict) -> Tuple[str, str]:
+        return ADVICE_TEMPLATE.render(
+            company_name=prospect.company_name,
+            industry=prospect.industry,
+            subject=email_content["subject"],
+            focus=email_content["metadata"]["engagement_approach"]["focus"] if "metadata" in email_content else "introduction"
+        )
+
+    @traced()
+    async def generate_engagement_advice(self, prospect: Prospect, email_content: Dict, bypass_cache: bool = False) -> str:
         """
         Generate advice for the sales rep on how to further engage with this prospect.
         """
-        prompt = f"""
-        Provide brief, practical advice for a sales representative on how to follow up with this prospect after sending them an email:
-        
-        Company: {prospect.company_name}
-        Industry: {prospect.industry}
-        Email Subject: {email_content['subject']}
-        Email Focus: {email_content['metadata']['engagement_approach']['focus'] if 'metadata' in email_content else 'introduction'}
-        
-        Your advice should include:
-        1. When to follow up (timing)
-        2. Best channel for follow-up (phone, email, LinkedIn)
-        3. Talking points tailored to their industry
-        4. How to handle likely objections
-        
-        Keep it concise and actionable, under 100 words.
-        """
+        system, prompt = self._build_advice_prompt(prospect, email_content)
 
         try:
-            messages = [
-                SystemMessage(content="You are an expert sales coach specializing in insurance sales."),
-                HumanMessage(content=prompt)
-            ]
-            
-            response = await self.chat_model.ainvoke(messages)
-            return response.content
+            return await self.complete(
+                system,
+                prompt,
+                bypass_cache=bypass_cache,
+                task="advice"
+            )
 
+        except TokenBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error generating engagement advice: {e}")
-            return """
-            Follow up within 3 business days. Use phone for direct contact, then email if no response. 
-            Emphasize industry-specific benefits and ROI. Address cost objections by focusing on risk mitigation value.
-            """
+            count_fallback("advice")
+            return DEFAULT_ENGAGEMENT_ADVICE
+
+    async def stream_email(
+        self,
+        prospect: Prospect,
+        engagement_summary: Optional[EngagementSummary],
+        bypass_cache: bool = False
+    ) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Stream a personalized email and its engagement advice.
+
+        Yields ("subject" | "body" | "advice", text delta) tuples as the model
+        produces them, then a final ("done", {"email_content", "engagement_advice"}).
+        """
+        set_industry(prospect.industry)
+        llm_usage.set_prospect(prospect.id)
+        combined = settings.LLM_COMBINED_GENERATION
+
+        if combined:
+            template = EMAIL_WITH_ADVICE_TEMPLATE
+            schema = EmailWithAdviceOutput
+            streamer = JsonFieldStreamer(["subject", "body", "advice"])
+        else:
+            template = EMAIL_TEMPLATE
+            schema = EmailOutput
+            streamer = JsonFieldStreamer(["subject", "body"])
+
+        system, prompt, metadata = self._build_email_prompt(template, prospect, engagement_summary)
+
+        chunks = []
+        async for chunk in self.stream(system, prompt, bypass_cache=bypass_cache):
+            chunks.append(chunk)
+            for field, delta in streamer.feed(chunk):
+                yield field, delta
+
+        try:
+            email = await self._parse_structured(system, prompt, "".join(chunks), schema, "email")
+            email_data = email.model_dump()
+        except TokenBudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"Error parsing streamed email: {e}")
+            count_fallback("email")
+            email_data = self._fallback_email(prospect)
+        email_data["metadata"] = metadata
+
+        if combined:
+            advice = email_data.pop("advice", None) or DEFAULT_ENGAGEMENT_ADVICE
+        else:
+            advice_chunks = []
+            advice_system, advice_prompt = self._build_advice_prompt(prospect, email_data)
+            async for chunk in self.stream(advice_system, advice_prompt, bypass_cache=bypass_cache, task="advice"):
+                advice_chunks.append(chunk)
+                yield "advice", chunk
+            advice = "".join(advice_chunks)
+
+        yield "done", {"email_content": email_data, "engagement_advice": advice}
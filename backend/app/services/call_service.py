@@ -1,83 +1,112 @@
 import os
-from typing import Dict, List, Optional
-from twilio.rest import Client
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import json
 from datetime import datetime
 from app.models.prospect import Prospect
 from app.models.engagement import Engagement
-from sqlalchemy.orm import Session
+from app.models.engagement_summary import EngagementSummary
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.metrics import count_fallback, set_industry, stage
 from app.services.ai_service import AIService
-from langchain_core.messages import SystemMessage, HumanMessage
+from app.services.engagement_summary_service import EngagementSummaryService
+from app.services.engagement_event_service import EngagementEventService
+from app.services.industry_classifier import industry_classifier
+from app.services.industry_profiles import industry_profile
+from app.services.llm_usage import TokenBudgetExceeded, llm_usage
+from app.services.prompt_templates import CALL_SCRIPT_TEMPLATE
+from app.tracing import traced
 
 
 class CallService:
-    def __init__(self):
-        # Initialize Twilio client
-        account_sid = os.getenv("TWILIO_ACCOUNT_SID")
-        auth_token = os.getenv("TWILIO_AUTH_TOKEN")
-        self.client = Client(account_sid, auth_token)
+    def __init__(
+        self,
+        ai_service: Optional[AIService] = None,
+        summary_service: Optional[EngagementSummaryService] = None,
+        event_service: Optional[EngagementEventService] = None
+    ):
         self.from_phone = os.getenv("FROM_PHONE")
-        self.ai_service = AIService()
+        self.ai_service = ai_service or AIService()
+        self.summary_service = summary_service or EngagementSummaryService()
+        self.event_service = event_service or EngagementEventService()
+        self._client = None
     
-    async def generate_call_script(self, prospect: Prospect, engagement_history: List[Engagement]) -> Dict:
+    @property
+    def client(self):
+        # Import and initialize the Twilio SDK on first use, so processes that never call don't load it
+        if self._client is None:
+            from twilio.rest import Client
+
+            account_sid = os.getenv("TWILIO_ACCOUNT_SID")
+            auth_token = os.getenv("TWILIO_AUTH_TOKEN")
+            self._client = Client(account_sid, auth_token)
+        return self._client
+    
+    def _build_call_script_prompt(
+        self,
+        prospect: Prospect,
+        engagement_summary: Optional[EngagementSummary]
+    ) -> Tuple[str, str, Dict]:
         """
-        Generate a call script for the prospect based on their industry and engagement history.
+        Render the call script template for a prospect. Returns the system message,
+        the user message and the personalization metadata behind them.
         """
-        # Get industry-specific information
-        industry_specifics = self.ai_service._get_industry_specifics(prospect.industry)
-        
-        # Get engagement-based approach
-        engagement_approach = self.ai_service._get_engagement_approach(engagement_history)
-        
-        # Prepare the prompt for the AI
-        prompt = f"""
-        Generate a brief cold call script for an insurance sales representative calling {prospect.company_name} in the {prospect.industry} industry.
+        profile = industry_profile(prospect.industry)
+        engagement_approach = self.ai_service._get_engagement_approach(engagement_summary)
         
-        Company details:
-        - Name: {prospect.company_name}
-        - Industry: {prospect.industry}
-        - Contact Person: {prospect.contact_person or "Decision Maker"}
+        system, prompt = CALL_SCRIPT_TEMPLATE.render(
+            company_name=prospect.company_name,
+            industry=prospect.industry,
+            contact_person=prospect.contact_person or "Decision Maker",
+            approach=engagement_approach["approach"],
+            tone=engagement_approach["tone"],
+            focus=engagement_approach["focus"],
+            keywords=profile["prompt_fields"]["keywords"],
+            pain_points=profile["prompt_fields"]["pain_points"],
+            selling_points=profile["prompt_fields"]["selling_points"]
+        )
         
-        Approach: {engagement_approach["approach"]}
-        Tone: {engagement_approach["tone"]}
-        Focus: {engagement_approach["focus"]}
+        metadata = {
+            "industry_specifics": profile["industry_specifics"],
+            "engagement_approach": engagement_approach
+        }
         
-        Industry-specific information:
-        - Keywords to emphasize: {", ".join(industry_specifics["keywords"])}
-        - Industry pain points to address: {", ".join(industry_specifics["pain_points"])}
-        - Selling points to highlight: {", ".join(industry_specifics["selling_points"])}
-        
-        The script should include:
-        1. Introduction and purpose of the call
-        2. Industry-specific hook
-        3. Key qualifying questions
-        4. Addressing potential objections
-        5. Call to action/next steps
-        
-        Format the script with clear sections for each part of the conversation and include [[PAUSE]] where the representative should wait for a response.
-        Keep it conversational, natural, and under 400 words.
+        return system, prompt, metadata
+    
+    @traced()
+    async def generate_call_script(
+        self,
+        prospect: Prospect,
+        engagement_summary: Optional[EngagementSummary],
+        bypass_cache: bool = False
+    ) -> Dict:
+        """
+        Generate a call script for the prospect based on their industry and engagement history.
         """
+        set_industry(prospect.industry)
+        llm_usage.set_prospect(prospect.id)
+        system, prompt, metadata = self._build_call_script_prompt(prospect, engagement_summary)
+        industry_specifics = metadata["industry_specifics"]
         
         try:
-            messages = [
-                SystemMessage(content="You are an expert in writing effective cold call scripts for insurance sales."),
-                HumanMessage(content=prompt)
-            ]
-            
-            response = await self.ai_service.chat_model.ainvoke(messages)
-            script = response.content
+            script = await self.ai_service.complete(
+                system,
+                prompt,
+                bypass_cache=bypass_cache,
+                task="call_script"
+            )
             
             return {
                 "title": f"Call Script for {prospect.company_name}",
                 "script": script,
-                "metadata": {
-                    "industry_specifics": industry_specifics,
-                    "engagement_approach": engagement_approach
-                }
+                "metadata": metadata
             }
             
+        except TokenBudgetExceeded:
+            raise
         except Exception as e:
             print(f"Error generating call script: {e}")
+            count_fallback("call_script")
             # Fallback to a template-based script
             return {
                 "title": f"Call Script for {prospect.company_name}",
@@ -108,7 +137,35 @@ class CallService:
                 """
             }
     
-    async def make_call(self, db: Session, prospect: Prospect, script_content: Dict) -> Engagement:
+    async def stream_call_script(
+        self,
+        prospect: Prospect,
+        engagement_summary: Optional[EngagementSummary],
+        bypass_cache: bool = False
+    ) -> AsyncIterator[Tuple[str, object]]:
+        """
+        Stream a call script, yielding ("script", text delta) tuples as the model
+        produces them and then a final ("done", script_content).
+        """
+        set_industry(prospect.industry)
+        llm_usage.set_prospect(prospect.id)
+        system, prompt, metadata = self._build_call_script_prompt(prospect, engagement_summary)
+        
+        chunks = []
+        async for chunk in self.ai_service.stream(
+            system, prompt, bypass_cache=bypass_cache, task="call_script"
+        ):
+            chunks.append(chunk)
+            yield "script", chunk
+        
+        yield "done", {
+            "title": f"Call Script for {prospect.company_name}",
+            "script": "".join(chunks),
+            "metadata": metadata
+        }
+    
+    @traced()
+    async def make_call(self, db: AsyncSession, prospect: Prospect, script_content: Dict) -> Engagement:
         """
         Make a call to a prospect using Twilio and record it in the engagement history.
         
@@ -137,8 +194,10 @@ class CallService:
             )
             
             db.add(engagement)
-            db.commit()
-            db.refresh(engagement)
+            with stage("commit", industry=industry_classifier.classify(prospect.industry)):
+                await self.summary_service.record_engagement(db, engagement)
+                await db.commit()
+            await db.refresh(engagement)
             
             print(f"Call initiated to {prospect.phone} for {prospect.company_name}")
             
@@ -146,25 +205,36 @@ class CallService:
             
         except Exception as e:
             print(f"Error making call: {e}")
-            db.rollback()
+            await db.rollback()
             raise
     
-    async def update_call_outcome(self, db: Session, engagement_id: int, outcome: Dict) -> None:
+    @traced()
+    async def update_call_outcome(self, db: AsyncSession, engagement_id: int, outcome: Dict) -> None:
         """
         Update a call engagement with the outcome.
         """
-        engagement = db.query(Engagement).filter(Engagement.id == engagement_id).first()
+        engagement = await db.scalar(select(Engagement).where(Engagement.id == engagement_id))
         if not engagement:
             raise ValueError(f"Engagement with ID {engagement_id} not found")
         
-        # Update engagement based on call outcome
+        # Record the outcome as events; the notes go on the first one
+        note = outcome.get("notes", "No notes")
+        # Keep the notes readable on the engagement too, appended in place so concurrent updates don't clobber each other
+        await db.execute(
+            update(Engagement)
+            .where(Engagement.id == engagement_id)
+            .values(notes=func.coalesce(Engagement.notes, "") + f"\nOutcome: {note}")
+            .execution_options(synchronize_session=False)
+        )
         if outcome.get("connected", False):
-            engagement.engagement_score += 3.0
+            await self.event_service.record(db, engagement, "connected", note=note)
+            note = None
         
         if outcome.get("interested", False):
-            engagement.responded = True
-            engagement.engagement_score += 5.0
+            await self.event_service.record(db, engagement, "interested", note=note)
+            note = None
         
-        engagement.notes = f"{engagement.notes}\nOutcome: {outcome.get('notes', 'No notes')}"
+        if note is not None:
+            await self.event_service.record(db, engagement, "outcome", note=note)
         
-        db.commit()
+        await db.commit()
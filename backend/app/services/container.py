@@ -0,0 +1,94 @@
+from typing import Callable, Dict
+from app.services.ai_service import AIService
+from app.services.call_service import CallService
+from app.services.email_service import EmailService
+from app.services.engagement_event_service import EngagementEventService
+from app.services.engagement_summary_service import EngagementSummaryService
+from app.services.event_ingestion_service import EventIngestionService
+from app.services.import_service import ImportService
+from app.services.job_service import JobService
+from app.services.llm_providers import close_providers
+from app.services.llm_usage import llm_usage
+from app.services.sendgrid_transport import sendgrid_transport
+from app.services.workflow_service import WorkflowService
+
+
+class ServiceContainer:
+    """
+    One shared instance of each service for the whole process.
+
+    Services are built on first use and wired to each other, so a process only
+    pays for the clients it actually touches, and every router shares the same
+    AIService, SendGrid connection pool and Twilio client. The app lifespan
+    closes it on shutdown.
+    """
+
+    def __init__(self):
+        self._services: Dict[str, object] = {}
+
+    def _get(self, name: str, build: Callable[[], object]):
+        if name not in self._services:
+            self._services[name] = build()
+        return self._services[name]
+
+    @property
+    def ai_service(self) -> AIService:
+        return self._get("ai_service", AIService)
+
+    @property
+    def summary_service(self) -> EngagementSummaryService:
+        return self._get("summary_service", EngagementSummaryService)
+
+    @property
+    def event_service(self) -> EngagementEventService:
+        return self._get("event_service", lambda: EngagementEventService(self.summary_service))
+
+    @property
+    def ingestion_service(self) -> EventIngestionService:
+        return self._get("ingestion_service", lambda: EventIngestionService(self.event_service))
+
+    @property
+    def email_service(self) -> EmailService:
+        return self._get("email_service", lambda: EmailService(self.summary_service, self.event_service))
+
+    @property
+    def workflow_service(self) -> WorkflowService:
+        return self._get(
+            "workflow_service",
+            lambda: WorkflowService(self.ai_service, self.email_service, self.summary_service)
+        )
+
+    @property
+    def call_service(self) -> CallService:
+        return self._get(
+            "call_service",
+            lambda: CallService(self.ai_service, self.summary_service, self.event_service)
+        )
+
+    @property
+    def job_service(self) -> JobService:
+        return self._get("job_service", JobService)
+
+    @property
+    def import_service(self) -> ImportService:
+        return self._get("import_service", ImportService)
+
+    def built(self) -> list:
+        """
+        Names of the services built so far.
+        """
+        return sorted(self._services)
+
+    async def aclose(self) -> None:
+        """
+        Write buffered LLM usage, close shared connection pools and LLM clients
+        and drop every service.
+        """
+        await llm_usage.aclose()
+        await sendgrid_transport.aclose()
+        await close_providers()
+        self._services.clear()
+
+
+# Shared container used by the routers and the worker
+services = ServiceContainer()
@@ -1,69 +1,170 @@
+import asyncio
 import os
-from typing import Dict, List, Optional
-import sendgrid
-from sendgrid.helpers.mail import Mail, Email, To, Content, TrackingSettings, ClickTracking, OpenTracking
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
+from app.metrics import count_provider_error, industry_of, stage
 from app.models.prospect import Prospect
 from app.models.engagement import Engagement
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.services.rate_limiter import sendgrid_limiter
+from app.services.sendgrid_transport import SendGridError, sendgrid_transport
+from app.services.engagement_summary_service import EngagementSummaryService
+from app.services.engagement_event_service import EngagementEventService
+from app.tracing import set_attributes, traced
+
+
+# Placeholder in the shared content that each personalization substitutes with its own body
+BODY_PLACEHOLDER = "-body_html-"
 
 
 class EmailService:
-    def __init__(self):
-        self.sg = sendgrid.SendGridAPIClient(api_key=os.getenv("SENDGRID_API_KEY"))
+    def __init__(
+        self,
+        summary_service: Optional[EngagementSummaryService] = None,
+        event_service: Optional[EngagementEventService] = None
+    ):
+        self.transport = sendgrid_transport
         self.from_email = os.getenv("FROM_EMAIL", "insurance@youragency.com")
         self.from_name = os.getenv("FROM_NAME", "Insurance Specialist")
+        self.summary_service = summary_service or EngagementSummaryService()
+        self.event_service = event_service or EngagementEventService()
     
-    async def send_email(self, db: Session, prospect: Prospect, email_content: Dict) -> Engagement:
+    @traced()
+    async def send_email(self, db: AsyncSession, prospect: Prospect, email_content: Dict) -> Engagement:
         """
         Send a personalized email to a prospect and record it in the engagement history.
         """
-        if not prospect.email:
-            raise ValueError(f"No email address for prospect: {prospect.company_name}")
-        
-        # Create tracking settings
-        tracking_settings = TrackingSettings()
-        tracking_settings.click_tracking = ClickTracking(enable=True, enable_text=True)
-        tracking_settings.open_tracking = OpenTracking(enable=True)
-        
-        # Create the email message
-        message = Mail(
-            from_email=Email(self.from_email, self.from_name),
-            to_emails=To(prospect.email, prospect.contact_person),
-            subject=email_content["subject"],
-            html_content=Content("text/html", self._format_html_email(email_content["body"]))
-        )
+        results = await self.send_emails(db, [(prospect, email_content)])
+        if isinstance(results[0], Exception):
+            raise results[0]
+        return results[0]
+    
+    @traced()
+    async def send_emails(
+        self,
+        db: AsyncSession,
+        emails: List[Tuple[Prospect, Dict]]
+    ) -> List[Union[Engagement, Exception]]:
+        """
+        Send several personalized emails in one SendGrid request, one personalization
+        per recipient, and record an engagement for each email SendGrid accepts.
         
-        message.tracking_settings = tracking_settings
+        Nothing touches the database until SendGrid has answered, so no transaction
+        is held open across the HTTP call. If SendGrid rejects the request as invalid,
+        each email is retried on its own so one bad recipient doesn't fail the rest.
+        Returns an engagement per email, or the error for emails that weren't sent.
+        """
+        for prospect, _ in emails:
+            self.check_recipient(prospect)
+        industry = industry_of(prospect.industry for prospect, _ in emails)
+        set_attributes(**{"email.count": len(emails), "prospect.industry": industry})
         
+        personalizations = [
+            self._build_personalization(prospect, email_content) for prospect, email_content in emails
+        ]
         try:
-            # Send the email
-            response = self.sg.send(message)
-            print(f"Email sent to {prospect.email}, Status Code: {response.status_code}")
-            
-            # Record the engagement
-            engagement = Engagement(
-                prospect_id=prospect.id,
-                type="email",
-                content=email_content["body"],
-                sent_at=datetime.utcnow(),
-                opened=False,
-                clicked=False,
-                responded=False,
-                engagement_score=0.0,
-                notes=f"Subject: {email_content['subject']}"
+            message_id = await self._send(personalizations, industry)
+            outcomes = [message_id] * len(emails)
+        except SendGridError as e:
+            if e.status_code != 400 or len(emails) == 1:
+                print(f"Error sending email: {e}")
+                raise
+            print(f"SendGrid rejected {len(emails)} emails in one request, sending them one by one: {e}")
+            outcomes = await asyncio.gather(
+                *(self._send([personalization], industry) for personalization in personalizations),
+                return_exceptions=True
             )
-            
-            db.add(engagement)
-            db.commit()
-            db.refresh(engagement)
-            
-            return engagement
-            
-        except Exception as e:
-            print(f"Error sending email: {e}")
-            db.rollback()
+        
+        sent = [
+            (prospect, email_content, outcome)
+            for (prospect, email_content), outcome in zip(emails, outcomes)
+            if not isinstance(outcome, BaseException)
+        ]
+        engagements = iter(await self._record_sent(db, sent, industry))
+        return [outcome if isinstance(outcome, BaseException) else next(engagements) for outcome in outcomes]
+    
+    async def _send(self, personalizations: List[Dict], industry: str) -> str:
+        """
+        Send one SendGrid request and return its message id.
+        """
+        # SendGrid's quota counts recipients, not requests
+        await sendgrid_limiter.acquire(len(personalizations))
+        try:
+            with stage("send", industry=industry):
+                message_id = await self.transport.send(self._build_payload(personalizations))
+        except Exception:
+            count_provider_error("sendgrid", industry=industry)
             raise
+        print(f"Sent {len(personalizations)} email(s) in one request, message ID {message_id}")
+        return message_id
+    
+    async def _record_sent(
+        self,
+        db: AsyncSession,
+        sent: List[Tuple[Prospect, Dict, str]],
+        industry: str
+    ) -> List[Engagement]:
+        """
+        Record an engagement for each sent email in one short transaction.
+        """
+        if not sent:
+            return []
+        
+        with stage("commit", industry=industry):
+            try:
+                engagements = []
+                for prospect, email_content, message_id in sent:
+                    engagement = Engagement(
+                        prospect_id=prospect.id,
+                        type="email",
+                        content=email_content["body"],
+                        sent_at=datetime.utcnow(),
+                        opened=False,
+                        clicked=False,
+                        responded=False,
+                        engagement_score=0.0,
+                        notes=f"Subject: {email_content['subject']}",
+                        message_id=message_id or None
+                    )
+                    db.add(engagement)
+                    engagements.append(engagement)
+                    await self.summary_service.record_engagement(db, engagement)
+                await db.commit()
+            except Exception as e:
+                print(f"Error recording {len(sent)} sent email(s): {e}")
+                await db.rollback()
+                raise
+        
+        return engagements
+    
+    def check_recipient(self, prospect: Prospect) -> None:
+        if not prospect.email:
+            raise ValueError(f"No email address for prospect: {prospect.company_name}")
+    
+    def _build_personalization(self, prospect: Prospect, email_content: Dict) -> Dict:
+        recipient = {"email": prospect.email}
+        if prospect.contact_person:
+            recipient["name"] = prospect.contact_person
+        
+        return {
+            "to": [recipient],
+            "subject": email_content["subject"],
+            "substitutions": {BODY_PLACEHOLDER: self._format_html_email(email_content["body"])},
+            # Events carry the message id, and this tells recipients of one request apart
+            "custom_args": {"prospect_id": str(prospect.id)}
+        }
+    
+    def _build_payload(self, personalizations: List[Dict]) -> Dict:
+        return {
+            "personalizations": personalizations,
+            "from": {"email": self.from_email, "name": self.from_name},
+            "content": [{"type": "text/html", "value": BODY_PLACEHOLDER}],
+            "tracking_settings": {
+                "click_tracking": {"enable": True, "enable_text": True},
+                "open_tracking": {"enable": True}
+            }
+        }
     
     def _format_html_email(self, body_text: str) -> str:
         """
@@ -105,22 +206,14 @@ class EmailService:
         
         return html
     
-    async def track_engagement(self, db: Session, engagement_id: int, event_type: str) -> None:
+    async def track_engagement(self, db: AsyncSession, engagement_id: int, event_type: str) -> None:
         """
         Track email engagement events (open, click, reply)
         """
-        engagement = db.query(Engagement).filter(Engagement.id == engagement_id).first()
+        engagement = await db.scalar(select(Engagement).where(Engagement.id == engagement_id))
         if not engagement:
             raise ValueError(f"Engagement with ID {engagement_id} not found")
         
-        if event_type == "open":
-            engagement.opened = True
-            engagement.engagement_score += 1.0
-        elif event_type == "click":
-            engagement.clicked = True
-            engagement.engagement_score += 2.0
-        elif event_type == "reply":
-            engagement.responded = True
-            engagement.engagement_score += 5.0
+        await self.event_service.record(db, engagement, event_type)
         
-        db.commit()
+        await db.commit()
@@ -0,0 +1,168 @@
+from typing import Dict, List, Optional
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import Boolean, bindparam, func, insert, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.engagement import Engagement
+from app.models.engagement_event import EngagementEvent
+from app.services.engagement_summary_service import EngagementSummaryService
+from app.tracing import traced
+
+
+# Engagement flag each event type sets (if any) and the score it adds
+EVENT_TYPES = {
+    "open": ("opened", 1.0),
+    "click": ("clicked", 2.0),
+    "reply": ("responded", 5.0),
+    "connected": (None, 3.0),  # Call outcomes
+    "interested": ("responded", 5.0),
+    "outcome": (None, 0.0),  # Call notes without a scored outcome
+}
+
+
+class EngagementEventService:
+    """
+    Append-only engagement event log with incremental rollups.
+
+    Tracking an engagement is a plain insert into engagement_events. The
+    rollup stage later claims unprocessed events in batches, folds them into
+    engagement flags and scores and the prospect summaries with one relative
+    UPDATE per touched row, and marks them rolled up.
+    """
+
+    def __init__(self, summary_service: Optional[EngagementSummaryService] = None):
+        self.summary_service = summary_service or EngagementSummaryService()
+
+    async def record(
+        self,
+        db: AsyncSession,
+        engagement: Engagement,
+        event_type: str,
+        note: Optional[str] = None,
+        occurred_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Append one event for an engagement. Does not commit.
+        """
+        await self.record_many(db, [{
+            "engagement_id": engagement.id,
+            "prospect_id": engagement.prospect_id,
+            "event_type": event_type,
+            "note": note,
+            "occurred_at": occurred_at,
+        }])
+
+    @traced()
+    async def record_many(self, db: AsyncSession, events: List[Dict]) -> None:
+        """
+        Append events given as dicts with engagement_id, prospect_id, event_type
+        and optionally note and occurred_at, in one multi-row insert. Does not commit.
+        """
+        if not events:
+            return
+
+        now = datetime.utcnow()
+        await db.execute(insert(EngagementEvent), [
+            {
+                "engagement_id": event["engagement_id"],
+                "prospect_id": event["prospect_id"],
+                "event_type": event["event_type"],
+                "score_delta": EVENT_TYPES[event["event_type"]][1],
+                "occurred_at": event.get("occurred_at") or now,
+                "note": event.get("note"),
+            }
+            for event in events
+        ])
+
+    async def pending_score(self, db: AsyncSession, engagement_id: int) -> float:
+        """
+        Score of an engagement's events that are not rolled up yet.
+        """
+        return await db.scalar(
+            select(func.coalesce(func.sum(EngagementEvent.score_delta), 0.0)).where(
+                EngagementEvent.engagement_id == engagement_id,
+                EngagementEvent.rolled_up_at == None
+            )
+        ) or 0.0
+
+    @traced()
+    async def rollup(self, db: AsyncSession, limit: int = settings.ENGAGEMENT_ROLLUP_BATCH_SIZE) -> int:
+        """
+        Fold one batch of pending events into engagements and prospect summaries
+        and commit. Returns the number of events rolled up.
+        """
+        # Concurrent rollups take disjoint batches
+        events = (await db.execute(
+            select(
+                EngagementEvent.id, EngagementEvent.engagement_id,
+                EngagementEvent.event_type, EngagementEvent.score_delta
+            ).where(EngagementEvent.rolled_up_at == None).order_by(EngagementEvent.id).limit(limit).with_for_update(skip_locked=True)
+        )).all()
+        if not events:
+            return 0
+
+        flags_by_engagement: Dict[int, set] = defaultdict(set)
+        score_by_engagement: Dict[int, float] = defaultdict(float)
+        for event in events:
+            flag, _ = EVENT_TYPES.get(event.event_type, (None, 0.0))
+            if flag:
+                flags_by_engagement[event.engagement_id].add(flag)
+            score_by_engagement[event.engagement_id] += event.score_delta or 0.0
+
+        # Lock the touched engagements so flag transitions are counted once
+        engagements = (await db.execute(
+            select(
+                Engagement.id, Engagement.prospect_id,
+                Engagement.opened, Engagement.clicked, Engagement.responded
+            ).where(Engagement.id.in_(score_by_engagement.keys())).order_by(Engagement.id).with_for_update()
+        )).all()
+
+        engagement_params: List[Dict] = []
+        summary_deltas: Dict[int, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        for row in engagements:
+            flags = flags_by_engagement[row.id]
+            score = score_by_engagement[row.id]
+            engagement_params.append({
+                "b_id": row.id,
+                "b_opened": "opened" in flags,
+                "b_clicked": "clicked" in flags,
+                "b_responded": "responded" in flags,
+                "b_score": score,
+            })
+            for flag in flags:
+                if not getattr(row, flag):
+                    summary_deltas[row.prospect_id][f"{flag}_count"] += 1
+            summary_deltas[row.prospect_id]["total_score"] += score
+
+        if engagement_params:
+            table = Engagement.__table__
+            await db.execute(
+                update(table).where(table.c.id == bindparam("b_id")).values({
+                    "opened": or_(table.c.opened, bindparam("b_opened", type_=Boolean)),
+                    "clicked": or_(table.c.clicked, bindparam("b_clicked", type_=Boolean)),
+                    "responded": or_(table.c.responded, bindparam("b_responded", type_=Boolean)),
+                    "engagement_score": table.c.engagement_score + bindparam("b_score"),
+                }),
+                engagement_params
+            )
+            await self.summary_service.apply_many(db, summary_deltas)
+
+        await db.execute(
+            update(EngagementEvent).where(EngagementEvent.id.in_([event.id for event in events])).values(
+                rolled_up_at=datetime.utcnow()
+            )
+        )
+        await db.commit()
+        return len(events)
+
+    async def rollup_pending(self, db: AsyncSession) -> int:
+        """
+        Roll up batches until no pending events are left. Returns the total.
+        """
+        total = 0
+        while True:
+            count = await self.rollup(db)
+            total += count
+            if count < settings.ENGAGEMENT_ROLLUP_BATCH_SIZE:
+                return total
@@ -0,0 +1,150 @@
+from typing import Dict, List, Optional
+from datetime import datetime
+from sqlalchemy import bindparam, case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.engagement import Engagement
+from app.models.engagement_summary import EngagementSummary
+
+
+class EngagementSummaryService:
+    """
+    Keeps engagement_summaries in step with the engagements table.
+
+    Changes are applied as relative updates (count = count + 1) in the caller's
+    transaction, so the summary commits or rolls back with the engagement write.
+    """
+
+    async def get(self, db: AsyncSession, prospect_id: int) -> Optional[EngagementSummary]:
+        return await db.scalar(
+            select(EngagementSummary).where(EngagementSummary.prospect_id == prospect_id)
+        )
+
+    async def record_engagement(self, db: AsyncSession, engagement: Engagement) -> None:
+        """
+        Fold a newly created engagement into its prospect's summary.
+        """
+        await self.apply(
+            db,
+            engagement.prospect_id,
+            {
+                "total_count": 1,
+                "email_count": 1 if engagement.type == "email" else 0,
+                "call_count": 1 if engagement.type == "call" else 0,
+                "opened_count": 1 if engagement.opened else 0,
+                "clicked_count": 1 if engagement.clicked else 0,
+                "responded_count": 1 if engagement.responded else 0,
+                "total_score": engagement.engagement_score or 0.0,
+            },
+            last_engagement_at=engagement.sent_at
+        )
+
+    async def apply(
+        self,
+        db: AsyncSession,
+        prospect_id: int,
+        deltas: Dict[str, float],
+        last_engagement_at: Optional[datetime] = None
+    ) -> None:
+        """
+        Add deltas to a prospect's summary counters, creating the row on first use.
+        """
+        values = {column: getattr(EngagementSummary, column) + amount for column, amount in deltas.items()}
+        if last_engagement_at:
+            values["last_engagement_at"] = case(
+                (EngagementSummary.last_engagement_at == None, last_engagement_at),
+                (EngagementSummary.last_engagement_at < last_engagement_at, last_engagement_at),
+                else_=EngagementSummary.last_engagement_at
+            )
+        values["updated_at"] = datetime.utcnow()
+
+        statement = update(EngagementSummary).where(EngagementSummary.prospect_id == prospect_id).values(**values)
+        result = await db.execute(statement)
+        if result.rowcount:
+            return
+
+        # Deltas override the zeroed counters they overlap with
+        counts = {**self._empty_counts(), **deltas}
+        try:
+            # First engagement for this prospect; a concurrent writer may beat us to it
+            async with db.begin_nested():
+                await db.execute(insert(EngagementSummary).values(
+                    prospect_id=prospect_id,
+                    **counts,
+                    last_engagement_at=last_engagement_at,
+                    updated_at=datetime.utcnow()
+                ))
+        except IntegrityError:
+            await db.execute(statement)
+
+    async def apply_many(self, db: AsyncSession, deltas_by_prospect: Dict[int, Dict[str, float]]) -> None:
+        """
+        Apply deltas for many prospects with one executemany UPDATE. Prospects
+        without a summary row yet fall back to apply().
+        """
+        if not deltas_by_prospect:
+            return
+
+        existing = set((await db.scalars(
+            select(EngagementSummary.prospect_id).where(EngagementSummary.prospect_id.in_(deltas_by_prospect.keys()))
+        )).all())
+
+        columns = sorted({column for deltas in deltas_by_prospect.values() for column in deltas})
+        table = EngagementSummary.__table__
+        values = {column: table.c[column] + bindparam(f"b_{column}") for column in columns}
+        values["updated_at"] = datetime.utcnow()
+        statement = update(table).where(table.c.prospect_id == bindparam("b_prospect_id")).values(values)
+        params: List[Dict] = []
+        # Sorted so concurrent batches lock summary rows in the same order
+        for prospect_id in sorted(deltas_by_prospect):
+            deltas = deltas_by_prospect[prospect_id]
+            if prospect_id not in existing:
+                await self.apply(db, prospect_id, deltas)
+                continue
+            params.append({
+                "b_prospect_id": prospect_id,
+                **{f"b_{column}": deltas.get(column, 0) for column in columns}
+            })
+
+        if params:
+            await db.execute(statement, params)
+
+    async def rebuild(self, db: AsyncSession) -> int:
+        """
+        Recompute every summary from the engagements table, for backfills.
+        Returns the number of prospects summarized.
+        """
+        rows = (await db.execute(
+            select(
+                Engagement.prospect_id,
+                func.count(Engagement.id).label("total_count"),
+                func.sum(case((Engagement.type == "email", 1), else_=0)).label("email_count"),
+                func.sum(case((Engagement.type == "call", 1), else_=0)).label("call_count"),
+                func.sum(case((Engagement.opened == True, 1), else_=0)).label("opened_count"),
+                func.sum(case((Engagement.clicked == True, 1), else_=0)).label("clicked_count"),
+                func.sum(case((Engagement.responded == True, 1), else_=0)).label("responded_count"),
+                func.coalesce(func.sum(Engagement.engagement_score), 0.0).label("total_score"),
+                func.max(Engagement.sent_at).label("last_engagement_at"),
+            ).where(Engagement.prospect_id != None).group_by(Engagement.prospect_id)
+        )).all()
+
+        await db.execute(delete(EngagementSummary))
+        if rows:
+            now = datetime.utcnow()
+            await db.execute(
+                insert(EngagementSummary),
+                [{**row._mapping, "updated_at": now} for row in rows]
+            )
+        await db.commit()
+        return len(rows)
+
+    def _empty_counts(self) -> Dict:
+        return {
+            "total_count": 0,
+            "email_count": 0,
+            "call_count": 0,
+            "opened_count": 0,
+            "clicked_count": 0,
+            "responded_count": 0,
+            "total_score": 0.0,
+        }
@@ -0,0 +1,180 @@
+from typing import Dict, List, Optional, Set
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.engagement import Engagement
+from app.models.webhook_event import ProcessedWebhookEvent
+from app.services.engagement_event_service import EngagementEventService
+from app.tracing import traced
+
+
+# SendGrid event types that count as engagement; everything else is ignored
+WEBHOOK_EVENT_TYPES = ("open", "click", "reply")
+
+# Batches between prunes of old dedupe ids
+PRUNE_EVERY = 100
+
+# Retries when a concurrent batch claims the same event ids first
+MAX_ATTEMPTS = 3
+
+
+class EventIngestionService:
+    """
+    Batched ingestion of SendGrid Event Webhook payloads.
+
+    A batch costs a fixed number of statements however many events it holds:
+    event ids are claimed in one insert so redeliveries are dropped, the
+    matching engagements are looked up in one select, and the events are
+    appended to the engagement event log in one insert. Scores are folded in
+    later by the rollup stage.
+    """
+
+    def __init__(self, event_service: Optional[EngagementEventService] = None):
+        self.event_service = event_service or EngagementEventService()
+        self._batches = 0
+
+    @traced()
+    async def ingest(self, db: AsyncSession, events: List[Dict]) -> Dict:
+        """
+        Record a webhook batch. Returns counts of what happened to its events.
+        """
+        report = {"received": len(events), "recorded": 0, "duplicates": 0, "ignored": 0, "unmatched": 0}
+
+        # Keep tracked events with an id, once each
+        tracked: Dict[str, Dict] = {}
+        for event in events:
+            if not isinstance(event, dict) or event.get("event") not in WEBHOOK_EVENT_TYPES or not event.get("sg_event_id"):
+                report["ignored"] += 1
+            elif str(event["sg_event_id"]) in tracked:
+                report["duplicates"] += 1
+            else:
+                tracked[str(event["sg_event_id"])] = event
+
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                new_ids = await self._claim_new_events(db, tracked)
+                fresh = [tracked[event_id] for event_id in new_ids]
+                matched = await self.record_engagement_events(db, fresh)
+
+                self._batches += 1
+                if self._batches % PRUNE_EVERY == 0:
+                    await self._prune(db)
+
+                await db.commit()
+                break
+            except IntegrityError:
+                await db.rollback()
+                if attempt == MAX_ATTEMPTS - 1:
+                    raise
+
+        report["duplicates"] += len(tracked) - len(new_ids)
+        report["recorded"] = matched
+        report["unmatched"] = len(new_ids) - matched
+        return report
+
+    async def record_engagement_events(self, db: AsyncSession, events: List[Dict]) -> int:
+        """
+        Match webhook events to email engagements and append them to the
+        engagement event log. Returns the number of events matched. Does not commit.
+        """
+        refs = [(self._engagement_ref(event), event) for event in events]
+        engagement_ids = {ref for ref, _ in refs if isinstance(ref, int)}
+        message_ids = {ref if isinstance(ref, str) else ref[0] for ref, _ in refs if isinstance(ref, (str, tuple))}
+        conditions = []
+        if engagement_ids:
+            conditions.append(Engagement.id.in_(engagement_ids))
+        if message_ids:
+            conditions.append(Engagement.message_id.in_(message_ids))
+        if not conditions:
+            return 0
+
+        engagements = {}
+        for row in (await db.execute(
+            select(Engagement.id, Engagement.prospect_id, Engagement.message_id).where(
+                or_(*conditions), Engagement.type == "email"
+            )
+        )).all():
+            engagements[row.id] = row
+            if row.message_id:
+                engagements[row.message_id] = row
+                engagements[(row.message_id, row.prospect_id)] = row
+
+        rows = []
+        for ref, event in refs:
+            engagement = engagements.get(ref)
+            if engagement is None:
+                continue
+            rows.append({
+                "engagement_id": engagement.id,
+                "prospect_id": engagement.prospect_id,
+                "event_type": event["event"],
+                "occurred_at": self._occurred_at(event),
+            })
+
+        await self.event_service.record_many(db, rows)
+        return len(rows)
+
+    def _engagement_ref(self, event: Dict):
+        """
+        An engagement_id custom arg when present (emails sent before engagements
+        were recorded after the send), otherwise the SendGrid message id, paired
+        with the prospect_id custom arg that tells apart recipients of one request.
+        """
+        try:
+            if event.get("engagement_id") is not None:
+                return int(event["engagement_id"])
+        except (TypeError, ValueError):
+            pass
+        if not event.get("sg_message_id"):
+            return None
+        # sg_message_id is the X-Message-Id returned on send plus a ".filter..." suffix
+        message_id = str(event["sg_message_id"]).split(".")[0]
+        try:
+            if event.get("prospect_id") is not None:
+                return message_id, int(event["prospect_id"])
+        except (TypeError, ValueError):
+            pass
+        return message_id
+
+    def _occurred_at(self, event: Dict) -> Optional[datetime]:
+        try:
+            return datetime.utcfromtimestamp(int(event["timestamp"]))
+        except (KeyError, TypeError, ValueError, OverflowError, OSError):
+            return None
+
+    async def _claim_new_events(self, db: AsyncSession, events: Dict[str, Dict]) -> Set[str]:
+        """
+        Record event ids as processed and return the ones not seen before.
+        """
+        if not events:
+            return set()
+
+        now = datetime.utcnow()
+        rows = [
+            {"sg_event_id": event_id, "event": event["event"], "received_at": now}
+            for event_id, event in events.items()
+        ]
+
+        if db.bind.dialect.name == "postgresql":
+            result = await db.execute(
+                pg_insert(ProcessedWebhookEvent).values(rows).on_conflict_do_nothing(
+                    index_elements=[ProcessedWebhookEvent.sg_event_id]
+                ).returning(ProcessedWebhookEvent.sg_event_id)
+            )
+            return set(result.scalars().all())
+
+        # Elsewhere a concurrent claim surfaces as an IntegrityError and the batch is retried
+        existing = set((await db.scalars(
+            select(ProcessedWebhookEvent.sg_event_id).where(ProcessedWebhookEvent.sg_event_id.in_(events.keys()))
+        )).all())
+        new_rows = [row for row in rows if row["sg_event_id"] not in existing]
+        if new_rows:
+            await db.execute(insert(ProcessedWebhookEvent), new_rows)
+        return {row["sg_event_id"] for row in new_rows}
+
+    async def _prune(self, db: AsyncSession) -> None:
+        cutoff = datetime.utcnow() - timedelta(hours=settings.WEBHOOK_DEDUPE_RETENTION_HOURS)
+        await db.execute(delete(ProcessedWebhookEvent).where(ProcessedWebhookEvent.received_at < cutoff))
@@ -0,0 +1,180 @@
+import codecs
+import csv
+import itertools
+import shutil
+import tempfile
+from typing import AsyncIterator, BinaryIO, Dict, Iterable, Iterator, List
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.models.prospect import Prospect
+from app.schemas.prospect import ProspectCreate
+from starlette.concurrency import run_in_threadpool
+
+
+CSV_COLUMNS = ["company_name", "industry", "website", "contact_person", "email", "phone"]
+
+# Bytes read from an upload at a time
+CSV_READ_SIZE = 64 * 1024
+
+
+def csv_lines(csv_file: BinaryIO, read_size: int = CSV_READ_SIZE) -> Iterator[str]:
+    """
+    Decode a binary file incrementally into lines for the csv module, keeping
+    line endings. Only needs read(), unlike TextIOWrapper, which rejects the
+    SpooledTemporaryFile behind UploadFile on Python 3.10.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    while True:
+        data = csv_file.read(read_size)
+        pending += decoder.decode(data, final=not data)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+        if not data:
+            if pending:
+                yield pending
+            return
+
+
+def copy_to_temp_file(source: BinaryIO) -> BinaryIO:
+    """
+    Copy a file into a temporary file owned by the caller, positioned at the start.
+    """
+    copy = tempfile.TemporaryFile()
+    shutil.copyfileobj(source, copy)
+    copy.seek(0)
+    return copy
+
+
+class ImportService:
+    """
+    Set-based prospect import.
+
+    Rows are written in chunks: one query prefetches the company names that
+    already exist, then a single multi-row insert skips conflicts in the
+    database itself, so an import costs a couple of round trips per chunk
+    instead of two per row.
+    """
+
+    def __init__(self, chunk_size: int = settings.IMPORT_CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    async def import_prospects(self, db: AsyncSession, rows: Iterable[Dict]) -> Dict:
+        """
+        Insert prospects that don't exist yet. Returns inserted and skipped counts.
+        """
+        total = inserted = 0
+        chunk: List[Dict] = []
+
+        for row in rows:
+            total += 1
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                inserted += await self.insert_chunk(db, chunk)
+                chunk = []
+
+        if chunk:
+            inserted += await self.insert_chunk(db, chunk)
+
+        return {"total": total, "inserted": inserted, "skipped": total - inserted}
+
+    async def open_csv(self, csv_file: BinaryIO) -> csv.DictReader:
+        """
+        Wrap a binary CSV file in an incremental reader and check its header.
+        """
+        reader = csv.DictReader(csv_lines(csv_file))
+
+        fieldnames = await run_in_threadpool(lambda: reader.fieldnames)
+        missing = [column for column in ("company_name", "industry") if column not in (fieldnames or [])]
+        if missing:
+            raise ValueError(f"CSV is missing required columns: {', '.join(missing)}")
+
+        return reader
+
+    async def import_csv(self, db: AsyncSession, reader: csv.DictReader) -> AsyncIterator[Dict]:
+        """
+        Import prospects from a CSV reader without loading the file into memory.
+
+        Rows are parsed incrementally, validated against ProspectCreate and
+        written one chunk per transaction. A progress report is yielded after
+        every chunk; the last one has "done" set.
+        """
+        progress = {"total": 0, "inserted": 0, "skipped": 0, "invalid": 0, "errors": [], "done": False}
+
+        while True:
+            # File reads happen off the event loop, one chunk at a time
+            rows = await run_in_threadpool(lambda: list(itertools.islice(reader, self.chunk_size)))
+            if not rows:
+                break
+
+            valid_rows = []
+            for row in rows:
+                progress["total"] += 1
+                try:
+                    prospect = ProspectCreate(**{
+                        column: (row.get(column) or "").strip() or None for column in CSV_COLUMNS
+                    })
+                except ValidationError as e:
+                    progress["invalid"] += 1
+                    if len(progress["errors"]) < settings.IMPORT_MAX_REPORTED_ERRORS:
+                        progress["errors"].append({
+                            "row": progress["total"],
+                            "error": "; ".join(
+                                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+                            )
+                        })
+                    continue
+                valid_rows.append({**prospect.dict(), "website": str(prospect.website) if prospect.website else None})
+
+            inserted = await self.insert_chunk(db, valid_rows) if valid_rows else 0
+            progress["inserted"] += inserted
+            progress["skipped"] += len(valid_rows) - inserted
+            yield dict(progress)
+
+        progress["done"] = True
+        yield progress
+
+    async def insert_chunk(self, db: AsyncSession, rows: List[Dict]) -> int:
+        """
+        Insert one chunk of rows in a single transaction and return how many were new.
+        """
+        # Keep the first occurrence of each company name within the chunk
+        unique_rows = {}
+        for row in rows:
+            unique_rows.setdefault(row["company_name"], row)
+
+        existing = set((await db.scalars(
+            select(Prospect.company_name).where(Prospect.company_name.in_(unique_rows.keys()))
+        )).all())
+        new_rows = [row for name, row in unique_rows.items() if name not in existing]
+
+        if not new_rows:
+            return 0
+
+        inserted = await self._insert_ignoring_conflicts(db, new_rows)
+        await db.commit()
+        return inserted
+
+    async def _insert_ignoring_conflicts(self, db: AsyncSession, rows: List[Dict]) -> int:
+        """
+        Multi-row insert that skips rows whose company name was taken concurrently.
+        """
+        dialect = db.bind.dialect.name
+
+        if dialect == "postgresql":
+            statement = pg_insert(Prospect).values(rows).on_conflict_do_nothing(
+                index_elements=[Prospect.company_name]
+            ).returning(Prospect.id)
+            result = await db.execute(statement)
+            return len(result.all())
+
+        if dialect == "mysql":
+            result = await db.execute(insert(Prospect).values(rows).prefix_with("IGNORE"))
+            return result.rowcount
+
+        result = await db.execute(insert(Prospect).values(rows))
+        return result.rowcount
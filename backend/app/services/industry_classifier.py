@@ -0,0 +1,122 @@
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+from app.config import settings
+
+
+# Category -> patterns, in priority order: when several categories match, the
+# first listed wins. A pattern matches whole words; a trailing * makes it
+# match any word starting with it.
+DEFAULT_TAXONOMY = {
+    "technology": ["tech*", "software*", "it", "computer*", "digital*", "saas", "internet", "cyber*", "fintech", "edtech"],
+    "finance": ["financ*", "bank*", "invest*", "insur*", "capital*", "accounting", "wealth"],
+    "healthcare": ["health*", "medic*", "hospital", "hospitals", "pharma*", "care", "clinic*", "dental", "biotech*"],
+    "retail": ["retail*", "shop*", "store", "stores", "ecommerce", "e commerce", "commerce", "grocery"],
+    "manufacturing": ["manufactur*", "factory", "factories", "production", "industrial*"],
+}
+
+DEFAULT_CATEGORY = "other"
+
+# Anything that isn't a letter or digit separates words
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    return NON_WORD_PATTERN.sub(" ", text.lower()).strip()
+
+
+class IndustryClassifier:
+    """
+    Maps free-text industries onto a fixed taxonomy of categories.
+
+    The taxonomy's patterns are compiled into one character trie, and an
+    industry is classified in a single pass: each word start walks the trie
+    as far as the text allows, so the cost depends on the length of the
+    industry rather than on the number of patterns. Results are memoized per
+    distinct industry string, which is what makes bulk classification of
+    prospects cheap, since a campaign has far fewer industries than prospects.
+    """
+    def __init__(self, taxonomy: Optional[Dict[str, List[str]]] = None, cache_size: int = settings.INDUSTRY_CLASSIFIER_CACHE_SIZE):
+        self.taxonomy = taxonomy or DEFAULT_TAXONOMY
+        self.categories = list(self.taxonomy)
+        self._trie: Dict = {}
+        for priority, (category, patterns) in enumerate(self.taxonomy.items()):
+            for pattern in patterns:
+                self._add(pattern, priority)
+        self._classify_cached = lru_cache(maxsize=cache_size)(self._classify)
+
+    def _add(self, pattern: str, priority: int) -> None:
+        prefix = pattern.endswith("*")
+        words = normalize(pattern.rstrip("*"))
+        if not words:
+            raise ValueError(f"Empty industry pattern: {pattern!r}")
+
+        node = self._trie
+        for char in words:
+            node = node.setdefault(char, {})
+        # Keep the highest priority category when patterns repeat across categories
+        key = "prefix" if prefix else "word"
+        node[key] = min(node.get(key, priority), priority)
+
+    def classify(self, industry: Optional[str]) -> str:
+        """
+        Return the taxonomy category for an industry, or "other" if none matches.
+        """
+        if not industry:
+            return DEFAULT_CATEGORY
+        return self._classify_cached(industry)
+
+    def classify_many(self, industries: Iterable[Optional[str]]) -> List[str]:
+        """
+        Classify industries in bulk. Repeated strings are looked up once.
+        """
+        classify = self.classify
+        return [classify(industry) for industry in industries]
+
+    def cache_info(self) -> Dict:
+        info = self._classify_cached.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+    def _classify(self, industry: str) -> str:
+        text = normalize(industry)
+        length = len(text)
+        best = None
+
+        for start in range(length):
+            if start and text[start - 1] != " ":
+                continue
+
+            node = self._trie
+            position = start
+            while position < length:
+                node = node.get(text[position])
+                if node is None:
+                    break
+                position += 1
+
+                at_word_end = position == length or text[position] == " "
+                for key in ("prefix", "word"):
+                    priority = node.get(key)
+                    if priority is not None and (key == "prefix" or at_word_end):
+                        if best is None or priority < best:
+                            best = priority
+
+            if best == 0:
+                break
+
+        return self.categories[best] if best is not None else DEFAULT_CATEGORY
+
+
+def load_taxonomy(path: Optional[str]) -> Optional[Dict[str, List[str]]]:
+    """
+    Read a {category: [patterns]} taxonomy from a JSON file, or None for the default.
+    """
+    if not path:
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+# Shared so the memoized results serve every caller
+industry_classifier = IndustryClassifier(load_taxonomy(settings.INDUSTRY_TAXONOMY_PATH))
@@ -0,0 +1,105 @@
+from typing import Dict, List
+from app.services.industry_classifier import industry_classifier
+
+
+# Keywords, pain points and selling points used to personalize outreach per industry
+INDUSTRY_SPECIFICS = {
+    "technology": {
+        "keywords": ["innovation", "digital transformation", "security", "scalability"],
+        "pain_points": ["data breaches", "tech obsolescence", "rapid growth risks"],
+        "selling_points": [
+            "Tech-specific liability coverage",
+            "Cyber insurance tailored for tech companies",
+            "Coverage that scales with your company"
+        ]
+    },
+    "finance": {
+        "keywords": ["security", "compliance", "ROI", "risk management"],
+        "pain_points": ["regulatory compliance", "financial liability", "client trust"],
+        "selling_points": [
+            "Comprehensive financial liability protection",
+            "Specialized coverage for financial institutions",
+            "Client trust protection insurance"
+        ]
+    },
+    "healthcare": {
+        "keywords": ["compliance", "patient care", "efficiency", "risk mitigation"],
+        "pain_points": ["medical malpractice", "HIPAA compliance", "healthcare costs"],
+        "selling_points": [
+            "HIPAA-compliant insurance solutions",
+            "Medical malpractice coverage",
+            "Healthcare-specific liability insurance"
+        ]
+    },
+    "retail": {
+        "keywords": ["customer experience", "inventory", "liability", "business continuity"],
+        "pain_points": ["property damage", "business interruption", "product liability"],
+        "selling_points": [
+            "Retail-specific property insurance",
+            "Business interruption coverage",
+            "Product liability protection"
+        ]
+    },
+    "manufacturing": {
+        "keywords": ["efficiency", "safety", "supply chain", "equipment"],
+        "pain_points": ["workplace injuries", "equipment failure", "supply chain disruptions"],
+        "selling_points": [
+            "Worker's compensation tailored for manufacturing",
+            "Equipment breakdown coverage",
+            "Supply chain interruption insurance"
+        ]
+    }
+}
+
+GENERIC_SPECIFICS = {
+    "keywords": ["protection", "coverage", "risk management"],
+    "pain_points": ["liability risks", "unexpected costs", "business interruptions"],
+    "selling_points": [
+        "Comprehensive business insurance",
+        "Customized insurance solutions",
+        "Risk management expertise"
+    ]
+}
+
+# Objections prospects in each industry are likely to raise
+INDUSTRY_OBJECTIONS = {
+    "technology": ["We already have cyber insurance", "Our tech stack is secure", "Insurance is too expensive"],
+    "finance": ["We're already heavily insured", "We handle risk internally", "Regulatory compliance is sufficient"],
+    "healthcare": ["Our existing malpractice coverage is enough", "We're too small to need comprehensive coverage", "HIPAA compliance is our priority"],
+    "retail": ["Our business is too small", "We don't have valuable physical assets", "Online retail has different needs"],
+    "manufacturing": ["We have long-standing insurance partners", "Our safety record is excellent", "Our equipment is well-maintained"]
+}
+
+GENERIC_OBJECTIONS = ["We already have insurance", "It's too expensive", "We don't see the value"]
+
+
+def _build_profile(name: str, specifics: Dict, objections: List[str]) -> Dict:
+    return {
+        "name": name,
+        "industry_specifics": specifics,
+        "objections": objections,
+        # Prompt fields, joined once here instead of on every request
+        "prompt_fields": {
+            "keywords": ", ".join(specifics["keywords"]),
+            "pain_points": ", ".join(specifics["pain_points"]),
+            "selling_points": ", ".join(specifics["selling_points"]),
+            "objections": "\n".join(f"- {objection}" for objection in objections),
+        }
+    }
+
+
+# Built once at import
+INDUSTRY_PROFILES = {
+    name: _build_profile(name, specifics, INDUSTRY_OBJECTIONS[name])
+    for name, specifics in INDUSTRY_SPECIFICS.items()
+}
+
+GENERIC_PROFILE = _build_profile("other", GENERIC_SPECIFICS, GENERIC_OBJECTIONS)
+
+
+def industry_profile(industry: str) -> Dict:
+    """
+    Return the precomputed profile for a free-text industry, falling back to
+    the generic profile when it doesn't classify as a known industry.
+    """
+    return INDUSTRY_PROFILES.get(industry_classifier.classify(industry), GENERIC_PROFILE)
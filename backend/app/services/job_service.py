@@ -0,0 +1,166 @@
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
+from sqlalchemy import or_, and_, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import SessionLocal
+from app.models.job import Job, JobItem
+from app.tracing import traced
+
+
+class JobLostError(Exception):
+    """
+    Raised when a worker writes to a job that another worker has since reclaimed.
+    """
+    def __init__(self, job_id: int, worker_id: str):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        super().__init__(f"Job {job_id} is no longer held by worker {worker_id}")
+
+
+class JobService:
+    """
+    Persistent job queue backed by the jobs and job_items tables.
+
+    Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED, so several worker
+    processes can share the queue, and every processed item is checkpointed so a
+    job interrupted by a restart resumes where it left off.
+
+    The holder keeps a job alive with heartbeats. Checkpoints and the final
+    status only apply while the job is still held by the worker writing them,
+    so a worker whose job was reclaimed as stale stops instead of racing the
+    new holder.
+    """
+
+    @traced()
+    async def enqueue_batch_send(
+        self,
+        db: AsyncSession,
+        prospect_ids: List[int],
+        token_budget: Optional[int] = None
+    ) -> Job:
+        """
+        Create a send_batch job with one pending item per prospect. The job
+        stops generating once it has spent token_budget LLM tokens. Repeated
+        ids are queued once, in the order they first appear.
+        """
+        prospect_ids = list(dict.fromkeys(prospect_ids))
+        job = Job(type="send_batch", status="pending", total=len(prospect_ids), token_budget=token_budget)
+        db.add(job)
+        await db.flush()
+
+        if prospect_ids:
+            await db.execute(
+                insert(JobItem),
+                [{"job_id": job.id, "prospect_id": pid, "status": "pending"} for pid in prospect_ids]
+            )
+
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    @traced()
+    async def claim_next(self, db: AsyncSession, worker_id: str) -> Optional[Job]:
+        """
+        Claim the oldest pending job, or a running job whose worker stopped
+        sending heartbeats, without blocking on jobs other workers hold.
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS)
+
+        job = await db.scalar(
+            select(Job).where(
+                or_(
+                    Job.status == "pending",
+                    and_(Job.status == "running", Job.heartbeat_at < stale_before)
+                )
+            ).order_by(Job.created_at).limit(1).with_for_update(skip_locked=True)
+        )
+
+        if not job:
+            await db.rollback()
+            return None
+
+        job.status = "running"
+        job.worker_id = worker_id
+        job.heartbeat_at = datetime.utcnow()
+        await db.commit()
+        await db.refresh(job)
+        return job
+
+    async def pending_prospect_ids(self, db: AsyncSession, job_id: int) -> List[int]:
+        """
+        Get the prospects of a job that have not been checkpointed yet.
+        """
+        result = await db.scalars(
+            select(JobItem.prospect_id).where(
+                JobItem.job_id == job_id,
+                JobItem.status == "pending"
+            ).order_by(JobItem.id)
+        )
+        return list(result.all())
+
+    def _held_by(self, job_id: int, worker_id: str):
+        return and_(Job.id == job_id, Job.worker_id == worker_id, Job.status == "running")
+
+    async def heartbeat(self, job_id: int, worker_id: str) -> bool:
+        """
+        Refresh a held job's heartbeat. Returns False if the worker no longer holds it.
+        """
+        async with SessionLocal() as db:
+            result = await db.execute(
+                update(Job).where(self._held_by(job_id, worker_id)).values(heartbeat_at=datetime.utcnow())
+            )
+            await db.commit()
+            return result.rowcount > 0
+
+    @traced()
+    async def record_result(self, job_id: int, worker_id: str, result: Dict) -> None:
+        """
+        Checkpoint a single prospect's result and bump the job's progress counters.
+        Raises JobLostError, writing nothing, if the worker no longer holds the job.
+        """
+        async with SessionLocal() as db:
+            try:
+                failed = result["status"] == "failed"
+                held = await db.execute(
+                    update(Job).where(self._held_by(job_id, worker_id)).values(
+                        processed=Job.processed + 1,
+                        failed=Job.failed + (1 if failed else 0),
+                        heartbeat_at=datetime.utcnow()
+                    )
+                )
+                if not held.rowcount:
+                    raise JobLostError(job_id, worker_id)
+
+                await db.execute(
+                    update(JobItem).where(
+                        JobItem.job_id == job_id,
+                        JobItem.prospect_id == result["prospect_id"]
+                    ).values(
+                        status=result["status"],
+                        engagement_id=result.get("engagement_id"),
+                        error=result.get("error"),
+                        processed_at=datetime.utcnow()
+                    )
+                )
+                await db.commit()
+            except Exception as e:
+                print(f"Error checkpointing job {job_id}: {e}")
+                await db.rollback()
+                raise
+
+    @traced()
+    async def finish(self, db: AsyncSession, job_id: int, worker_id: str, error: Optional[str] = None) -> bool:
+        """
+        Mark a job as completed, or failed if it stopped with an error. Returns
+        False, leaving the job alone, if the worker no longer holds it.
+        """
+        result = await db.execute(
+            update(Job).where(self._held_by(job_id, worker_id)).values(
+                status="failed" if error else "completed",
+                error=error,
+                completed_at=datetime.utcnow()
+            )
+        )
+        await db.commit()
+        return result.rowcount > 0
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from sqlalchemy import delete, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import SessionLocal
+from app.models.llm_cache import LLMCacheEntry
+
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM responses.
+
+    Responses are keyed by a hash of (model, system message, prompt). Lookups go
+    to an in-process LRU first and, when enabled, fall back to the
+    llm_cache_entries table so cached responses are shared across workers.
+    """
+    def __init__(
+        self,
+        max_entries: int = settings.LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.LLM_CACHE_TTL_SECONDS,
+        sql_enabled: bool = settings.LLM_CACHE_SQL_ENABLED,
+        sql_max_entries: int = settings.LLM_CACHE_SQL_MAX_ENTRIES
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sql_enabled = sql_enabled
+        self.sql_max_entries = sql_max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, response)
+        self._sql_writes = 0
+        self.hits = 0
+        self.sql_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, system: str, prompt: str) -> str:
+        payload = json.dumps([model, system, prompt], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[str]:
+        """
+        Get a cached response, or None if it is missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry:
+            expires_at, response = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return response
+            del self._entries[key]
+
+        if self.sql_enabled:
+            response = await self._sql_get(key)
+            if response is not None:
+                self._memory_put(key, response)
+                self.sql_hits += 1
+                return response
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, model: str, response: str) -> None:
+        """
+        Store a response in every enabled tier.
+        """
+        self._memory_put(key, response)
+        if self.sql_enabled:
+            await self._sql_put(key, model, response)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.sql_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "sql_enabled": self.sql_enabled,
+            "hits": self.hits,
+            "sql_hits": self.sql_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits + self.sql_hits) / lookups if lookups else 0.0
+        }
+
+    def _memory_put(self, key: str, response: str) -> None:
+        self._entries[key] = (time.time() + self.ttl_seconds, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _sql_get(self, key: str) -> Optional[str]:
+        async with SessionLocal() as db:
+            try:
+                return await db.scalar(
+                    select(LLMCacheEntry.response).where(
+                        LLMCacheEntry.key == key,
+                        LLMCacheEntry.expires_at > datetime.utcnow()
+                    )
+                )
+            except Exception as e:
+                print(f"Error reading LLM cache: {e}")
+                return None
+
+    async def _sql_put(self, key: str, model: str, response: str) -> None:
+        async with SessionLocal() as db:
+            try:
+                now = datetime.utcnow()
+                await db.merge(LLMCacheEntry(
+                    key=key,
+                    model=model,
+                    response=response,
+                    created_at=now,
+                    expires_at=now + timedelta(seconds=self.ttl_seconds)
+                ))
+                await db.commit()
+
+                # Prune expired and overflow rows every so often rather than on every write
+                self._sql_writes += 1
+                if self._sql_writes % 100 == 0:
+                    await self._sql_prune(db)
+            except Exception as e:
+                print(f"Error writing LLM cache: {e}")
+                await db.rollback()
+
+    async def _sql_prune(self, db: AsyncSession) -> None:
+        await db.execute(
+            delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= datetime.utcnow())
+        )
+
+        overflow = await db.scalar(select(func.count()).select_from(LLMCacheEntry)) - self.sql_max_entries
+        if overflow > 0:
+            oldest = (await db.scalars(
+                select(LLMCacheEntry.key).order_by(LLMCacheEntry.created_at).limit(overflow)
+            )).all()
+            await db.execute(
+                delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(oldest))
+            )
+
+        await db.commit()
+
+
+# Shared cache so every service instance benefits from the same entries
+llm_cache = LLMCache()
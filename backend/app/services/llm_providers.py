@@ -0,0 +1,249 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+from typing import AsyncIterator, Dict, Optional, Tuple
+from app.config import settings
+from app.services.rate_limiter import groq_limiter
+from app.tracing import set_attributes, traced
+
+
+class LLMProvider:
+    """
+    Interface for chat model backends used by AIService.
+
+    Providers are addressed as "<provider>:<model>" and keep running usage
+    counters so callers can report calls and tokens per backend.
+    """
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+        self.usage = {"calls": 0, "input_tokens": 0, "output_tokens": 0}
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.name}:{self.model}"
+
+    async def complete(self, system: str, prompt: str, json_mode: bool = False, usage: Optional[Dict] = None) -> str:
+        """
+        Return the model's full response to a system + user prompt. With
+        json_mode the backend is asked to constrain its output to a JSON object.
+        The call's input_tokens and output_tokens are written into usage if given.
+        """
+        raise NotImplementedError
+
+    async def stream(self, system: str, prompt: str, usage: Optional[Dict] = None) -> AsyncIterator[str]:
+        """
+        Yield the model's response to a system + user prompt chunk by chunk.
+        The call's token counts are written into usage once the stream ends.
+        """
+        raise NotImplementedError
+        yield
+
+    async def aclose(self) -> None:
+        """
+        Close the backend's clients. Usage counters are kept, and a provider
+        used again after closing builds new clients.
+        """
+
+    def _record_usage(self, input_tokens: int, output_tokens: int, usage: Optional[Dict] = None) -> None:
+        self.usage["calls"] += 1
+        self.usage["input_tokens"] += input_tokens
+        self.usage["output_tokens"] += output_tokens
+        if usage is not None:
+            usage["input_tokens"] = input_tokens
+            usage["output_tokens"] = output_tokens
+
+
+class GroqProvider(LLMProvider):
+    """
+    Groq-hosted models through LangChain, sharing a rate limiter per model.
+    """
+    name = "groq"
+
+    def __init__(self, model: str):
+        super().__init__(model)
+        self._chat_model = None
+
+    @property
+    def chat_model(self):
+        # Built on first use, so processes that never generate don't pay for it
+        if self._chat_model is None:
+            from langchain_groq import ChatGroq
+
+            self._chat_model = ChatGroq(
+                api_key=settings.GROQ_API_KEY,
+                model_name=self.model
+            )
+        return self._chat_model
+
+    async def aclose(self) -> None:
+        if self._chat_model is None:
+            return
+        chat_model, self._chat_model = self._chat_model, None
+        # ChatGroq holds the Groq SDK's completions resources; the HTTP clients sit behind them
+        async_client = getattr(chat_model.async_client, "_client", None)
+        if async_client is not None:
+            await async_client.close()
+        client = getattr(chat_model.client, "_client", None)
+        if client is not None:
+            client.close()
+
+    def _messages(self, system: str, prompt: str):
+        from langchain_core.messages import SystemMessage, HumanMessage
+
+        return [
+            SystemMessage(content=system),
+            HumanMessage(content=prompt)
+        ]
+
+    @staticmethod
+    def _token_counts(message) -> Tuple[int, int]:
+        """
+        Input and output tokens of a response, from LangChain's usage_metadata
+        or, for older clients, the token_usage Groq reports in response_metadata.
+        """
+        usage_metadata = getattr(message, "usage_metadata", None)
+        if usage_metadata:
+            return usage_metadata.get("input_tokens", 0), usage_metadata.get("output_tokens", 0)
+        token_usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+        return token_usage.get("prompt_tokens", 0), token_usage.get("completion_tokens", 0)
+
+    @traced()
+    async def complete(self, system: str, prompt: str, json_mode: bool = False, usage: Optional[Dict] = None) -> str:
+        await groq_limiter(self.model).acquire()
+        chat_model = self.chat_model
+        if json_mode:
+            chat_model = chat_model.bind(response_format={"type": "json_object"})
+        response = await chat_model.ainvoke(self._messages(system, prompt))
+
+        input_tokens, output_tokens = self._token_counts(response)
+        self._record_usage(input_tokens, output_tokens, usage)
+        set_attributes(
+            **{"llm.model": self.model, "llm.input_tokens": input_tokens, "llm.output_tokens": output_tokens}
+        )
+        return response.content
+
+    async def stream(self, system: str, prompt: str, usage: Optional[Dict] = None) -> AsyncIterator[str]:
+        await groq_limiter(self.model).acquire()
+        input_tokens = output_tokens = streamed_chars = 0
+        async for chunk in self.chat_model.astream(self._messages(system, prompt)):
+            chunk_input, chunk_output = self._token_counts(chunk)
+            input_tokens += chunk_input
+            output_tokens += chunk_output
+            if chunk.content:
+                streamed_chars += len(chunk.content)
+                yield chunk.content
+
+        # langchain-groq has no stream_usage option and only reports usage when
+        # Groq sends it on the last chunk, so estimate rather than record nothing
+        if not input_tokens and not output_tokens:
+            input_tokens, output_tokens = len(system + prompt) // 4, streamed_chars // 4
+        self._record_usage(input_tokens, output_tokens, usage)
+
+
+# Sentences the local provider draws from
+LOCAL_SENTENCES = [
+    "Businesses like yours face risks that generic policies rarely cover well.",
+    "We build coverage around the specific exposures of your industry.",
+    "Our clients typically cut uncovered losses within the first policy year.",
+    "A short review of your current coverage usually surfaces a few quick wins.",
+    "We handle the paperwork so your team can stay focused on operations.",
+    "Premiums are benchmarked against companies of a similar size and profile.",
+    "Follow up within three business days, by phone first and then by email.",
+    "Lead with industry-specific risks and answer cost objections with ROI.",
+]
+
+# Field names in a JSON output format given in the instructions
+OUTPUT_FIELD_PATTERN = re.compile(r'"(\w+)"\s*:\s*"')
+
+
+class LocalProvider(LLMProvider):
+    """
+    Deterministic offline stand-in for a hosted model.
+
+    The same prompt always produces the same response, after a configurable
+    delay, so the pipeline can be load tested without network access. Requests
+    that give a JSON output format get a JSON object with those fields.
+    Tokens are estimated at four characters each.
+    """
+    name = "local"
+
+    def __init__(self, model: str = "default", latency_ms: float = settings.LLM_LOCAL_LATENCY_MS):
+        super().__init__(model)
+        self.latency = latency_ms / 1000
+
+    def respond(self, system: str, prompt: str) -> str:
+        seed = hashlib.sha256(f"{self.model}\n{system}\n{prompt}".encode("utf-8")).hexdigest()
+        rng = random.Random(seed)
+
+        def text(sentences: int) -> str:
+            return " ".join(rng.choice(LOCAL_SENTENCES) for _ in range(sentences))
+
+        # The output format is part of the system message for templated prompts
+        instructions = f"{system}\n{prompt}"
+        output_format = instructions.rsplit("Output format:", 1)[1] if "Output format:" in instructions else ""
+        fields = OUTPUT_FIELD_PATTERN.findall(output_format)
+        if not fields:
+            return text(6)
+
+        return json.dumps({
+            field: f"Coverage built for your business ({seed[:6]})" if field == "subject" else text(5)
+            for field in fields
+        })
+
+    @traced()
+    async def complete(self, system: str, prompt: str, json_mode: bool = False, usage: Optional[Dict] = None) -> str:
+        # Prompts with an output format already get JSON, so json_mode changes nothing
+        await asyncio.sleep(self.latency)
+        response = self.respond(system, prompt)
+        self._record_usage(len(system + prompt) // 4, len(response) // 4, usage)
+        return response
+
+    async def stream(self, system: str, prompt: str, usage: Optional[Dict] = None) -> AsyncIterator[str]:
+        response = self.respond(system, prompt)
+        chunks = [response[i:i + 16] for i in range(0, len(response), 16)] or [""]
+
+        # Spend part of the latency before the first token, the rest while streaming
+        await asyncio.sleep(self.latency * 0.3)
+        for chunk in chunks:
+            await asyncio.sleep(self.latency * 0.7 / len(chunks))
+            yield chunk
+
+        self._record_usage(len(system + prompt) // 4, len(response) // 4, usage)
+
+
+PROVIDERS = {
+    GroqProvider.name: GroqProvider,
+    LocalProvider.name: LocalProvider,
+}
+
+# One instance per "<provider>:<model>" so clients and usage counters are shared
+_instances: Dict[str, LLMProvider] = {}
+
+
+def get_provider(spec: str) -> LLMProvider:
+    """
+    Return the provider for a "<provider>:<model>" spec, e.g. "groq:llama3-8b-8192"
+    or "local:fast". A bare model name is treated as a Groq model.
+    """
+    name, sep, model = spec.partition(":")
+    if not sep:
+        name, model = GroqProvider.name, spec
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown LLM provider: {name}")
+
+    key = f"{name}:{model}"
+    if key not in _instances:
+        _instances[key] = PROVIDERS[name](model)
+    return _instances[key]
+
+
+async def close_providers() -> None:
+    """
+    Close the clients of every provider built so far.
+    """
+    for provider in list(_instances.values()):
+        await provider.aclose()
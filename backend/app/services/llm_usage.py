@@ -0,0 +1,286 @@
+import asyncio
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import case, func, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import count_llm_tokens, industry_label
+from app.models.llm_usage import LLMUsage
+
+
+class TokenBudgetExceeded(Exception):
+    """
+    Raised before an LLM call once the current campaign has spent its token budget.
+    """
+    def __init__(self, campaign: str, budget: int, used: int):
+        self.campaign = campaign
+        self.budget = budget
+        self.used = used
+        super().__init__(f"Token budget of {budget} exceeded for campaign {campaign} ({used} tokens used)")
+
+
+class CampaignBudget:
+    """
+    Tokens spent by a campaign so far, shared by every task generating for it.
+    """
+    def __init__(self, name: str, budget: Optional[int], used: int = 0):
+        self.name = name
+        self.budget = budget
+        self.used = used
+
+    @property
+    def exceeded(self) -> bool:
+        return self.budget is not None and self.used >= self.budget
+
+
+prospect_var: ContextVar[Optional[int]] = ContextVar("llm_usage_prospect", default=None)
+campaign_var: ContextVar[Optional[CampaignBudget]] = ContextVar("llm_usage_campaign", default=None)
+
+
+class LLMUsageRecorder:
+    """
+    Records tokens and latency of every LLM call in the llm_usage table.
+
+    The prospect and campaign a call is made for are picked up from context
+    variables, like the metrics labels, so AIService doesn't need them passed
+    in. Rows are buffered and written with one multi-row insert when
+    flush_size are waiting or flush_seconds after the first one arrived.
+
+    Budgets are checked before each provider call against the tokens recorded
+    so far, so concurrent calls already in flight can overshoot a budget by at
+    most one reply each.
+    """
+
+    def __init__(
+        self,
+        flush_size: int = settings.LLM_USAGE_FLUSH_SIZE,
+        flush_seconds: float = settings.LLM_USAGE_FLUSH_SECONDS,
+        prices: Dict[str, Dict[str, float]] = settings.LLM_TOKEN_PRICES
+    ):
+        self.flush_size = flush_size
+        self.flush_seconds = flush_seconds
+        self.prices = prices
+        self._pending: List[Dict] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._writes: set = set()
+
+    def set_prospect(self, prospect_id: Optional[int]) -> None:
+        prospect_var.set(prospect_id)
+
+    def set_campaign(self, campaign: Optional[CampaignBudget]) -> None:
+        campaign_var.set(campaign)
+
+    async def load_campaign(self, db: AsyncSession, name: str, budget: Optional[int]) -> CampaignBudget:
+        """
+        Get a campaign's budget with the tokens it already spent, so a resumed
+        job keeps counting from where it stopped.
+        """
+        await self.flush()
+        used = await db.scalar(
+            select(func.coalesce(func.sum(LLMUsage.input_tokens + LLMUsage.output_tokens), 0)).where(
+                LLMUsage.campaign == name
+            )
+        )
+        return CampaignBudget(name, budget, int(used or 0))
+
+    def check_budget(self) -> None:
+        """
+        Raise TokenBudgetExceeded if the current campaign has spent its budget.
+        """
+        campaign = campaign_var.get()
+        if campaign is not None and campaign.exceeded:
+            raise TokenBudgetExceeded(campaign.name, campaign.budget, campaign.used)
+
+    def record(
+        self,
+        task: str,
+        model_id: str,
+        input_tokens: int,
+        output_tokens: int,
+        latency_ms: float,
+        cached: bool = False
+    ) -> None:
+        """
+        Count one LLM call against the current campaign and queue its usage row.
+        """
+        campaign = campaign_var.get()
+        if campaign is not None:
+            campaign.used += input_tokens + output_tokens
+        count_llm_tokens(model_id, input_tokens, output_tokens)
+
+        self._pending.append({
+            "created_at": datetime.utcnow(),
+            "task": task,
+            "model_id": model_id,
+            "prospect_id": prospect_var.get(),
+            "campaign": campaign.name if campaign else None,
+            "industry": industry_label.get(),
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "latency_ms": latency_ms,
+            "cached": cached,
+        })
+
+        if len(self._pending) >= self.flush_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> None:
+        """
+        Write every queued row and wait for writes in flight.
+        """
+        self._flush()
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        await self.flush()
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.flush_seconds)
+        self._timer = None
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        rows, self._pending = self._pending, []
+        task = asyncio.create_task(self._write(rows))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+
+    async def _write(self, rows: List[Dict]) -> None:
+        async with SessionLocal() as db:
+            try:
+                await db.execute(insert(LLMUsage), rows)
+                await db.commit()
+            except Exception as e:
+                print(f"Error recording LLM usage: {e}")
+                await db.rollback()
+
+    def _cost(self):
+        """
+        SQL expression for the cost of a row in USD, from LLM_TOKEN_PRICES.
+        Models without a price cost nothing.
+        """
+        if not self.prices:
+            return literal(0.0)
+        return case(
+            *[
+                (
+                    LLMUsage.model_id == model_id,
+                    (LLMUsage.input_tokens * price.get("input", 0.0)
+                     + LLMUsage.output_tokens * price.get("output", 0.0)) / 1e6
+                )
+                for model_id, price in self.prices.items()
+            ],
+            else_=0.0
+        )
+
+    async def stats(
+        self,
+        db: AsyncSession,
+        campaign: Optional[str] = None,
+        since_hours: Optional[float] = None,
+        top_prospects: int = 20
+    ) -> Dict:
+        """
+        Calls, tokens, latency and cost per model and task, per campaign and
+        per prospect, with average prompt size per industry category.
+        """
+        await self.flush()
+
+        filters = []
+        if campaign is not None:
+            filters.append(LLMUsage.campaign == campaign)
+        if since_hours is not None:
+            filters.append(LLMUsage.created_at >= datetime.utcnow() - timedelta(hours=since_hours))
+
+        cost = func.sum(self._cost())
+        input_tokens = func.sum(LLMUsage.input_tokens)
+        output_tokens = func.sum(LLMUsage.output_tokens)
+        calls = func.count(LLMUsage.id)
+        cached_calls = func.sum(case((LLMUsage.cached, 1), else_=0))
+
+        by_model = (await db.execute(
+            select(
+                LLMUsage.model_id, LLMUsage.task, calls, cached_calls, input_tokens, output_tokens,
+                func.avg(case((LLMUsage.cached, None), else_=LLMUsage.latency_ms)), cost
+            ).where(*filters).group_by(LLMUsage.model_id, LLMUsage.task).order_by(LLMUsage.model_id, LLMUsage.task)
+        )).all()
+
+        by_campaign = (await db.execute(
+            select(LLMUsage.campaign, calls, input_tokens, output_tokens, cost).where(
+                *filters, LLMUsage.campaign.is_not(None)
+            ).group_by(LLMUsage.campaign).order_by(cost.desc())
+        )).all()
+
+        # Cache hits spend no tokens, so they'd drag the averages down
+        by_industry = (await db.execute(
+            select(
+                LLMUsage.industry, calls, func.avg(LLMUsage.input_tokens), func.avg(LLMUsage.output_tokens), cost
+            ).where(*filters, LLMUsage.cached.is_(False)).group_by(LLMUsage.industry).order_by(LLMUsage.industry)
+        )).all()
+
+        prospects = (await db.execute(
+            select(LLMUsage.prospect_id, calls, input_tokens, output_tokens, cost).where(
+                *filters, LLMUsage.prospect_id.is_not(None)
+            ).group_by(LLMUsage.prospect_id).order_by((input_tokens + output_tokens).desc()).limit(top_prospects)
+        )).all()
+
+        return {
+            "by_model": [
+                {
+                    "model_id": model_id,
+                    "task": task,
+                    "calls": row_calls,
+                    "cached_calls": int(row_cached or 0),
+                    "input_tokens": int(row_input or 0),
+                    "output_tokens": int(row_output or 0),
+                    "avg_latency_ms": round(latency, 1) if latency is not None else None,
+                    "cost_usd": round(float(row_cost or 0), 6),
+                }
+                for model_id, task, row_calls, row_cached, row_input, row_output, latency, row_cost in by_model
+            ],
+            "by_campaign": [
+                {
+                    "campaign": name,
+                    "calls": row_calls,
+                    "input_tokens": int(row_input or 0),
+                    "output_tokens": int(row_output or 0),
+                    "cost_usd": round(float(row_cost or 0), 6),
+                }
+                for name, row_calls, row_input, row_output, row_cost in by_campaign
+            ],
+            "by_industry": [
+                {
+                    "industry": industry,
+                    "calls": row_calls,
+                    "avg_input_tokens": round(float(avg_input or 0), 1),
+                    "avg_output_tokens": round(float(avg_output or 0), 1),
+                    "cost_usd": round(float(row_cost or 0), 6),
+                }
+                for industry, row_calls, avg_input, avg_output, row_cost in by_industry
+            ],
+            "top_prospects": [
+                {
+                    "prospect_id": prospect_id,
+                    "calls": row_calls,
+                    "input_tokens": int(row_input or 0),
+                    "output_tokens": int(row_output or 0),
+                    "cost_usd": round(float(row_cost or 0), 6),
+                }
+                for prospect_id, row_calls, row_input, row_output, row_cost in prospects
+            ],
+        }
+
+
+# Shared recorder, so every service writes through the same buffer
+llm_usage = LLMUsageRecorder()
@@ -0,0 +1,197 @@
+import textwrap
+from string import Formatter
+from typing import Dict, List, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count at four characters per token.
+    """
+    return len(text) // 4
+
+
+class PromptTemplate:
+    """
+    A prompt compiled into a static system message and a user message template.
+
+    Everything that is the same for every request lives in the system message,
+    so requests share a prefix that providers with prompt caching can reuse,
+    and only the per-prospect details are rendered. The user template is
+    dedented and split into literal text and fields once, when it's defined.
+    Rendered prompt sizes are tracked per template.
+    """
+    def __init__(self, name: str, system: str, prompt: str):
+        self.name = name
+        self.system = textwrap.dedent(system).strip()
+        self.system_tokens = estimate_tokens(self.system)
+        self.fields = set()
+        self._parts: List[Tuple[str, str]] = []
+
+        for literal, field, spec, conversion in Formatter().parse(textwrap.dedent(prompt).strip()):
+            if field == "" or spec or conversion:
+                raise ValueError(f"Prompt template {name} may only use plain named fields")
+            self._parts.append((literal, field))
+            if field is not None:
+                self.fields.add(field)
+
+        self.renders = 0
+        self.prompt_tokens = 0
+
+    def render(self, **values) -> Tuple[str, str]:
+        """
+        Return the (system, user) messages for one request.
+        """
+        missing = self.fields - values.keys()
+        if missing:
+            raise KeyError(f"Prompt template {self.name} is missing fields: {', '.join(sorted(missing))}")
+
+        prompt = "".join(
+            literal + (str(values[field]) if field is not None else "")
+            for literal, field in self._parts
+        )
+
+        self.renders += 1
+        self.prompt_tokens += estimate_tokens(prompt)
+        return self.system, prompt
+
+    def stats(self) -> Dict:
+        avg_prompt_tokens = self.prompt_tokens / self.renders if self.renders else 0.0
+        return {
+            "renders": self.renders,
+            "system_tokens": self.system_tokens,
+            "avg_prompt_tokens": avg_prompt_tokens,
+            "avg_input_tokens": self.system_tokens + avg_prompt_tokens,
+            # Share of each request's input that is an identical, cacheable prefix
+            "static_share": self.system_tokens / (self.system_tokens + avg_prompt_tokens) if self.renders else 0.0
+        }
+
+
+EMAIL_INSTRUCTIONS = """
+You will be given a prospect company, the approach to take with them, industry-specific
+information and objections they are likely to raise. Write a personalized cold email from an
+insurance company to that prospect which emphasizes the keywords, addresses the industry pain
+points, highlights the selling points and subtly addresses the potential objections.
+
+Email structure:
+1. Personalized greeting
+2. Industry-specific hook relating to insurance needs
+3. Value proposition tailored to their industry
+4. Specific offering addressing their potential pain points
+5. The given call to action
+6. Professional signature
+
+Keep the email concise (150-200 words), professional, and focused on value.
+"""
+
+ADVICE_INSTRUCTIONS = """
+The advice should include:
+1. When to follow up (timing)
+2. Best channel for follow-up (phone, email, LinkedIn)
+3. Talking points tailored to their industry
+4. How to handle likely objections
+Keep the advice concise and actionable, under 100 words.
+"""
+
+EMAIL_OUTPUT_FORMAT = """
+Reply with a single JSON object and nothing else.
+Output format:
+{"subject": "Email subject line", "body": "Full email body"}
+"""
+
+EMAIL_WITH_ADVICE_OUTPUT_FORMAT = """
+Reply with a single JSON object and nothing else.
+Output format:
+{"subject": "Email subject line", "body": "Full email body", "advice": "Follow-up advice for the sales rep"}
+"""
+
+EMAIL_PROMPT = """
+Prospect: {company_name}, in the {industry} industry
+Contact person: {contact_person}
+
+Approach: {approach}
+Tone: {tone}
+Focus: {focus}
+Call to action: {call_to_action}
+
+Industry-specific information:
+- Keywords to emphasize: {keywords}
+- Industry pain points to address: {pain_points}
+- Selling points to highlight: {selling_points}
+
+Potential objections:
+{objections}
+"""
+
+EMAIL_TEMPLATE = PromptTemplate(
+    "email",
+    system="You are an expert in writing personalized insurance sales outreach emails.\n"
+    + EMAIL_INSTRUCTIONS
+    + EMAIL_OUTPUT_FORMAT,
+    prompt=EMAIL_PROMPT
+)
+
+EMAIL_WITH_ADVICE_TEMPLATE = PromptTemplate(
+    "email_with_advice",
+    system="You are an expert in writing personalized insurance sales outreach emails and coaching insurance sales reps.\n"
+    + EMAIL_INSTRUCTIONS
+    + "\nAlso provide brief, practical advice for the sales representative on how to follow up with this prospect after sending the email.\n"
+    + ADVICE_INSTRUCTIONS
+    + EMAIL_WITH_ADVICE_OUTPUT_FORMAT,
+    prompt=EMAIL_PROMPT
+)
+
+ADVICE_TEMPLATE = PromptTemplate(
+    "advice",
+    system="You are an expert sales coach specializing in insurance sales.\n"
+    + "\nProvide brief, practical advice for a sales representative on how to follow up with a prospect after sending them an email.\n"
+    + ADVICE_INSTRUCTIONS,
+    prompt="""
+    Company: {company_name}
+    Industry: {industry}
+    Email Subject: {subject}
+    Email Focus: {focus}
+    """
+)
+
+CALL_SCRIPT_TEMPLATE = PromptTemplate(
+    "call_script",
+    system="""
+    You are an expert in writing effective cold call scripts for insurance sales.
+
+    You will be given a prospect company, the approach to take with them and industry-specific
+    information. Write a brief cold call script for an insurance sales representative calling
+    that prospect.
+
+    The script should include:
+    1. Introduction and purpose of the call
+    2. Industry-specific hook
+    3. Key qualifying questions
+    4. Addressing potential objections
+    5. Call to action/next steps
+
+    Format the script with clear sections for each part of the conversation and include [[PAUSE]] where the representative should wait for a response.
+    Keep it conversational, natural, and under 400 words.
+    """,
+    prompt="""
+    Prospect: {company_name}, in the {industry} industry
+    Contact person: {contact_person}
+
+    Approach: {approach}
+    Tone: {tone}
+    Focus: {focus}
+
+    Industry-specific information:
+    - Keywords to emphasize: {keywords}
+    - Industry pain points to address: {pain_points}
+    - Selling points to highlight: {selling_points}
+    """
+)
+
+PROMPT_TEMPLATES = {
+    template.name: template
+    for template in (EMAIL_TEMPLATE, EMAIL_WITH_ADVICE_TEMPLATE, ADVICE_TEMPLATE, CALL_SCRIPT_TEMPLATE)
+}
+
+
+def prompt_template_stats() -> Dict:
+    return {name: template.stats() for name, template in PROMPT_TEMPLATES.items()}
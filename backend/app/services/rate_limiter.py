@@ -0,0 +1,62 @@
+import asyncio
+import time
+from typing import Dict
+from app.config import settings
+
+
+class TokenBucket:
+    """
+    Async token bucket used to keep outbound calls within a provider's quota.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # Tokens added per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def per_minute(cls, requests: int) -> "TokenBucket":
+        return cls(rate=requests / 60.0, capacity=max(1, requests))
+
+    @classmethod
+    def per_second(cls, requests: int) -> "TokenBucket":
+        return cls(rate=float(requests), capacity=max(1, requests))
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """
+        Wait until the requested number of tokens is available and consume them.
+
+        A request for more than the bucket holds waits for a full bucket and
+        leaves it in debt, so later callers wait until the excess is repaid.
+        """
+        needed = min(tokens, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < needed:
+                await asyncio.sleep((needed - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+
+# Shared limiter so every service instance draws from the same SendGrid quota
+sendgrid_limiter = TokenBucket.per_second(settings.SENDGRID_SENDS_PER_SECOND)
+
+# Groq quotas are per model, so each model gets its own limiter
+_groq_limiters: Dict[str, TokenBucket] = {}
+
+
+def groq_limiter(model: str) -> TokenBucket:
+    """
+    Return the shared limiter for a Groq model, limited to its entry in
+    GROQ_MODEL_REQUESTS_PER_MINUTE or to GROQ_REQUESTS_PER_MINUTE.
+    """
+    if model not in _groq_limiters:
+        requests = settings.GROQ_MODEL_REQUESTS_PER_MINUTE.get(model, settings.GROQ_REQUESTS_PER_MINUTE)
+        _groq_limiters[model] = TokenBucket.per_minute(requests)
+    return _groq_limiters[model]
@@ -0,0 +1,95 @@
+import asyncio
+from typing import Dict, List, Optional, Set, Tuple
+from app.config import settings
+from app.database import SessionLocal
+from app.models.engagement import Engagement
+from app.models.prospect import Prospect
+from app.services.email_service import EmailService
+
+
+class SendBatcher:
+    """
+    Groups emails submitted by concurrent batch-send workers into multi-recipient
+    SendGrid requests.
+
+    A request goes out as soon as max_size emails are waiting, or linger seconds
+    after the first one arrived. Each submitter awaits its own engagement.
+    """
+
+    def __init__(
+        self,
+        email_service: EmailService,
+        max_size: int = settings.SENDGRID_PERSONALIZATIONS_PER_REQUEST,
+        linger: float = settings.SENDGRID_BATCH_LINGER_SECONDS
+    ):
+        self.email_service = email_service
+        self.max_size = max_size
+        self.linger = linger
+        self._pending: List[Tuple[Prospect, Dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.Task] = None
+        self._sends: Set[asyncio.Task] = set()
+
+    async def submit(self, prospect: Prospect, email_content: Dict) -> Engagement:
+        """
+        Queue one email and wait until the request carrying it has been sent.
+        """
+        # Fail fast instead of failing everyone else's request
+        self.email_service.check_recipient(prospect)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((prospect, email_content, future))
+
+        if len(self._pending) >= self.max_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+        return await future
+
+    async def close(self) -> None:
+        """
+        Send anything still waiting and wait for in-flight requests.
+        """
+        self._flush()
+        if self._sends:
+            await asyncio.gather(*self._sends, return_exceptions=True)
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.linger)
+        self._timer = None
+        self._flush()
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._send(batch))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _send(self, batch: List[Tuple[Prospect, Dict, asyncio.Future]]) -> None:
+        # Submitters cancelled while waiting for the batch to fill no longer want their email sent
+        batch = [entry for entry in batch if not entry[2].cancelled()]
+        if not batch:
+            return
+
+        # The session only opens a transaction once SendGrid has accepted the emails
+        async with SessionLocal() as db:
+            try:
+                results = await self.email_service.send_emails(
+                    db, [(prospect, email_content) for prospect, email_content, _ in batch]
+                )
+            except Exception as e:
+                results = [e] * len(batch)
+
+        for (_, _, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
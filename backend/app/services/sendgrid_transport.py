@@ -0,0 +1,107 @@
+import asyncio
+import os
+import random
+from typing import Dict, Optional
+import httpx
+from app.config import settings
+from app.tracing import traced
+
+
+# Statuses worth retrying; anything else is returned or raised as is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Errors raised before the request reached SendGrid, so retrying cannot send twice
+RETRY_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class SendGridError(Exception):
+    """
+    Raised when SendGrid rejects a send or keeps failing after all retries.
+    """
+    def __init__(self, status_code: Optional[int], detail: str):
+        super().__init__(f"SendGrid error {status_code}: {detail}")
+        self.status_code = status_code
+        self.detail = detail
+
+
+class SendGridTransport:
+    """
+    Async client for the SendGrid v3 mail send API.
+
+    One pooled httpx client is shared by every send, so concurrent sends reuse
+    keep-alive connections instead of each blocking a thread for a full HTTPS
+    round trip. 429 and 5xx responses and failures to connect are retried
+    with exponential backoff, honouring Retry-After when SendGrid sends it.
+    Errors once the request may have been sent, such as read timeouts, are
+    raised straight away so a retry can't deliver the mail twice.
+    """
+
+    def __init__(
+        self,
+        base_url: str = settings.SENDGRID_API_URL,
+        max_connections: int = settings.SENDGRID_MAX_CONNECTIONS,
+        max_retries: int = settings.SENDGRID_MAX_RETRIES
+    ):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_retries = max_retries
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Created on first use so the client binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={"Authorization": f"Bearer {os.getenv('SENDGRID_API_KEY', '')}"},
+                timeout=settings.SENDGRID_TIMEOUT_SECONDS,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                ),
+            )
+        return self._client
+
+    @traced()
+    async def send(self, payload: Dict) -> str:
+        """
+        POST a mail send payload and return SendGrid's X-Message-Id.
+        """
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = await self.client.post("/v3/mail/send", json=payload)
+            except RETRY_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise SendGridError(None, str(e))
+            except httpx.TransportError as e:
+                raise SendGridError(None, str(e))
+            else:
+                if response.status_code < 300:
+                    return response.headers.get("X-Message-Id", "")
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    raise SendGridError(response.status_code, response.text)
+                retry_after = response.headers.get("Retry-After")
+
+            await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        raise SendGridError(None, "retries exhausted")
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> float:
+        if retry_after:
+            try:
+                return float(retry_after)
+            except ValueError:
+                pass
+        delay = settings.SENDGRID_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+        # Jitter so a burst of throttled sends doesn't retry in lockstep
+        return delay * random.uniform(0.5, 1.5)
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+# Shared transport so every service instance uses the same connection pool
+sendgrid_transport = SendGridTransport()
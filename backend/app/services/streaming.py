@@ -0,0 +1,86 @@
+import json
+import re
+from typing import Dict, Iterable, List, Tuple
+
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonFieldStreamer:
+    """
+    Incrementally extracts string fields from a JSON object as it streams in.
+
+    Feed it raw model output chunk by chunk and it returns (field, text) deltas
+    for the requested fields, decoded as they arrive, so subject and body tokens
+    can be forwarded before the closing brace shows up.
+    """
+    def __init__(self, fields: Iterable[str]):
+        names = "|".join(re.escape(field) for field in fields)
+        self._field_start = re.compile(r'"(' + names + r')"\s*:\s*"')
+        self._max_seek_buffer = max(len(field) for field in fields) + 16
+        self._buffer = ""
+        self._field = None  # Field whose value is currently streaming
+
+    def feed(self, text: str) -> List[Tuple[str, str]]:
+        self._buffer += text
+        deltas = []
+
+        while self._buffer:
+            if self._field is None:
+                match = self._field_start.search(self._buffer)
+                if not match:
+                    # Keep just enough of the tail to match a key split across chunks
+                    self._buffer = self._buffer[-self._max_seek_buffer:]
+                    break
+                self._field = match.group(1)
+                self._buffer = self._buffer[match.end():]
+                continue
+
+            value, consumed, closed = self._read_string(self._buffer)
+            if value:
+                deltas.append((self._field, value))
+            self._buffer = self._buffer[consumed:]
+            if closed:
+                self._field = None
+            else:
+                break
+
+        return deltas
+
+    def _read_string(self, text: str) -> Tuple[str, int, bool]:
+        """
+        Decode as much of a JSON string body as possible. Returns the decoded
+        text, how many characters were consumed and whether the string closed.
+        An escape sequence cut off at the end of the chunk is left unconsumed.
+        """
+        out = []
+        i = 0
+        while i < len(text):
+            char = text[i]
+            if char == '"':
+                return "".join(out), i + 1, True
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+
+            if i + 1 >= len(text):
+                break
+            code = text[i + 1]
+            if code == "u":
+                if i + 6 > len(text):
+                    break
+                out.append(json.loads(f'"{text[i:i + 6]}"'))
+                i += 6
+            else:
+                out.append(_ESCAPES.get(code, code))
+                i += 2
+
+        return "".join(out), i, False
+
+
+def format_sse(event: str, data: Dict) -> str:
+    """
+    Format a Server-Sent Events frame with a JSON payload.
+    """
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
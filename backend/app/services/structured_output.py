@@ -0,0 +1,110 @@
+import json
+from collections import defaultdict
+from typing import Dict, Type, TypeVar
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+
+class EmailOutput(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    subject: str = Field(min_length=1, max_length=200)
+    body: str = Field(min_length=1)
+
+
+class EmailWithAdviceOutput(EmailOutput):
+    advice: str = Field(min_length=1)
+
+
+SchemaT = TypeVar("SchemaT", bound=BaseModel)
+
+
+class StructuredOutputError(ValueError):
+    """
+    Model output that could not be turned into the expected schema.
+
+    kind is "no_json", "invalid_json" or "schema", and detail says what was
+    wrong in a form that can be handed back to the model in a repair prompt.
+    """
+    def __init__(self, kind: str, detail: str):
+        super().__init__(f"{kind}: {detail}")
+        self.kind = kind
+        self.detail = detail
+
+
+class StructuredOutputParser:
+    """
+    Parses and validates JSON model output against a pydantic schema.
+
+    Keeps per-schema counters of how generations ended (parsed first time,
+    parsed after a repair retry, or failed) and of the parse errors seen,
+    so the cost of malformed output shows up in the metrics.
+    """
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._outcomes: Dict[str, Dict[str, int]] = defaultdict(lambda: {"ok": 0, "repaired": 0, "failed": 0})
+        self._errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def parse(self, content: str, schema: Type[SchemaT]) -> SchemaT:
+        """
+        Return the first JSON object in content validated against schema, or
+        raise StructuredOutputError.
+        """
+        try:
+            return schema.model_validate(self._extract_object(content))
+        except StructuredOutputError as e:
+            self._errors[schema.__name__][e.kind] += 1
+            raise
+        except ValidationError as e:
+            self._errors[schema.__name__]["schema"] += 1
+            detail = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'object'}: {error['msg']}"
+                for error in e.errors()
+            )
+            raise StructuredOutputError("schema", detail) from e
+
+    def record(self, schema: Type[BaseModel], outcome: str) -> None:
+        """
+        Count how a generation against schema ended: "ok", "repaired" or "failed".
+        """
+        self._outcomes[schema.__name__][outcome] += 1
+
+    def stats(self) -> Dict:
+        stats = {}
+        for name, outcomes in self._outcomes.items():
+            requests = sum(outcomes.values())
+            stats[name] = {
+                "requests": requests,
+                **outcomes,
+                "errors": dict(self._errors[name]),
+                "parse_failure_rate": (outcomes["repaired"] + outcomes["failed"]) / requests if requests else 0.0,
+                "fallback_rate": outcomes["failed"] / requests if requests else 0.0
+            }
+        return stats
+
+    def reset(self) -> None:
+        self._outcomes.clear()
+        self._errors.clear()
+
+    def _extract_object(self, content: str) -> Dict:
+        # Decode from each opening brace in turn rather than matching greedily,
+        # so prose, code fences or a second object around the JSON don't break it
+        text = content or ""
+        start = text.find("{")
+        if start == -1:
+            raise StructuredOutputError("no_json", "the reply did not contain a JSON object")
+
+        error = None
+        while start != -1:
+            try:
+                value, _ = self._decoder.raw_decode(text, start)
+                if isinstance(value, dict):
+                    return value
+            except json.JSONDecodeError as e:
+                error = error or e
+            start = text.find("{", start + 1)
+
+        raise StructuredOutputError("invalid_json", f"{error.msg} at character {error.pos}" if error else "no JSON object found")
+
+
+# Shared parser so the counters cover every service instance
+structured_output = StructuredOutputParser()
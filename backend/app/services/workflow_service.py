@@ -1,38 +1,136 @@
-from typing import Dict, List, Optional, Tuple
-from sqlalchemy.orm import Session
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings
+from app.database import SessionLocal
+from app.metrics import set_industry, stage
+from app.tracing import traced
 from app.models.prospect import Prospect
-from app.models.engagement import Engagement
+from app.models.engagement_summary import EngagementSummary
 from app.services.ai_service import AIService
 from app.services.email_service import EmailService
+from app.services.send_batcher import SendBatcher
+from app.services.engagement_summary_service import EngagementSummaryService
+from app.services.industry_classifier import industry_classifier
+from app.services.llm_usage import TokenBudgetExceeded, llm_usage
 import asyncio
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+# Ids per IN (...) query, well under asyncpg's 32767 bind parameter limit
+MAX_IN_PARAMS = 30000
+
+
+def _chunks(ids: List[int], size: int = MAX_IN_PARAMS):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
 
 
 class WorkflowService:
-    def __init__(self):
-        self.ai_service = AIService()
-        self.email_service = EmailService()
+    def __init__(
+        self,
+        ai_service: Optional[AIService] = None,
+        email_service: Optional[EmailService] = None,
+        summary_service: Optional[EngagementSummaryService] = None
+    ):
+        self.ai_service = ai_service or AIService()
+        self.email_service = email_service or EmailService()
+        self.summary_service = summary_service or EngagementSummaryService()
     
-    async def process_prospect(self, db: Session, prospect_id: int) -> Dict:
+    @traced()
+    async def load_prospect(self, db: AsyncSession, prospect_id: int) -> Tuple[Prospect, Optional[EngagementSummary]]:
         """
-        Process a single prospect through the personalization workflow.
-        
-        Returns a dictionary with the email content and engagement advice.
+        Load a prospect and its engagement summary (None if it has no engagements yet).
         """
         # Get the prospect
-        prospect = db.query(Prospect).filter(Prospect.id == prospect_id).first()
+        with stage("prospect_load"):
+            prospect = await db.scalar(select(Prospect).where(Prospect.id == prospect_id))
         if not prospect:
             raise ValueError(f"Prospect with ID {prospect_id} not found")
         
-        # Get engagement history
-        engagement_history = db.query(Engagement).filter(
-            Engagement.prospect_id == prospect_id
-        ).order_by(Engagement.sent_at.desc()).all()
+        # Get the engagement summary rather than the full history
+        with stage("history_load", industry=industry_classifier.classify(prospect.industry)):
+            engagement_summary = await self.summary_service.get(db, prospect_id)
+        
+        return prospect, engagement_summary
+    
+    @traced()
+    async def check_prospects(self, db: AsyncSession, prospect_ids: List[int]) -> Tuple[Set[int], Set[int]]:
+        """
+        Split prospect ids into the ones that exist and the ones that don't,
+        with a single id-only query per MAX_IN_PARAMS ids.
+        """
+        requested = set(prospect_ids)
+        found = set()
+        for chunk in _chunks(list(requested)):
+            found.update((await db.scalars(select(Prospect.id).where(Prospect.id.in_(chunk)))).all())
         
-        # Generate personalized email content
-        email_content = await self.ai_service.generate_personalized_email(prospect, engagement_history)
+        return found, requested - found
+    
+    @traced()
+    async def load_prospects(
+        self,
+        db: AsyncSession,
+        prospect_ids: List[int]
+    ) -> Dict[int, Tuple[Prospect, Optional[EngagementSummary]]]:
+        """
+        Load prospects and their engagement summaries in one query, keyed by
+        prospect id. Ids that don't exist are left out.
+        """
+        loaded = {}
+        for chunk in _chunks(list(set(prospect_ids))):
+            with stage("prospect_load"):
+                rows = (await db.execute(
+                    select(Prospect, EngagementSummary).outerjoin(
+                        EngagementSummary, EngagementSummary.prospect_id == Prospect.id
+                    ).where(Prospect.id.in_(chunk))
+                )).all()
+            loaded.update({prospect.id: (prospect, engagement_summary) for prospect, engagement_summary in rows})
+        
+        return loaded
+    
+    @traced()
+    async def process_prospect(self, db: AsyncSession, prospect_id: int, bypass_cache: bool = False) -> Dict:
+        """
+        Process a single prospect through the personalization workflow.
+        
+        Returns a dictionary with the email content and engagement advice.
+        """
+        prospect, engagement_summary = await self.load_prospect(db, prospect_id)
+        return await self.generate(prospect, engagement_summary, bypass_cache=bypass_cache)
+    
+    @traced()
+    async def generate(
+        self,
+        prospect: Prospect,
+        engagement_summary: Optional[EngagementSummary],
+        bypass_cache: bool = False
+    ) -> Dict:
+        """
+        Generate the email and engagement advice for an already loaded prospect.
+        Doesn't touch the database.
+        """
+        set_industry(prospect.industry)
+        llm_usage.set_prospect(prospect.id)
         
-        # Generate engagement advice
-        engagement_advice = await self.ai_service.generate_engagement_advice(prospect, email_content)
+        if settings.LLM_COMBINED_GENERATION:
+            # Generate the email and engagement advice in a single round trip
+            email_content = await self.ai_service.generate_email_with_advice(
+                prospect, engagement_summary, bypass_cache=bypass_cache
+            )
+            engagement_advice = email_content.pop("advice")
+        else:
+            # Generate personalized email content
+            email_content = await self.ai_service.generate_personalized_email(
+                prospect, engagement_summary, bypass_cache=bypass_cache
+            )
+            
+            # Generate engagement advice
+            engagement_advice = await self.ai_service.generate_engagement_advice(
+                prospect, email_content, bypass_cache=bypass_cache
+            )
         
         return {
             "prospect": prospect,
@@ -40,14 +138,17 @@ class WorkflowService:
             "engagement_advice": engagement_advice
         }
     
-    async def send_personalized_email(self, db: Session, prospect_id: int) -> Dict:
+    @traced()
+    async def send_personalized_email(self, db: AsyncSession, prospect_id: int) -> Dict:
         """
         Process a prospect and send them a personalized email.
         
         Returns the processed data and the engagement record.
         """
-        # Process the prospect
-        processed_data = await self.process_prospect(db, prospect_id)
+        # Process the prospect, ending the read transaction before the slow LLM and SendGrid calls
+        prospect, engagement_summary = await self.load_prospect(db, prospect_id)
+        await db.commit()
+        processed_data = await self.generate(prospect, engagement_summary)
         
         # Send the email
         engagement = await self.email_service.send_email(
@@ -61,44 +162,164 @@ class WorkflowService:
             "engagement": engagement
         }
     
-    async def process_batch(self, db: Session, prospect_ids: List[int]) -> List[Dict]:
+    @traced()
+    async def process_batch(self, db: AsyncSession, prospect_ids: List[int], bypass_cache: bool = False) -> List[Dict]:
         """
-        Process multiple prospects in parallel.
+        Process multiple prospects with bounded concurrency. Results are
+        returned in the order of prospect_ids.
         """
-        tasks = [self.process_prospect(db, prospect_id) for prospect_id in prospect_ids]
-        return await asyncio.gather(*tasks)
+        loaded = await self.load_prospects(db, prospect_ids)
+        missing = [prospect_id for prospect_id in prospect_ids if prospect_id not in loaded]
+        if missing:
+            raise ValueError(f"Prospects with IDs {missing} not found")
+        
+        results = {}
+        async for prospect_id, result in self.generate_many(loaded, bypass_cache=bypass_cache):
+            if isinstance(result, Exception):
+                raise result
+            results[prospect_id] = result
+        
+        return [results[prospect_id] for prospect_id in prospect_ids]
     
-    async def send_batch_emails(self, db: Session, prospect_ids: List[int]) -> List[Dict]:
+    async def generate_many(
+        self,
+        loaded: Dict[int, Tuple[Prospect, Optional[EngagementSummary]]],
+        bypass_cache: bool = False,
+        concurrency: int = settings.BATCH_PREVIEW_CONCURRENCY
+    ) -> AsyncIterator[Tuple[int, object]]:
+        """
+        Generate drafts for prospects loaded by load_prospects, at most
+        concurrency at a time, yielding (prospect_id, result) as each finishes.
+        A generation that raised yields its exception as the result.
+        
+        Generation runs on the loaded snapshots without a database session, so
+        nothing is shared between the concurrent tasks but the provider clients,
+        whose quotas the shared rate limiters enforce.
         """
-        Process and send emails to multiple prospects in sequence.
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run(prospect_id: int, prospect: Prospect, engagement_summary: Optional[EngagementSummary]):
+            async with semaphore:
+                try:
+                    return prospect_id, await self.generate(prospect, engagement_summary, bypass_cache=bypass_cache)
+                except Exception as e:
+                    logger.warning("Error generating email for prospect %s: %s", prospect_id, e)
+                    return prospect_id, e
+        
+        tasks = [
+            asyncio.create_task(run(prospect_id, prospect, engagement_summary))
+            for prospect_id, (prospect, engagement_summary) in loaded.items()
+        ]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield await finished
+        finally:
+            # Stop outstanding generations if the consumer goes away
+            for task in tasks:
+                task.cancel()
+    
+    @traced()
+    async def send_batch_emails(
+        self,
+        prospect_ids: List[int],
+        on_result: Optional[Callable[[Dict], Awaitable[None]]] = None,
+        loaded: Optional[Dict[int, Tuple[Prospect, Optional[EngagementSummary]]]] = None
+    ) -> List[Dict]:
         """
+        Process and send emails to multiple prospects with a bounded pool of workers.
+        
+        Prospects and their summaries are prefetched with load_prospects unless
+        the caller already has them in loaded, so workers generate from those
+        snapshots without querying per prospect. Provider quotas are enforced
+        by the shared rate limiters, so throughput is bounded by Groq and
+        SendGrid rather than by awaiting each prospect in turn. Finished emails
+        are grouped into multi-recipient SendGrid requests. on_result is called
+        with each prospect's result as soon as it finishes. Each prospect is
+        sent to once, however often it appears in prospect_ids.
+        
+        Once the current campaign's token budget is spent, workers stop taking
+        prospects and TokenBudgetExceeded is raised after those in flight finish.
+        Prospects that were not processed get no result.
+        """
+        if loaded is None:
+            async with SessionLocal() as db:
+                loaded = await self.load_prospects(db, prospect_ids)
+        
+        prospect_ids = list(dict.fromkeys(prospect_ids))
         results = []
+        batcher = SendBatcher(self.email_service)
+        queue: asyncio.Queue = asyncio.Queue()
         for prospect_id in prospect_ids:
-            try:
-                result = await self.send_personalized_email(db, prospect_id)
+            queue.put_nowait(prospect_id)
+        
+        budget_error: List[TokenBudgetExceeded] = []
+        
+        async def worker():
+            while not budget_error:
+                try:
+                    prospect_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    result = await self._send_one(prospect_id, loaded.get(prospect_id), batcher)
+                except TokenBudgetExceeded as e:
+                    budget_error.append(e)
+                    return
                 results.append(result)
-            except Exception as e:
-                print(f"Error processing prospect {prospect_id}: {e}")
-                results.append({"prospect_id": prospect_id, "error": str(e)})
+                if on_result:
+                    await on_result(result)
+        
+        worker_count = max(1, min(settings.BATCH_SEND_WORKERS, len(prospect_ids)))
+        workers = [asyncio.create_task(worker()) for _ in range(worker_count)]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            # Stop the other workers before the batcher closes, so nothing keeps sending
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        finally:
+            await batcher.close()
+        
+        if budget_error:
+            raise budget_error[0]
         
         return results
     
+    @traced()
+    async def _send_one(
+        self,
+        prospect_id: int,
+        snapshot: Optional[Tuple[Prospect, Optional[EngagementSummary]]],
+        batcher: SendBatcher
+    ) -> Dict:
+        """
+        Generate a single prospect's email from its prefetched snapshot, hand
+        it to the batcher and summarize the outcome.
+        """
+        try:
+            if snapshot is None:
+                raise ValueError(f"Prospect with ID {prospect_id} not found")
+            
+            processed_data = await self.generate(*snapshot)
+            
+            engagement = await batcher.submit(processed_data["prospect"], processed_data["email_content"])
+            return {
+                "prospect_id": prospect_id,
+                "status": "sent",
+                "engagement_id": engagement.id,
+                "email_subject": processed_data["email_content"]["subject"]
+            }
+        except TokenBudgetExceeded:
+            # Leave the prospect unprocessed rather than failed
+            raise
+        except Exception as e:
+            logger.warning("Error processing prospect %s: %s", prospect_id, e)
+            return {"prospect_id": prospect_id, "status": "failed", "error": str(e)}
+    
     def classify_prospect(self, prospect: Prospect) -> str:
         """
         Classify a prospect into an industry category for more specific targeting.
-        This is a simple classification - in a real application, we might use NLP or taxonomy mapping.
-        """
-        industry_lower = prospect.industry.lower()
-        
-        if any(tech in industry_lower for tech in ["tech", "software", "it", "computer", "digital"]):
-            return "technology"
-        elif any(fin in industry_lower for fin in ["financ", "bank", "invest", "insur", "capital"]):
-            return "finance"
-        elif any(health in industry_lower for health in ["health", "medical", "hospital", "pharma", "care"]):
-            return "healthcare"
-        elif any(retail in industry_lower for retail in ["retail", "shop", "store", "ecommerce", "commerce"]):
-            return "retail"
-        elif any(manu in industry_lower for manu in ["manufactur", "factory", "production", "industrial"]):
-            return "manufacturing"
-        else:
-            return "other"
+        """
+        return industry_classifier.classify(prospect.industry)
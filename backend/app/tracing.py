@@ -0,0 +1,152 @@
+"""
+OpenTelemetry tracing for the API and the worker.
+
+Service methods are wrapped in spans with @traced, and setup_tracing adds
+spans for incoming requests, database statements and outbound HTTP calls
+(SendGrid and Groq both go through httpx). Only the OpenTelemetry API is
+imported up front: until setup_tracing installs a provider the spans are
+no-ops, and the SDK and instrumentations are imported only when tracing is
+enabled.
+"""
+import functools
+from collections import deque
+from typing import Dict, List, Optional
+from opentelemetry import trace
+from app.config import settings
+
+
+tracer = trace.get_tracer("outreach")
+
+# Set when TRACING_EXPORTER is "memory"
+memory_exporter: Optional["RecentSpanExporter"] = None
+
+
+def traced(name: Optional[str] = None):
+    """
+    Run an async function in a span named after it (Class.method), recording
+    any exception it raises.
+    """
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with tracer.start_as_current_span(span_name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+    return decorator
+
+
+def set_attributes(**attributes) -> None:
+    """
+    Attach attributes to the current span, if it is being recorded.
+    """
+    span = trace.get_current_span()
+    if span.is_recording():
+        span.set_attributes({key: value for key, value in attributes.items() if value is not None})
+
+
+class RecentSpanExporter:
+    """
+    In-memory exporter that keeps the most recent finished spans, for tests
+    and for inspecting sampled traces through /metrics/traces.
+    """
+    def __init__(self, max_spans: int = settings.TRACING_MEMORY_MAX_SPANS):
+        self.spans = deque(maxlen=max_spans)
+
+    def export(self, spans):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        self.spans.extend(spans)
+        return SpanExportResult.SUCCESS
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        pass
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def traces(self, limit: int = 20) -> List[Dict]:
+        """
+        The most recent traces, each with its spans in start order and
+        durations in milliseconds.
+        """
+        by_trace: Dict[int, List] = {}
+        for span in self.spans:
+            by_trace.setdefault(span.context.trace_id, []).append(span)
+
+        recent = sorted(by_trace.values(), key=lambda spans: max(span.end_time for span in spans), reverse=True)[:limit]
+        return [
+            {
+                "trace_id": format(spans[0].context.trace_id, "032x"),
+                "duration_ms": (max(span.end_time for span in spans) - min(span.start_time for span in spans)) / 1e6,
+                "spans": [
+                    {
+                        "name": span.name,
+                        "span_id": format(span.context.span_id, "016x"),
+                        "parent_id": format(span.parent.span_id, "016x") if span.parent else None,
+                        "start_offset_ms": (span.start_time - min(s.start_time for s in spans)) / 1e6,
+                        "duration_ms": (span.end_time - span.start_time) / 1e6,
+                        "status": span.status.status_code.name,
+                        "attributes": dict(span.attributes or {}),
+                    }
+                    for span in sorted(spans, key=lambda span: span.start_time)
+                ]
+            }
+            for spans in recent
+        ]
+
+
+def setup_tracing(app=None, engine=None) -> None:
+    """
+    Install a tracer provider with the configured exporter and sampler and
+    instrument the FastAPI app, the SQLAlchemy engine and httpx.
+    Does nothing when TRACING_EXPORTER is "none".
+    """
+    global memory_exporter
+
+    if settings.TRACING_EXPORTER == "none":
+        return
+
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter, SimpleSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO))
+    )
+
+    if settings.TRACING_EXPORTER == "memory":
+        memory_exporter = RecentSpanExporter()
+        provider.add_span_processor(SimpleSpanProcessor(memory_exporter))
+    elif settings.TRACING_EXPORTER == "console":
+        provider.add_span_processor(BatchSpanProcessor(ConsoleSpanExporter()))
+    elif settings.TRACING_EXPORTER == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* variables
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    else:
+        raise ValueError(f"Unknown TRACING_EXPORTER: {settings.TRACING_EXPORTER}")
+
+    trace.set_tracer_provider(provider)
+
+    from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+    HTTPXClientInstrumentor().instrument()
+
+    if engine is not None:
+        from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+
+        SQLAlchemyInstrumentor().instrument(engine=engine.sync_engine)
+
+    if app is not None:
+        from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+
+        FastAPIInstrumentor.instrument_app(app)
@@ -0,0 +1,151 @@
+"""
+Background job worker.
+
+Run one or more of these next to the API to process queued jobs and to roll
+tracked engagement events up into engagement and prospect scores:
+
+    python -m app.worker
+"""
+import asyncio
+import logging
+import os
+import socket
+from typing import Optional
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.metrics import set_route
+from app.models.job import Job
+from app.tracing import setup_tracing, tracer
+from app.services.container import services
+from app.services.job_service import JobLostError
+from app.services.llm_usage import llm_usage
+
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    def __init__(self):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self.job_service = services.job_service
+        self.workflow_service = services.workflow_service
+        self.event_service = services.event_service
+
+    async def run_job(self, job_id: int) -> None:
+        """
+        Process every prospect of a claimed job that is not yet checkpointed.
+        """
+        set_route("worker send_batch")
+        with tracer.start_as_current_span("JobWorker.run_job", attributes={"job.id": job_id}):
+            await self._run_job(job_id)
+
+    async def _run_job(self, job_id: int) -> None:
+        async with SessionLocal() as db:
+            prospect_ids = await self.job_service.pending_prospect_ids(db, job_id)
+            job = await db.get(Job, job_id)
+            # Every job is its own campaign, with the job's budget or the default one
+            campaign = await llm_usage.load_campaign(
+                db,
+                f"job:{job_id}",
+                job.token_budget if job.token_budget is not None else settings.LLM_CAMPAIGN_TOKEN_BUDGET
+            )
+        llm_usage.set_campaign(campaign)
+
+        logger.info("Worker %s processing job %s (%d pending)", self.worker_id, job_id, len(prospect_ids))
+
+        # Checkpoints only come as fast as rate-limited sends, so keep the job alive separately
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        error = None
+        try:
+            await self.workflow_service.send_batch_emails(
+                prospect_ids,
+                on_result=lambda result: self.job_service.record_result(job_id, self.worker_id, result)
+            )
+        except JobLostError as e:
+            logger.warning("Stopping job %s: %s", job_id, e)
+            return
+        except Exception as e:
+            logger.exception("Error processing job %s", job_id)
+            error = str(e)
+        finally:
+            heartbeat.cancel()
+            await llm_usage.flush()
+
+        async with SessionLocal() as db:
+            if not await self.job_service.finish(db, job_id, self.worker_id, error):
+                logger.warning("Job %s was reclaimed by another worker before it finished", job_id)
+
+    async def _heartbeat(self, job_id: int) -> None:
+        while True:
+            await asyncio.sleep(settings.JOB_HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                if not await self.job_service.heartbeat(job_id, self.worker_id):
+                    logger.warning("Lost job %s to another worker", job_id)
+                    return
+            except Exception as e:
+                logger.warning("Error sending heartbeat for job %s: %s", job_id, e)
+
+    async def rollup_events(self) -> None:
+        """
+        Roll up all pending engagement events into engagement and prospect scores.
+        """
+        async with SessionLocal() as db:
+            try:
+                await self.event_service.rollup_pending(db)
+            except Exception:
+                logger.exception("Error rolling up engagement events")
+                await db.rollback()
+
+    async def _rollup_loop(self) -> None:
+        while True:
+            await self.rollup_events()
+            await asyncio.sleep(settings.ENGAGEMENT_ROLLUP_INTERVAL_SECONDS)
+
+    async def claim(self) -> Optional[int]:
+        """
+        Claim the next job, if any.
+        """
+        async with SessionLocal() as db:
+            job = await self.job_service.claim_next(db, self.worker_id)
+            return job.id if job else None
+
+    async def run(self) -> None:
+        """
+        Poll the queue forever, claiming one job at a time. Engagement events
+        are rolled up into scores on their own schedule, so they keep flowing
+        while a long job runs. Queue errors, such as the database being
+        unreachable, are retried with a growing delay.
+        """
+        logger.info("Worker %s started", self.worker_id)
+        rollup = asyncio.create_task(self._rollup_loop())
+        try:
+            await self._poll()
+        finally:
+            rollup.cancel()
+
+    async def _poll(self) -> None:
+        failures = 0
+        while True:
+            try:
+                job_id = await self.claim()
+                if job_id is not None:
+                    await self.run_job(job_id)
+                failures = 0
+            except Exception as e:
+                failures += 1
+                delay = min(settings.JOB_POLL_INTERVAL_SECONDS * 2 ** failures, settings.JOB_MAX_POLL_BACKOFF_SECONDS)
+                logger.warning("Error polling the job queue, retrying in %.1fs: %s", delay, e)
+                await asyncio.sleep(delay)
+                continue
+
+            if job_id is None:
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    if settings.WORKER_METRICS_PORT:
+        from prometheus_client import start_http_server
+
+        start_http_server(settings.WORKER_METRICS_PORT)
+    setup_tracing(engine=engine)
+    asyncio.run(JobWorker().run())
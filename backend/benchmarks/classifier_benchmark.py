@@ -0,0 +1,67 @@
+"""
+Time industry classification over a synthetic campaign, comparing the old
+per-prospect substring scans with the trie classifier, cold and memoized.
+
+    cd backend
+    python -m benchmarks.classifier_benchmark --prospects 1000000 --industries 5000
+"""
+import argparse
+import random
+import time
+from app.services.industry_classifier import IndustryClassifier
+
+
+SAMPLE_INDUSTRIES = [
+    "Software", "IT Services", "Regional Banking", "Insurance", "Capital Markets",
+    "Hospital Network", "Pharmaceuticals", "Home Care", "Retail Stores", "E-Commerce",
+    "Industrial Machinery", "Food Production", "Logistics", "Hospitality", "Construction",
+]
+
+
+def substring_scan(industry: str) -> str:
+    # The chain of substring checks the classifier replaced
+    industry_lower = industry.lower()
+    if any(tech in industry_lower for tech in ["tech", "software", "it", "computer", "digital"]):
+        return "technology"
+    elif any(fin in industry_lower for fin in ["financ", "bank", "invest", "insur", "capital"]):
+        return "finance"
+    elif any(health in industry_lower for health in ["health", "medical", "hospital", "pharma", "care"]):
+        return "healthcare"
+    elif any(retail in industry_lower for retail in ["retail", "shop", "store", "ecommerce", "commerce"]):
+        return "retail"
+    elif any(manu in industry_lower for manu in ["manufactur", "factory", "production", "industrial"]):
+        return "manufacturing"
+    return "other"
+
+
+def timed(label, classify, industries):
+    started = time.perf_counter()
+    categories = classify(industries)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<22} {elapsed:>8.2f}s {len(industries) / elapsed:>14,.0f} prospects/s")
+    return categories
+
+
+def main(prospect_count: int, industry_count: int):
+    rng = random.Random(42)
+    distinct = [f"{rng.choice(SAMPLE_INDUSTRIES)} {i}" for i in range(industry_count)]
+    industries = [rng.choice(distinct) for _ in range(prospect_count)]
+    print(f"{prospect_count:,} prospects over {industry_count:,} distinct industries")
+
+    timed("substring scans", lambda items: [substring_scan(item) for item in items], industries)
+
+    classifier = IndustryClassifier()
+    timed("trie, unmemoized", lambda items: [classifier._classify(item) for item in items], industries)
+    timed("classify_many", classifier.classify_many, industries)
+    timed("classify_many, warm", classifier.classify_many, industries)
+
+    disagreements = sum(substring_scan(item) != classifier.classify(item) for item in distinct)
+    print(f"Distinct industries classified differently than before: {disagreements}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prospects", type=int, default=1000000)
+    parser.add_argument("--industries", type=int, default=5000, help="Distinct industry strings")
+    args = parser.parse_args()
+    main(args.prospects, args.industries)
@@ -0,0 +1,145 @@
+"""
+Compare per-prospect latency and token usage of the two-call generation path
+(email, then advice) against the combined single-call path, and report how
+many replies needed a repair retry or fell back to the template.
+
+Runs against the models configured for each task with the response cache
+bypassed, or fully offline against the local provider with --local:
+
+    cd backend
+    python -m benchmarks.generation_benchmark --prospects 10
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from types import SimpleNamespace
+from app.services.ai_service import AIService
+from app.services.llm_providers import get_provider
+from app.services.prompt_templates import prompt_template_stats
+from app.services.structured_output import structured_output
+
+
+SAMPLE_INDUSTRIES = ["Technology", "Finance", "Healthcare", "Retail", "Manufacturing", "Logistics"]
+
+
+class UsageRecorder:
+    """
+    Tallies calls and token usage across the providers an AIService routes to.
+    """
+    def __init__(self, providers):
+        self.providers = list({provider.model_id: provider for provider in providers}.values())
+        self.reset()
+
+    def _totals(self):
+        return {
+            key: sum(provider.usage[key] for provider in self.providers)
+            for key in ("calls", "input_tokens", "output_tokens")
+        }
+
+    def reset(self):
+        self._start = self._totals()
+
+    def _since_reset(self, key):
+        return self._totals()[key] - self._start[key]
+
+    @property
+    def calls(self):
+        return self._since_reset("calls")
+
+    @property
+    def input_tokens(self):
+        return self._since_reset("input_tokens")
+
+    @property
+    def output_tokens(self):
+        return self._since_reset("output_tokens")
+
+
+def sample_prospects(count: int):
+    return [
+        SimpleNamespace(
+            id=i,
+            company_name=f"Benchmark Co {i}",
+            industry=SAMPLE_INDUSTRIES[i % len(SAMPLE_INDUSTRIES)],
+            contact_person="Alex Morgan"
+        )
+        for i in range(count)
+    ]
+
+
+async def two_call(ai_service: AIService, prospect):
+    email_content = await ai_service.generate_personalized_email(prospect, None, bypass_cache=True)
+    await ai_service.generate_engagement_advice(prospect, email_content, bypass_cache=True)
+
+
+async def combined(ai_service: AIService, prospect):
+    await ai_service.generate_email_with_advice(prospect, None, bypass_cache=True)
+
+
+async def run_mode(name, generate, ai_service, recorder, prospects):
+    recorder.reset()
+    latencies = []
+    for prospect in prospects:
+        started = time.perf_counter()
+        await generate(ai_service, prospect)
+        latencies.append(time.perf_counter() - started)
+
+    count = len(prospects)
+    return {
+        "mode": name,
+        "mean_latency_s": statistics.mean(latencies),
+        "p50_latency_s": statistics.median(latencies),
+        "calls_per_prospect": recorder.calls / count,
+        "input_tokens_per_prospect": recorder.input_tokens / count,
+        "output_tokens_per_prospect": recorder.output_tokens / count,
+    }
+
+
+async def main(prospect_count: int, local: bool):
+    ai_service = AIService()
+    if local:
+        ai_service.providers = {task: get_provider("local:benchmark") for task in ai_service.providers}
+    recorder = UsageRecorder(ai_service.providers.values())
+    prospects = sample_prospects(prospect_count)
+
+    results = [
+        await run_mode("two-call", two_call, ai_service, recorder, prospects),
+        await run_mode("combined", combined, ai_service, recorder, prospects),
+    ]
+
+    print(f"{'mode':<10} {'mean s':>8} {'p50 s':>8} {'calls':>6} {'in tok':>8} {'out tok':>8}")
+    for r in results:
+        print(
+            f"{r['mode']:<10} {r['mean_latency_s']:>8.2f} {r['p50_latency_s']:>8.2f} "
+            f"{r['calls_per_prospect']:>6.1f} {r['input_tokens_per_prospect']:>8.0f} "
+            f"{r['output_tokens_per_prospect']:>8.0f}"
+        )
+
+    before, after = results
+    print(f"Latency saved per prospect: {before['mean_latency_s'] - after['mean_latency_s']:.2f}s")
+    print(
+        "Tokens saved per prospect: "
+        f"{(before['input_tokens_per_prospect'] + before['output_tokens_per_prospect']) - (after['input_tokens_per_prospect'] + after['output_tokens_per_prospect']):.0f}"
+    )
+
+    for name, stats in prompt_template_stats().items():
+        if stats["renders"]:
+            print(
+                f"{name} template: ~{stats['avg_input_tokens']:.0f} input tokens, "
+                f"{stats['static_share']:.0%} in the shared system prefix"
+            )
+
+    for schema, stats in structured_output.stats().items():
+        print(
+            f"{schema}: {stats['requests']} replies, {stats['parse_failure_rate']:.1%} failed to parse, "
+            f"{stats['repaired']} repaired, {stats['failed']} fell back to the template"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--prospects", type=int, default=10, help="Number of synthetic prospects per mode")
+    parser.add_argument("--local", action="store_true", help="Use the offline local provider for every task")
+    args = parser.parse_args()
+    asyncio.run(main(args.prospects, args.local))
@@ -0,0 +1,73 @@
+"""
+Measure requests per second of a running API under mixed generate + CRUD load.
+
+Start a single worker and point the benchmark at it:
+
+    cd backend
+    uvicorn app.main:app --workers 1
+    python -m benchmarks.load_benchmark --url http://localhost:8000 --duration 30
+
+Each virtual user loops over a weighted mix of GET /prospects, GET /prospects/{id}
+and POST /emails/generate, so CRUD latency is measured while generation calls are
+in flight on the same event loop.
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections import defaultdict
+import httpx
+
+
+async def virtual_user(client: httpx.AsyncClient, prospect_ids, generate_ratio: float, deadline: float, latencies):
+    while time.perf_counter() < deadline:
+        prospect_id = random.choice(prospect_ids)
+        roll = random.random()
+        if roll < generate_ratio:
+            name, request = "generate", client.post("/emails/generate", params={"prospect_id": prospect_id})
+        elif roll < (1 + generate_ratio) / 2:
+            name, request = "list", client.get("/prospects/", params={"limit": 50})
+        else:
+            name, request = "get", client.get(f"/prospects/{prospect_id}")
+
+        started = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 500
+        except httpx.HTTPError:
+            ok = False
+        latencies[name if ok else f"{name} (error)"].append(time.perf_counter() - started)
+
+
+async def main(url: str, users: int, duration: float, generate_ratio: float):
+    async with httpx.AsyncClient(base_url=url, timeout=120) as client:
+        prospects = (await client.get("/prospects/", params={"limit": 500})).json()
+        prospect_ids = [p["id"] for p in prospects]
+        if not prospect_ids:
+            raise SystemExit("No prospects found; import some before benchmarking")
+
+        latencies = defaultdict(list)
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(
+            virtual_user(client, prospect_ids, generate_ratio, deadline, latencies)
+            for _ in range(users)
+        ))
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{total} requests in {duration:.0f}s: {total / duration:.1f} req/s")
+    print(f"{'request':<18} {'count':>7} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, values in sorted(latencies.items()):
+        values.sort()
+        p95 = values[max(0, int(len(values) * 0.95) - 1)]
+        print(f"{name:<18} {len(values):>7} {statistics.median(values) * 1000:>9.1f} {p95 * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run")
+    parser.add_argument("--generate-ratio", type=float, default=0.2, help="Share of requests that generate emails")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.users, args.duration, args.generate_ratio))
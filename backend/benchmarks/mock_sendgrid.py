@@ -0,0 +1,67 @@
+"""
+Local mock of the SendGrid v3 mail send API.
+
+Accepts POST /v3/mail/send like SendGrid does (202 with an X-Message-Id
+header), with configurable latency and injected 429/5xx responses so retry
+behaviour and send throughput can be exercised without a real account:
+
+    cd backend
+    python -m benchmarks.mock_sendgrid --port 8025 --latency-ms 150 --error-rate 0.05
+
+Then run the API or a benchmark with SENDGRID_API_URL=http://localhost:8025.
+GET /stats reports what the mock has received.
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from collections import Counter
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+import uvicorn
+
+
+# SendGrid's own limit on personalizations per request
+MAX_PERSONALIZATIONS = 1000
+
+
+def create_app(latency_ms: float, error_rate: float) -> FastAPI:
+    app = FastAPI(title="Mock SendGrid")
+    stats = Counter()
+
+    @app.post("/v3/mail/send")
+    async def mail_send(request: Request):
+        payload = await request.json()
+        stats["requests"] += 1
+        await asyncio.sleep(random.uniform(0.5, 1.5) * latency_ms / 1000)
+
+        if random.random() < error_rate:
+            status_code = random.choice([429, 500, 503])
+            stats[f"injected_{status_code}"] += 1
+            headers = {"Retry-After": "1"} if status_code == 429 else {}
+            return JSONResponse({"errors": [{"message": "injected failure"}]}, status_code=status_code, headers=headers)
+
+        personalizations = payload.get("personalizations") or []
+        if not personalizations or len(personalizations) > MAX_PERSONALIZATIONS or not payload.get("from"):
+            stats["rejected"] += 1
+            return JSONResponse({"errors": [{"message": "invalid payload"}]}, status_code=400)
+
+        stats["accepted"] += 1
+        stats["recipients"] += sum(len(p.get("to") or []) for p in personalizations)
+        return Response(status_code=202, headers={"X-Message-Id": uuid.uuid4().hex[:22]})
+
+    @app.get("/stats")
+    async def get_stats():
+        return dict(stats)
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Mean simulated response time")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 429/5xx")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency_ms, args.error_rate), host=args.host, port=args.port, log_level="warning")
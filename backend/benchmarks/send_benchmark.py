@@ -0,0 +1,61 @@
+"""
+Measure email send throughput of the SendGrid transport against the mock server.
+
+Compares one request per recipient with multi-personalization requests at a
+given concurrency:
+
+    cd backend
+    python -m benchmarks.mock_sendgrid --latency-ms 150 &
+    python -m benchmarks.send_benchmark --url http://localhost:8025 --emails 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+from app.services.sendgrid_transport import SendGridTransport
+
+
+def build_payload(recipients):
+    return {
+        "personalizations": [
+            {"to": [{"email": email}], "subject": f"Hello {email}", "substitutions": {"-body_html-": f"<p>Hi {email}</p>"}}
+            for email in recipients
+        ],
+        "from": {"email": "insurance@youragency.com", "name": "Insurance Specialist"},
+        "content": [{"type": "text/html", "value": "-body_html-"}],
+    }
+
+
+async def run(transport: SendGridTransport, emails: int, per_request: int, concurrency: int) -> float:
+    recipients = [f"prospect{i}@example.com" for i in range(emails)]
+    batches = [recipients[i:i + per_request] for i in range(0, emails, per_request)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(batch):
+        async with semaphore:
+            await transport.send(build_payload(batch))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(batch) for batch in batches))
+    return time.perf_counter() - started
+
+
+async def main(url: str, emails: int, concurrency: int, per_request: int):
+    transport = SendGridTransport(base_url=url, max_connections=concurrency)
+    try:
+        print(f"{'mode':<28} {'requests':>9} {'seconds':>9} {'emails/s':>10}")
+        for label, size in (("one recipient per request", 1), (f"{per_request} per request", per_request)):
+            elapsed = await run(transport, emails, size, concurrency)
+            requests = -(-emails // size)
+            print(f"{label:<28} {requests:>9} {elapsed:>9.2f} {emails / elapsed:>10.1f}")
+    finally:
+        await transport.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8025")
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight")
+    parser.add_argument("--per-request", type=int, default=100, help="Personalizations per batched request")
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.emails, args.concurrency, args.per_request))
@@ -0,0 +1,86 @@
+"""
+Measure cold start cost of the API process: time to import app.main and the
+resident memory of the process afterwards, averaged over fresh interpreters.
+
+    cd backend
+    python -m benchmarks.startup_benchmark --runs 5 --top 15
+
+Services and their clients are built lazily by the shared container, so the
+report also lists which services exist right after import (ideally none),
+and whether any provider SDK was imported. --top breaks the import time down
+by module using python -X importtime.
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+
+
+PROBE = """
+import json, resource, time
+started = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - started
+import sys
+from app.services.container import services
+print(json.dumps({
+    "import_s": elapsed,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "built": services.built(),
+    "sdks": [name for name in SDK_MODULES if name in sys.modules],
+}))
+"""
+
+# Provider SDKs that should only be imported on first use
+SDK_MODULES = ["langchain_groq", "langchain_core", "groq", "twilio", "sendgrid"]
+
+# "import time: self [us] | cumulative | imported package" lines from -X importtime
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def probe() -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", f"SDK_MODULES = {SDK_MODULES!r}\n{PROBE}"], check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int):
+    """
+    Top-level packages by cumulative import time, from one -X importtime run.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], check=True, capture_output=True, text=True
+    ).stderr
+    packages = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:  # Direct imports only, nested ones are included in them
+            packages[match.group(4)] = int(match.group(2))
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main(runs: int, top: int):
+    results = [probe() for _ in range(runs)]
+    imports = [r["import_s"] for r in results]
+    memory = [r["max_rss_mb"] for r in results]
+
+    print(f"import app.main: mean {statistics.mean(imports) * 1000:.0f} ms, min {min(imports) * 1000:.0f} ms")
+    print(f"max RSS after import: mean {statistics.mean(memory):.1f} MB")
+    print(f"services built at import: {', '.join(results[-1]['built']) or 'none'}")
+    print(f"provider SDKs imported: {', '.join(results[-1]['sdks']) or 'none'}")
+
+    if top:
+        print(f"{'module':<40} {'cumulative ms':>14}")
+        for module, micros in slowest_imports(top):
+            print(f"{module:<40} {micros / 1000:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to average over")
+    parser.add_argument("--top", type=int, default=0, help="Also list the N slowest top-level imports")
+    args = parser.parse_args()
+    main(args.runs, args.top)
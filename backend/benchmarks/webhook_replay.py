@@ -0,0 +1,99 @@
+"""
+Local stand-in for the SendGrid Event Webhook.
+
+Replays recorded event payloads against POST /emails/webhook/sendgrid in
+batches, the way SendGrid delivers them, and reports ingestion throughput:
+
+    cd backend
+    python -m benchmarks.webhook_replay --file benchmarks/fixtures/sendgrid_events.json
+
+Without --file, synthetic open/click events are generated for the email
+engagements given by --engagement-ids (matched through the engagement_id
+custom arg). --redeliver re-sends a share of every batch to exercise dedupe.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter
+import httpx
+
+
+def load_events(path: str):
+    """
+    Read events from a JSON array (a recorded webhook body) or NDJSON file.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def synthesize_events(engagement_ids, count: int, click_ratio: float):
+    now = int(time.time())
+    return [
+        {
+            "email": f"prospect{engagement_id}@example.com",
+            "timestamp": now,
+            "event": "click" if random.random() < click_ratio else "open",
+            "sg_event_id": uuid.uuid4().hex,
+            "engagement_id": str(engagement_id),
+        }
+        for engagement_id in (random.choice(engagement_ids) for _ in range(count))
+    ]
+
+
+def parse_id_range(value: str):
+    start, _, end = value.partition("-")
+    return list(range(int(start), int(end or start) + 1))
+
+
+async def main(url: str, events, batch_size: int, concurrency: int, redeliver: float):
+    batches = [events[i:i + batch_size] for i in range(0, len(events), batch_size)]
+    # SendGrid retries deliveries it considers failed, so some events arrive twice
+    for batch in batches:
+        batch.extend(random.sample(batch, int(len(batch) * redeliver)))
+
+    totals = Counter()
+    queue = asyncio.Queue()
+    for batch in batches:
+        queue.put_nowait(batch)
+
+    async def sender(client: httpx.AsyncClient):
+        while not queue.empty():
+            batch = queue.get_nowait()
+            response = await client.post("/emails/webhook/sendgrid", json=batch)
+            response.raise_for_status()
+            totals.update(response.json())
+
+    started = time.perf_counter()
+    async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+        await asyncio.gather(*(sender(client) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    print(f"{totals['received']} events in {len(batches)} batches, {elapsed:.2f}s: "
+          f"{totals['received'] / elapsed:.0f} events/s ({totals['received'] / elapsed * 60:.0f}/min)")
+    for key in ("recorded", "duplicates", "ignored", "unmatched"):
+        print(f"  {key:<11} {totals[key]:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--file", help="Recorded webhook payload (JSON array or NDJSON)")
+    parser.add_argument("--engagement-ids", default="1-100", help="Engagement id range for synthetic events, e.g. 1-500")
+    parser.add_argument("--events", type=int, default=20000, help="Synthetic events to generate")
+    parser.add_argument("--click-ratio", type=float, default=0.2)
+    parser.add_argument("--batch-size", type=int, default=1000, help="Events per webhook request")
+    parser.add_argument("--concurrency", type=int, default=4, help="Requests in flight")
+    parser.add_argument("--redeliver", type=float, default=0.05, help="Share of each batch sent twice")
+    args = parser.parse_args()
+
+    if args.file:
+        events = load_events(args.file)
+    else:
+        events = synthesize_events(parse_id_range(args.engagement_ids), args.events, args.click_ratio)
+    asyncio.run(main(args.url, events, args.batch_size, args.concurrency, args.redeliver))
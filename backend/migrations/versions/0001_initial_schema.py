@@ -0,0 +1,52 @@
+"""Initial schema: prospects and engagements
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "prospects",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("company_name", sa.String(255)),
+        sa.Column("industry", sa.String(100)),
+        sa.Column("website", sa.String(255), nullable=True),
+        sa.Column("contact_person", sa.String(100), nullable=True),
+        sa.Column("email", sa.String(255), nullable=True),
+        sa.Column("phone", sa.String(20), nullable=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_prospects_id", "prospects", ["id"])
+    op.create_index("ix_prospects_company_name", "prospects", ["company_name"], unique=True)
+    op.create_index("ix_prospects_industry", "prospects", ["industry"])
+
+    op.create_table(
+        "engagements",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("prospect_id", sa.Integer(), sa.ForeignKey("prospects.id")),
+        sa.Column("type", sa.String(50)),
+        sa.Column("content", sa.Text()),
+        sa.Column("sent_at", sa.DateTime()),
+        sa.Column("opened", sa.Boolean()),
+        sa.Column("clicked", sa.Boolean()),
+        sa.Column("responded", sa.Boolean()),
+        sa.Column("engagement_score", sa.Float()),
+        sa.Column("notes", sa.Text(), nullable=True),
+    )
+    op.create_index("ix_engagements_id", "engagements", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("engagements")
+    op.drop_table("prospects")
@@ -0,0 +1,131 @@
+"""Jobs, LLM cache, engagement summaries, event log and webhook dedupe
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+
+Databases created by the old create_all startup may already have some of
+these tables, so existing tables, columns and indexes are skipped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    def create_index(name, table, columns, unique=False):
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns, unique=unique)
+
+    create_index("ix_prospects_industry_id", "prospects", ["industry", "id"])
+
+    if "message_id" not in {column["name"] for column in inspector.get_columns("engagements")}:
+        op.add_column("engagements", sa.Column("message_id", sa.String(100), nullable=True))
+    create_index("ix_engagements_message_id", "engagements", ["message_id"])
+
+    if "jobs" not in tables:
+        op.create_table(
+            "jobs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("type", sa.String(50)),
+            sa.Column("status", sa.String(20)),
+            sa.Column("total", sa.Integer()),
+            sa.Column("processed", sa.Integer()),
+            sa.Column("failed", sa.Integer()),
+            sa.Column("worker_id", sa.String(100), nullable=True),
+            sa.Column("heartbeat_at", sa.DateTime(), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("updated_at", sa.DateTime()),
+            sa.Column("completed_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_jobs_id", "jobs", ["id"])
+        op.create_index("ix_jobs_type", "jobs", ["type"])
+        op.create_index("ix_jobs_status", "jobs", ["status"])
+
+    if "job_items" not in tables:
+        op.create_table(
+            "job_items",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("job_id", sa.Integer(), sa.ForeignKey("jobs.id")),
+            sa.Column("prospect_id", sa.Integer(), sa.ForeignKey("prospects.id")),
+            sa.Column("status", sa.String(20)),
+            sa.Column("engagement_id", sa.Integer(), sa.ForeignKey("engagements.id"), nullable=True),
+            sa.Column("error", sa.Text(), nullable=True),
+            sa.Column("processed_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_job_items_id", "job_items", ["id"])
+        op.create_index("ix_job_items_job_id", "job_items", ["job_id"])
+        op.create_index("ix_job_items_status", "job_items", ["status"])
+
+    if "llm_cache_entries" not in tables:
+        op.create_table(
+            "llm_cache_entries",
+            sa.Column("key", sa.String(64), primary_key=True),
+            sa.Column("model", sa.String(100)),
+            sa.Column("response", sa.Text()),
+            sa.Column("created_at", sa.DateTime()),
+            sa.Column("expires_at", sa.DateTime()),
+        )
+        op.create_index("ix_llm_cache_entries_created_at", "llm_cache_entries", ["created_at"])
+        op.create_index("ix_llm_cache_entries_expires_at", "llm_cache_entries", ["expires_at"])
+
+    if "engagement_summaries" not in tables:
+        op.create_table(
+            "engagement_summaries",
+            sa.Column("prospect_id", sa.Integer(), sa.ForeignKey("prospects.id"), primary_key=True),
+            sa.Column("total_count", sa.Integer()),
+            sa.Column("email_count", sa.Integer()),
+            sa.Column("call_count", sa.Integer()),
+            sa.Column("opened_count", sa.Integer()),
+            sa.Column("clicked_count", sa.Integer()),
+            sa.Column("responded_count", sa.Integer()),
+            sa.Column("total_score", sa.Float()),
+            sa.Column("last_engagement_at", sa.DateTime(), nullable=True),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+
+    if "engagement_events" not in tables:
+        op.create_table(
+            "engagement_events",
+            sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+            sa.Column("engagement_id", sa.Integer(), sa.ForeignKey("engagements.id")),
+            sa.Column("prospect_id", sa.Integer(), sa.ForeignKey("prospects.id")),
+            sa.Column("event_type", sa.String(20)),
+            sa.Column("score_delta", sa.Float()),
+            sa.Column("occurred_at", sa.DateTime()),
+            sa.Column("note", sa.Text(), nullable=True),
+            sa.Column("rolled_up_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_engagement_events_engagement_id", "engagement_events", ["engagement_id"])
+        op.create_index("ix_engagement_events_prospect_id", "engagement_events", ["prospect_id"])
+        op.create_index("ix_engagement_events_pending", "engagement_events", ["rolled_up_at", "id"])
+
+    if "processed_webhook_events" not in tables:
+        op.create_table(
+            "processed_webhook_events",
+            sa.Column("sg_event_id", sa.String(100), primary_key=True),
+            sa.Column("event", sa.String(50)),
+            sa.Column("received_at", sa.DateTime()),
+        )
+        op.create_index("ix_processed_webhook_events_received_at", "processed_webhook_events", ["received_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("processed_webhook_events")
+    op.drop_table("engagement_events")
+    op.drop_table("engagement_summaries")
+    op.drop_table("llm_cache_entries")
+    op.drop_table("job_items")
+    op.drop_table("jobs")
+    op.drop_index("ix_engagements_message_id", table_name="engagements")
+    op.drop_column("engagements", "message_id")
+    op.drop_index("ix_prospects_industry_id", table_name="prospects")
@@ -0,0 +1,42 @@
+"""LLM usage accounting and per-job token budgets
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("jobs", sa.Column("token_budget", sa.Integer(), nullable=True))
+
+    op.create_table(
+        "llm_usage",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("task", sa.String(20)),
+        sa.Column("model_id", sa.String(100)),
+        sa.Column("prospect_id", sa.Integer(), nullable=True),
+        sa.Column("campaign", sa.String(100), nullable=True),
+        sa.Column("industry", sa.String(50), nullable=True),
+        sa.Column("input_tokens", sa.Integer()),
+        sa.Column("output_tokens", sa.Integer()),
+        sa.Column("latency_ms", sa.Float()),
+        sa.Column("cached", sa.Boolean()),
+    )
+    op.create_index("ix_llm_usage_created_at", "llm_usage", ["created_at"])
+    op.create_index("ix_llm_usage_model_id", "llm_usage", ["model_id"])
+    op.create_index("ix_llm_usage_prospect_id", "llm_usage", ["prospect_id"])
+    op.create_index("ix_llm_usage_campaign", "llm_usage", ["campaign"])
+
+
+def downgrade() -> None:
+    op.drop_table("llm_usage")
+    op.drop_column("jobs", "token_budget")
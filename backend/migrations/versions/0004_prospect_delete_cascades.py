@@ -0,0 +1,47 @@
+"""Let prospects be deleted once they have summaries, events or job items
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+
+Summaries and engagement events go with their prospect, job items keep
+their history with prospect_id set to NULL. The original foreign keys were
+created without names, so they are looked up by column.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+# table -> ON DELETE action for its prospect_id foreign key
+PROSPECT_FOREIGN_KEYS = {
+    "engagement_summaries": "CASCADE",
+    "engagement_events": "CASCADE",
+    "job_items": "SET NULL",
+}
+
+
+def _replace_prospect_foreign_key(table: str, ondelete) -> None:
+    inspector = sa.inspect(op.get_bind())
+    for foreign_key in inspector.get_foreign_keys(table):
+        if foreign_key["referred_table"] == "prospects" and foreign_key["constrained_columns"] == ["prospect_id"]:
+            op.drop_constraint(foreign_key["name"], table, type_="foreignkey")
+
+    op.create_foreign_key(
+        f"fk_{table}_prospect_id", table, "prospects", ["prospect_id"], ["id"], ondelete=ondelete
+    )
+
+
+def upgrade() -> None:
+    for table, ondelete in PROSPECT_FOREIGN_KEYS.items():
+        _replace_prospect_foreign_key(table, ondelete)
+
+
+def downgrade() -> None:
+    for table in PROSPECT_FOREIGN_KEYS:
+        _replace_prospect_foreign_key(table, None)
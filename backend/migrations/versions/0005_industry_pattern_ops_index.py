@@ -0,0 +1,31 @@
+"""Rebuild the prospect industry index with varchar_pattern_ops
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+
+A plain btree index can only serve industry LIKE 'prefix%' under the C
+collation. With varchar_pattern_ops Postgres uses it for prefix matches
+under any collation, and still for equality. Other databases ignore the
+operator class.
+"""
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_prospects_industry_id", table_name="prospects")
+    op.create_index(
+        "ix_prospects_industry_id", "prospects", ["industry", "id"],
+        postgresql_ops={"industry": "varchar_pattern_ops"}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_prospects_industry_id", table_name="prospects")
+    op.create_index("ix_prospects_industry_id", "prospects", ["industry", "id"])
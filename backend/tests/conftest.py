@@ -0,0 +1,70 @@
+"""
+Shared fixtures. Tests run against a throwaway SQLite database through
+aiosqlite, with LLM tasks routed to the offline local provider.
+"""
+import os
+import tempfile
+
+# Settings are read at import, so configure them before anything imports app
+_db_dir = tempfile.mkdtemp(prefix="outreach-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_db_dir}/test.db"
+os.environ.setdefault("GROQ_API_KEY", "test")
+os.environ["LLM_EMAIL_MODEL"] = "local:email"
+os.environ["LLM_ADVICE_MODEL"] = "local:advice"
+os.environ["LLM_CALL_SCRIPT_MODEL"] = "local:call-script"
+os.environ["LLM_LOCAL_LATENCY_MS"] = "0"
+os.environ["TRACING_EXPORTER"] = "none"
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import BigInteger, event
+from sqlalchemy.ext.compiler import compiles
+from app.database import Base, SessionLocal, engine
+import app.models  # noqa: F401  Registers every table on Base.metadata
+
+
+@compiles(BigInteger, "sqlite")
+def _sqlite_big_integer(type_, compiler, **kw):
+    # SQLite only autoincrements INTEGER PRIMARY KEY columns
+    return "INTEGER"
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def _enforce_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@pytest.fixture(autouse=True)
+async def schema():
+    """
+    A fresh schema and LLM cache for every test.
+    """
+    from app.services.llm_cache import llm_cache
+
+    llm_cache.clear()
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.drop_all)
+        await connection.run_sync(Base.metadata.create_all)
+    yield
+    # Usage rows are buffered on a timer in the test's event loop
+    from app.services.llm_usage import llm_usage
+
+    await llm_usage.flush()
+    # Connections are bound to the test's event loop
+    await engine.dispose()
+
+
+@pytest.fixture
+async def db():
+    async with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+async def client():
+    from app.main import app
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as http_client:
+        yield http_client
@@ -0,0 +1,39 @@
+import pytest
+from app.config import settings
+from app.models.prospect import Prospect
+from app.services.ai_service import AIService
+from app.services.workflow_service import WorkflowService
+
+
+@pytest.fixture
+def prospect():
+    return Prospect(id=1, company_name="Acme", industry="Software", email="acme@example.com")
+
+
+def calls(service: AIService):
+    return {task: provider.usage["calls"] for task, provider in service.providers.items()}
+
+
+async def test_combined_generation_takes_one_call(prospect, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_COMBINED_GENERATION", True)
+    service = AIService()
+    before = calls(service)
+
+    result = await WorkflowService(ai_service=service).generate(prospect, None)
+
+    after = calls(service)
+    assert (after["email"] - before["email"], after["advice"] - before["advice"]) == (1, 0)
+    assert result["engagement_advice"]
+    assert set(result["email_content"]) == {"subject", "body", "metadata"}
+
+
+async def test_separate_generation_asks_the_advice_model(prospect, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_COMBINED_GENERATION", False)
+    service = AIService()
+    before = calls(service)
+
+    result = await WorkflowService(ai_service=service).generate(prospect, None)
+
+    after = calls(service)
+    assert (after["email"] - before["email"], after["advice"] - before["advice"]) == (1, 1)
+    assert result["engagement_advice"]
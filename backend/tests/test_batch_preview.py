@@ -0,0 +1,54 @@
+import asyncio
+import json
+import pytest
+from app.services.workflow_service import WorkflowService
+from tests.utils import add_prospect
+
+
+async def test_generate_batch_streams_drafts_and_missing_prospects(db, client):
+    prospects = [await add_prospect(db, name) for name in ["Acme", "Globex"]]
+
+    response = await client.post("/emails/generate-batch", json={"prospect_ids": [prospects[0].id, 404, prospects[1].id]})
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[0] == {"prospect_id": 404, "status": "not_found"}
+    assert sorted((line["company_name"], line["status"]) for line in lines[1:]) == [
+        ("Acme", "generated"), ("Globex", "generated")
+    ]
+
+
+async def test_process_batch_keeps_the_requested_order(db):
+    prospects = [await add_prospect(db, name) for name in ["Acme", "Globex", "Initech"]]
+    ids = [prospects[2].id, prospects[0].id, prospects[1].id]
+
+    results = await WorkflowService().process_batch(db, ids)
+
+    assert [result["prospect"].id for result in results] == ids
+    with pytest.raises(ValueError, match="404"):
+        await WorkflowService().process_batch(db, [prospects[0].id, 404])
+
+
+async def test_generate_many_bounds_concurrency(db, monkeypatch, caplog):
+    prospects = [await add_prospect(db, f"Prospect {i}") for i in range(6)]
+    service = WorkflowService()
+    running = peak = 0
+
+    async def generate(prospect, engagement_summary, bypass_cache=False):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if prospect.company_name == "Prospect 3":
+            raise RuntimeError("provider down")
+        return {"prospect": prospect}
+
+    monkeypatch.setattr(service, "generate", generate)
+    loaded = await service.load_prospects(db, [prospect.id for prospect in prospects])
+
+    results = dict([item async for item in service.generate_many(loaded, concurrency=2)])
+
+    assert peak == 2
+    assert len(results) == 6
+    assert isinstance(results[prospects[3].id], RuntimeError)
+    assert f"Error generating email for prospect {prospects[3].id}: provider down" in caplog.text
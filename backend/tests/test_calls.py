@@ -0,0 +1,38 @@
+from datetime import datetime
+from sqlalchemy import select
+from app.models.engagement import Engagement
+from app.models.engagement_event import EngagementEvent
+from tests.utils import add_prospect
+
+
+async def test_update_call_outcome_keeps_notes(db, client):
+    prospect = await add_prospect(db)
+    engagement = Engagement(
+        prospect_id=prospect.id,
+        type="call",
+        sent_at=datetime.utcnow(),
+        engagement_score=2.0,
+        notes="Call script: Call Script for Acme"
+    )
+    db.add(engagement)
+    await db.commit()
+
+    first = await client.post(
+        "/calls/update-outcome",
+        params={"engagement_id": engagement.id},
+        json={"connected": True, "notes": "Asked for a quote"}
+    )
+    second = await client.post(
+        "/calls/update-outcome",
+        params={"engagement_id": engagement.id},
+        json={"notes": "Left a voicemail"}
+    )
+
+    assert first.status_code == second.status_code == 200
+    assert first.json()["engagement_score"] == 5.0
+    assert second.json()["notes"] == "Call script: Call Script for Acme\nOutcome: Asked for a quote\nOutcome: Left a voicemail"
+    events = (await db.scalars(select(EngagementEvent).order_by(EngagementEvent.id))).all()
+    assert [(event.event_type, event.note) for event in events] == [
+        ("connected", "Asked for a quote"),
+        ("outcome", "Left a voicemail"),
+    ]
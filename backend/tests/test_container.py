@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+from app.services.container import ServiceContainer
+from app.services.llm_providers import get_provider
+
+
+async def test_services_are_built_once_on_first_use():
+    container = ServiceContainer()
+    assert container.built() == []
+
+    workflow = container.workflow_service
+
+    assert container.workflow_service is workflow
+    assert container.built() == ["ai_service", "email_service", "event_service", "summary_service", "workflow_service"]
+
+
+async def test_services_share_their_dependencies():
+    container = ServiceContainer()
+
+    assert container.workflow_service.email_service is container.email_service
+    assert container.call_service.ai_service is container.workflow_service.ai_service
+    assert container.email_service.event_service is container.event_service
+    assert container.ingestion_service.event_service is container.event_service
+
+
+async def test_aclose_drops_every_service():
+    container = ServiceContainer()
+    email_service = container.email_service
+
+    await container.aclose()
+
+    assert container.built() == []
+    assert container.email_service is not email_service
+
+
+class FakeSDKClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeAsyncSDKClient(FakeSDKClient):
+    async def close(self):
+        self.closed = True
+
+
+async def test_aclose_closes_llm_clients():
+    provider = get_provider("groq:shutdown-test")
+    sdk_client, async_sdk_client = FakeSDKClient(), FakeAsyncSDKClient()
+    provider._chat_model = SimpleNamespace(
+        client=SimpleNamespace(_client=sdk_client),
+        async_client=SimpleNamespace(_client=async_sdk_client)
+    )
+
+    await ServiceContainer().aclose()
+
+    assert sdk_client.closed and async_sdk_client.closed
+    assert provider._chat_model is None
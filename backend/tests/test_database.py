@@ -0,0 +1,63 @@
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import PoolStats, get_async_database_url, get_db
+from tests.utils import add_prospect
+
+
+class FakePool:
+    def size(self):
+        return 5
+
+    def checkedout(self):
+        return 2
+
+    def checkedin(self):
+        return 3
+
+    def overflow(self):
+        return -3
+
+
+def test_sync_drivers_are_swapped_for_async_ones():
+    assert get_async_database_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+    assert get_async_database_url("mysql+pymysql://u:p@db/app") == "mysql+aiomysql://u:p@db/app"
+    assert get_async_database_url("sqlite+aiosqlite:///app.db") == "sqlite+aiosqlite:///app.db"
+
+
+def test_pool_stats_snapshot():
+    stats = PoolStats(window=100)
+    for ms in range(1, 101):
+        stats.record_checkout(ms / 1000)
+
+    snapshot = stats.snapshot(FakePool())
+
+    assert (snapshot["pool_size"], snapshot["checked_out"], snapshot["overflow"]) == (5, 2, 0)
+    assert snapshot["checkouts"] == 100
+    assert round(snapshot["checkout_wait_p95_ms"]) == 95
+    assert round(snapshot["checkout_wait_max_ms"]) == 100
+
+
+async def test_pool_endpoint_counts_checkouts(client):
+    before = (await client.get("/metrics/db-pool")).json()["checkouts"]
+    await client.get("/prospects/")
+
+    after = (await client.get("/metrics/db-pool")).json()
+
+    assert after["checkouts"] > before
+    assert after["checked_out"] == 0
+
+
+async def test_get_db_yields_an_async_session():
+    sessions = get_db()
+    session = await sessions.__anext__()
+
+    assert isinstance(session, AsyncSession)
+    await sessions.aclose()
+
+
+async def test_concurrent_requests_get_their_own_sessions(db, client):
+    prospects = [await add_prospect(db, f"Prospect {i}") for i in range(10)]
+
+    responses = await asyncio.gather(*(client.get(f"/prospects/{prospect.id}") for prospect in prospects))
+
+    assert [response.json()["company_name"] for response in responses] == [p.company_name for p in prospects]
@@ -0,0 +1,112 @@
+import asyncio
+import pytest
+from sqlalchemy import select
+from app.models.engagement import Engagement
+from app.models.engagement_event import EngagementEvent
+from app.services import email_service as email_service_module
+from app.services.email_service import EmailService
+from app.services.event_ingestion_service import EventIngestionService
+from app.services.rate_limiter import TokenBucket
+from app.services.sendgrid_transport import SendGridError
+from tests.utils import FakeTransport, add_prospect
+
+CONTENT = {"subject": "Hello", "body": "Hi there"}
+
+
+class RejectingTransport(FakeTransport):
+    """
+    Rejects requests that include bad@example.com, like SendGrid does with a 400.
+    """
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+
+    async def send(self, payload):
+        # Nothing may be written before SendGrid has answered
+        assert not self.session.in_transaction()
+        if any(p["to"][0]["email"] == "bad@example.com" for p in payload["personalizations"]):
+            raise SendGridError(400, "invalid recipient")
+        return await super().send(payload)
+
+
+@pytest.fixture
+def charged(monkeypatch):
+    tokens = []
+
+    class Limiter:
+        async def acquire(self, count=1.0):
+            tokens.append(count)
+
+    monkeypatch.setattr(email_service_module, "sendgrid_limiter", Limiter())
+    return tokens
+
+
+async def emails_for(db, *names):
+    prospects = [await add_prospect(db, name) for name in names]
+    return [(prospect, CONTENT) for prospect in prospects]
+
+
+async def test_send_emails_records_after_sending(db, charged):
+    emails = await emails_for(db, "Acme", "Globex")
+    service = EmailService()
+    service.transport = RejectingTransport(db)
+
+    engagements = await service.send_emails(db, emails)
+
+    assert [engagement.message_id for engagement in engagements] == ["message-1", "message-1"]
+    assert [p["custom_args"] for p in service.transport.payloads[0]["personalizations"]] == [
+        {"prospect_id": str(prospect.id)} for prospect, _ in emails
+    ]
+    assert charged == [2]
+
+
+async def test_rejected_batch_is_retried_one_by_one(db, charged):
+    emails = await emails_for(db, "Acme", "Bad", "Globex")
+    service = EmailService()
+    service.transport = RejectingTransport(db)
+
+    results = await service.send_emails(db, emails)
+
+    assert isinstance(results[1], SendGridError)
+    assert sorted(service.transport.recipients) == ["acme@example.com", "globex@example.com"]
+    assert sorted(charged) == [1, 1, 1, 3]
+    stored = (await db.scalars(select(Engagement.prospect_id))).all()
+    assert sorted(stored) == [emails[0][0].id, emails[2][0].id]
+
+
+async def test_single_rejected_email_raises(db, charged):
+    emails = await emails_for(db, "Bad")
+    service = EmailService()
+    service.transport = RejectingTransport(db)
+
+    with pytest.raises(SendGridError):
+        await service.send_email(db, *emails[0])
+    assert (await db.scalars(select(Engagement))).all() == []
+
+
+async def test_events_match_recipients_of_one_request(db, charged):
+    emails = await emails_for(db, "Acme", "Globex")
+    service = EmailService()
+    service.transport = FakeTransport()
+    engagements = await service.send_emails(db, emails)
+    globex = emails[1][0]
+
+    report = await EventIngestionService().ingest(db, [{
+        "event": "open",
+        "sg_event_id": "event-1",
+        "sg_message_id": "message-1.filter0001",
+        "prospect_id": str(globex.id),
+        "timestamp": 1700000000,
+    }])
+
+    event = await db.scalar(select(EngagementEvent))
+    assert report["recorded"] == 1
+    assert (event.engagement_id, event.prospect_id) == (engagements[1].id, globex.id)
+
+
+async def test_acquire_beyond_capacity_goes_into_debt():
+    bucket = TokenBucket(rate=100.0, capacity=2)
+
+    await asyncio.wait_for(bucket.acquire(5), timeout=1)
+
+    assert bucket.tokens < -2
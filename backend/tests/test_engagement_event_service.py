@@ -0,0 +1,71 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from app.config import settings
+from app.models.engagement import Engagement
+from app.models.engagement_event import EngagementEvent
+from app.models.engagement_summary import EngagementSummary
+from app.services.engagement_event_service import EngagementEventService
+from app.services.engagement_summary_service import EngagementSummaryService
+from tests.utils import add_prospect
+
+
+async def add_engagement(db):
+    prospect = await add_prospect(db)
+    engagement = Engagement(prospect_id=prospect.id, type="email", sent_at=datetime.utcnow(), engagement_score=0.0)
+    db.add(engagement)
+    await db.flush()
+    await EngagementSummaryService().record_engagement(db, engagement)
+    await db.commit()
+    return engagement
+
+
+async def reload(db, model, key):
+    db.expunge_all()
+    return await db.get(model, key)
+
+
+async def test_rollup_folds_events_into_engagement_and_summary(db):
+    service = EngagementEventService()
+    engagement = await add_engagement(db)
+    for event_type in ["open", "open", "click"]:
+        await service.record(db, engagement, event_type)
+    await db.commit()
+
+    assert await service.pending_score(db, engagement.id) == 4.0
+    assert await service.rollup(db) == 3
+    assert await service.rollup(db) == 0
+
+    rolled_up = await reload(db, Engagement, engagement.id)
+    summary = await db.get(EngagementSummary, engagement.prospect_id)
+    assert (rolled_up.opened, rolled_up.clicked, rolled_up.responded, rolled_up.engagement_score) == (True, True, False, 4.0)
+    assert (summary.opened_count, summary.clicked_count, summary.total_score) == (1, 1, 4.0)
+    assert await service.pending_score(db, engagement.id) == 0.0
+    assert await db.scalar(select(func.count()).where(EngagementEvent.rolled_up_at == None)) == 0
+
+
+async def test_flags_are_counted_once_across_rollups(db):
+    service = EngagementEventService()
+    engagement = await add_engagement(db)
+
+    for _ in range(2):
+        await service.record(db, engagement, "open")
+        await db.commit()
+        await service.rollup(db)
+
+    summary = await reload(db, EngagementSummary, engagement.prospect_id)
+    assert (summary.opened_count, summary.total_score) == (1, 2.0)
+
+
+async def test_rollup_pending_takes_every_batch(db, monkeypatch):
+    service = EngagementEventService()
+    engagement = await add_engagement(db)
+    for _ in range(5):
+        await service.record(db, engagement, "click")
+    await db.commit()
+
+    original = service.rollup
+    monkeypatch.setattr(service, "rollup", lambda db: original(db, limit=2))
+    monkeypatch.setattr(settings, "ENGAGEMENT_ROLLUP_BATCH_SIZE", 2)
+
+    assert await service.rollup_pending(db) == 5
+    assert (await reload(db, Engagement, engagement.id)).engagement_score == 10.0
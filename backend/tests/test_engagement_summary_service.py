@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+from app.models.engagement import Engagement
+from app.models.engagement_summary import EngagementSummary
+from app.models.prospect import Prospect
+from app.services.engagement_summary_service import EngagementSummaryService
+
+
+async def add_prospect(db, name="Acme"):
+    prospect = Prospect(company_name=name, industry="Software", email=f"{name.lower()}@example.com")
+    db.add(prospect)
+    await db.flush()
+    return prospect
+
+
+async def test_first_engagement_creates_summary(db):
+    prospect = await add_prospect(db)
+    engagement = Engagement(prospect_id=prospect.id, type="email", sent_at=datetime(2026, 1, 1), engagement_score=0.0)
+    db.add(engagement)
+    await db.flush()
+
+    await EngagementSummaryService().record_engagement(db, engagement)
+    await db.commit()
+
+    summary = await db.get(EngagementSummary, prospect.id)
+    assert summary.total_count == 1
+    assert summary.email_count == 1
+    assert summary.call_count == 0
+    assert summary.opened_count == 0
+    assert summary.last_engagement_at == datetime(2026, 1, 1)
+
+
+async def test_later_engagements_update_summary(db):
+    prospect = await add_prospect(db)
+    service = EngagementSummaryService()
+    first = datetime(2026, 1, 1)
+
+    for engagement_type, sent_at in [("email", first), ("call", first + timedelta(days=1)), ("email", first - timedelta(days=1))]:
+        engagement = Engagement(prospect_id=prospect.id, type=engagement_type, sent_at=sent_at, opened=True)
+        db.add(engagement)
+        await db.flush()
+        await service.record_engagement(db, engagement)
+    await db.commit()
+
+    summary = await service.get(db, prospect.id)
+    await db.refresh(summary)
+    assert (summary.total_count, summary.email_count, summary.call_count, summary.opened_count) == (3, 2, 1, 3)
+    # An older engagement doesn't move last_engagement_at back
+    assert summary.last_engagement_at == first + timedelta(days=1)
+
+
+async def test_apply_many_creates_missing_rows(db):
+    known = await add_prospect(db, "Known")
+    new = await add_prospect(db, "New")
+    service = EngagementSummaryService()
+    await service.apply(db, known.id, {"total_count": 1, "opened_count": 1})
+
+    await service.apply_many(db, {known.id: {"opened_count": 2}, new.id: {"clicked_count": 1, "total_score": 0.5}})
+    await db.commit()
+
+    known_summary = await db.get(EngagementSummary, known.id)
+    new_summary = await db.get(EngagementSummary, new.id)
+    await db.refresh(known_summary)
+    assert known_summary.opened_count == 3
+    assert (new_summary.clicked_count, new_summary.total_score, new_summary.total_count) == (1, 0.5, 0)
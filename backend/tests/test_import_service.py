@@ -0,0 +1,98 @@
+import io
+import json
+from sqlalchemy import func, select
+from app.models.prospect import Prospect
+from app.services.import_service import ImportService, csv_lines
+from tests.utils import add_prospect
+
+
+CSV = (
+    "﻿company_name,industry,email\r\n"
+    "Acme,Software,info@acme.com\r\n"
+    "\"Globex, Inc\",\"Banking\nand Finance\",ops@globex.com\r\n"
+    "Acme,Software,dup@acme.com\r\n"
+    ",Retail,broken@example.com\r\n"
+)
+
+
+class ReadOnlyFile:
+    """
+    Exposes nothing but read(), like the SpooledTemporaryFile UploadFile wraps on Python 3.10.
+    """
+    def __init__(self, data: bytes):
+        self._buffer = io.BytesIO(data)
+
+    def read(self, size: int = -1) -> bytes:
+        return self._buffer.read(size)
+
+
+def test_csv_lines_handles_split_multibyte_characters():
+    data = "name\r\nCafé Ünïcode\r\nlast".encode("utf-8")
+    assert list(csv_lines(io.BytesIO(data), read_size=3)) == ["name\r\n", "Café Ünïcode\r\n", "last"]
+
+
+async def test_import_csv_from_read_only_file(db):
+    service = ImportService(chunk_size=2)
+    reader = await service.open_csv(ReadOnlyFile(CSV.encode("utf-8")))
+
+    reports = [report async for report in service.import_csv(db, reader)]
+
+    final = reports[-1]
+    assert final["done"]
+    assert (final["total"], final["inserted"], final["skipped"], final["invalid"]) == (4, 2, 1, 1)
+    assert final["errors"][0]["row"] == 4
+    industries = (await db.scalars(select(Prospect.industry).order_by(Prospect.company_name))).all()
+    assert industries == ["Software", "Banking\nand Finance"]
+
+
+async def test_open_csv_rejects_missing_columns():
+    try:
+        await ImportService().open_csv(io.BytesIO(b"name,email\nAcme,a@b.com\n"))
+    except ValueError as e:
+        assert "company_name" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+async def test_import_csv_endpoint_streams_progress(db, client):
+    response = await client.post(
+        "/prospects/import-csv?progress=true",
+        files={"file": ("prospects.csv", CSV.encode("utf-8"), "text/csv")}
+    )
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert lines[-1]["done"] and lines[-1]["inserted"] == 2
+    assert await db.scalar(select(func.count(Prospect.id))) == 2
+
+
+async def test_import_csv_endpoint(client):
+    response = await client.post(
+        "/prospects/import-csv",
+        files={"file": ("prospects.csv", CSV.encode("utf-8"), "text/csv")}
+    )
+
+    assert response.status_code == 201
+    assert response.json()["inserted"] == 2
+
+
+async def test_import_prospects_skips_existing_and_repeated_names(db):
+    await add_prospect(db, "Acme")
+    rows = [{"company_name": name, "industry": "Software"} for name in ["Acme", "Globex", "Initech", "Globex", "Umbrella"]]
+
+    report = await ImportService(chunk_size=2).import_prospects(db, rows)
+
+    assert report == {"total": 5, "inserted": 3, "skipped": 2}
+    assert await db.scalar(select(func.count(Prospect.id))) == 4
+
+
+async def test_import_endpoint(db, client):
+    await add_prospect(db, "Acme")
+
+    response = await client.post("/prospects/import", json={"prospects": [
+        {"company_name": "Acme", "industry": "Software"},
+        {"company_name": "Globex", "industry": "Banking", "website": "https://globex.example.com"},
+    ]})
+
+    assert response.status_code == 201
+    assert (response.json()["inserted"], response.json()["skipped"]) == (1, 1)
@@ -0,0 +1,36 @@
+import pytest
+from app.services.industry_classifier import DEFAULT_CATEGORY, IndustryClassifier
+
+
+@pytest.mark.parametrize("industry, category", [
+    ("Software Development", "technology"),
+    ("IT Services", "technology"),
+    ("Digital Banking", "technology"),
+    ("Investment Banking", "finance"),
+    ("Health-care & Pharmaceuticals", "healthcare"),
+    ("E-Commerce", "retail"),
+    ("Suitcase Stores", "retail"),
+    ("Caretaking", DEFAULT_CATEGORY),
+    ("", DEFAULT_CATEGORY),
+    (None, DEFAULT_CATEGORY),
+])
+def test_default_taxonomy(industry, category):
+    assert IndustryClassifier().classify(industry) == category
+
+
+def test_first_listed_category_wins():
+    classifier = IndustryClassifier({"first": ["b*"], "second": ["bank"]})
+
+    assert classifier.classify("Bank") == "first"
+
+
+def test_repeated_industries_are_classified_once():
+    classifier = IndustryClassifier()
+
+    assert classifier.classify_many(["Retail", "Retail", "Banking", "Retail"]) == ["retail", "retail", "finance", "retail"]
+    assert classifier.cache_info()["misses"] == 2
+
+
+def test_empty_pattern_is_rejected():
+    with pytest.raises(ValueError):
+        IndustryClassifier({"broken": ["*"]})
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import update
+from app.config import settings
+from app.models.job import Job, JobItem
+from app.services.job_service import JobLostError, JobService
+from tests.utils import add_prospect
+
+
+async def enqueue(db, count: int = 2) -> Job:
+    prospects = [await add_prospect(db, f"Prospect {i}") for i in range(count)]
+    return await JobService().enqueue_batch_send(db, [prospect.id for prospect in prospects], token_budget=500)
+
+
+async def make_stale(db, job_id: int) -> None:
+    stale = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS + 1)
+    await db.execute(update(Job).where(Job.id == job_id).values(heartbeat_at=stale))
+    await db.commit()
+
+
+async def test_enqueue_creates_pending_items(db):
+    job = await enqueue(db)
+
+    assert (job.status, job.total, job.token_budget) == ("pending", 2, 500)
+    assert len(await JobService().pending_prospect_ids(db, job.id)) == 2
+
+
+async def test_enqueue_queues_repeated_ids_once(db):
+    first = await add_prospect(db, "First Prospect")
+    second = await add_prospect(db, "Second Prospect")
+
+    job = await JobService().enqueue_batch_send(db, [second.id, first.id, second.id, first.id])
+
+    assert job.total == 2
+    assert await JobService().pending_prospect_ids(db, job.id) == [second.id, first.id]
+
+
+async def test_claim_takes_oldest_pending_job_once(db):
+    service = JobService()
+    first = await enqueue(db)
+
+    claimed = await service.claim_next(db, "worker-a")
+
+    assert (claimed.id, claimed.status, claimed.worker_id) == (first.id, "running", "worker-a")
+    assert await service.claim_next(db, "worker-b") is None
+
+
+async def test_stale_job_is_reclaimed(db):
+    service = JobService()
+    job = await enqueue(db)
+    await service.claim_next(db, "worker-a")
+    await make_stale(db, job.id)
+
+    reclaimed = await service.claim_next(db, "worker-b")
+
+    assert (reclaimed.id, reclaimed.worker_id) == (job.id, "worker-b")
+
+
+async def test_heartbeat_keeps_a_slow_job_from_being_reclaimed(db):
+    service = JobService()
+    job = await enqueue(db)
+    await service.claim_next(db, "worker-a")
+    await make_stale(db, job.id)
+
+    assert await service.heartbeat(job.id, "worker-a")
+    assert await service.claim_next(db, "worker-b") is None
+
+
+async def test_previous_holder_cannot_checkpoint_or_finish(db):
+    service = JobService()
+    job = await enqueue(db)
+    prospect_id = (await service.pending_prospect_ids(db, job.id))[0]
+    await service.claim_next(db, "worker-a")
+    await make_stale(db, job.id)
+    await service.claim_next(db, "worker-b")
+
+    with pytest.raises(JobLostError):
+        await service.record_result(job.id, "worker-a", {"prospect_id": prospect_id, "status": "sent"})
+    assert not await service.heartbeat(job.id, "worker-a")
+    assert not await service.finish(db, job.id, "worker-a")
+
+    await service.record_result(job.id, "worker-b", {"prospect_id": prospect_id, "status": "failed", "error": "boom"})
+    assert await service.finish(db, job.id, "worker-b")
+
+    db.expunge_all()
+    job = await db.get(Job, job.id)
+    item = await db.get(JobItem, 1)
+    assert (job.status, job.processed, job.failed) == ("completed", 1, 1)
+    assert (item.status, item.error) == ("failed", "boom")
@@ -0,0 +1,52 @@
+from app.services.ai_service import AIService
+from app.services.llm_cache import LLMCache
+
+
+async def test_repeated_prompt_is_served_from_cache():
+    service = AIService()
+    calls = service.provider("email").usage["calls"]
+
+    first = await service.complete("system", "prompt")
+    second = await service.complete("system", "prompt")
+    await service.complete("system", "prompt", bypass_cache=True)
+
+    assert first == second
+    assert service.provider("email").usage["calls"] - calls == 2
+
+
+async def test_key_covers_model_system_and_prompt():
+    keys = {
+        LLMCache.make_key("local:email", "system", "prompt"),
+        LLMCache.make_key("local:advice", "system", "prompt"),
+        LLMCache.make_key("local:email", "other system", "prompt"),
+        LLMCache.make_key("local:email", "system", "other prompt"),
+    }
+
+    assert len(keys) == 4
+
+
+async def test_least_recently_used_entry_is_evicted():
+    cache = LLMCache(max_entries=2, sql_enabled=False)
+    await cache.put("a", "model", "A")
+    await cache.put("b", "model", "B")
+    await cache.get("a")
+    await cache.put("c", "model", "C")
+
+    assert (await cache.get("a"), await cache.get("b"), await cache.get("c")) == ("A", None, "C")
+    assert cache.evictions == 1
+
+
+async def test_expired_entry_is_a_miss():
+    cache = LLMCache(ttl_seconds=-1, sql_enabled=False)
+    await cache.put("a", "model", "A")
+
+    assert await cache.get("a") is None
+    assert cache.misses == 1
+
+
+async def test_sql_tier_is_shared_between_caches():
+    await LLMCache(sql_enabled=True).put("a", "model", "A")
+    other = LLMCache(sql_enabled=True)
+
+    assert await other.get("a") == "A"
+    assert other.sql_hits == 1
@@ -0,0 +1,60 @@
+import json
+import pytest
+from langchain_core.messages import AIMessageChunk
+from app.services.llm_providers import GroqProvider, LocalProvider, get_provider
+
+
+class FakeChatModel:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def astream(self, messages):
+        for chunk in self.chunks:
+            yield chunk
+
+
+async def stream(chunks):
+    provider = GroqProvider("test-model")
+    provider._chat_model = FakeChatModel(chunks)
+    usage = {}
+    text = "".join([delta async for delta in provider.stream("s" * 40, "p" * 40, usage=usage)])
+    return text, usage
+
+
+async def test_groq_stream_records_reported_usage():
+    text, usage = await stream([
+        AIMessageChunk(content="Hello "),
+        AIMessageChunk(
+            content="there",
+            usage_metadata={"input_tokens": 30, "output_tokens": 2, "total_tokens": 32}
+        ),
+    ])
+
+    assert text == "Hello there"
+    assert usage == {"input_tokens": 30, "output_tokens": 2}
+
+
+async def test_groq_stream_estimates_missing_usage():
+    text, usage = await stream([AIMessageChunk(content="x" * 20), AIMessageChunk(content="y" * 20)])
+
+    assert usage == {"input_tokens": 20, "output_tokens": 10}
+
+
+def test_provider_specs():
+    assert get_provider("local:fast") is get_provider("local:fast")
+    assert get_provider("local:fast").model_id == "local:fast"
+    assert get_provider("llama3-8b-8192").model_id == "groq:llama3-8b-8192"
+    with pytest.raises(ValueError):
+        get_provider("nope:model")
+
+
+async def test_local_provider_is_deterministic_and_follows_the_output_format():
+    provider = LocalProvider("test", latency_ms=0)
+    system = 'Output format:\n{"subject": "Subject", "body": "Body"}'
+
+    first = await provider.complete(system, "Acme")
+    streamed = "".join([chunk async for chunk in provider.stream(system, "Acme")])
+
+    assert first == streamed == await provider.complete(system, "Acme")
+    assert set(json.loads(first)) == {"subject", "body"}
+    assert await provider.complete(system, "Globex") != first
@@ -0,0 +1,106 @@
+import asyncio
+import pytest
+from sqlalchemy import delete, select
+from app.config import settings
+from app.models.llm_usage import LLMUsage
+from app.models.prospect import Prospect
+from app.services.ai_service import AIService
+from app.services.email_service import EmailService
+from app.services.llm_usage import CampaignBudget, LLMUsageRecorder, TokenBudgetExceeded, llm_usage
+from app.services.workflow_service import WorkflowService
+from tests.utils import FakeTransport, add_prospect
+
+
+async def test_usage_outlives_its_prospect(db):
+    prospect = await add_prospect(db)
+    recorder = LLMUsageRecorder()
+    recorder.set_prospect(prospect.id)
+    recorder.record("email", "local:email", 100, 20, 5.0)
+    await recorder.flush()
+
+    await db.execute(delete(Prospect).where(Prospect.id == prospect.id))
+    await db.commit()
+
+    # A row for a prospect deleted before the buffer was written still lands
+    recorder.record("advice", "local:advice", 10, 2, 1.0)
+    await recorder.flush()
+
+    rows = (await db.scalars(select(LLMUsage).order_by(LLMUsage.id))).all()
+    assert [(row.task, row.prospect_id) for row in rows] == [("email", prospect.id), ("advice", prospect.id)]
+
+
+@pytest.fixture
+def campaign():
+    budget = CampaignBudget("spring", budget=1)
+    llm_usage.set_campaign(budget)
+    yield budget
+    llm_usage.set_campaign(None)
+
+
+async def test_budget_is_checked_before_calling_the_model(campaign):
+    service = AIService()
+    calls = service.provider("email").usage["calls"]
+
+    await service.complete("system", "first prompt")
+    with pytest.raises(TokenBudgetExceeded):
+        await service.complete("system", "second prompt")
+
+    assert service.provider("email").usage["calls"] - calls == 1
+    assert campaign.exceeded
+
+
+async def test_budget_stops_a_batch_send(db, campaign, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_SEND_WORKERS", 1)
+    prospects = [await add_prospect(db, name) for name in ["Acme", "Globex", "Initech"]]
+    email_service = EmailService()
+    email_service.transport = FakeTransport()
+    results = []
+
+    async def on_result(result):
+        results.append(result)
+
+    with pytest.raises(TokenBudgetExceeded):
+        await WorkflowService(email_service=email_service).send_batch_emails(
+            [prospect.id for prospect in prospects], on_result=on_result
+        )
+
+    assert [result["status"] for result in results] == ["sent"]
+    assert email_service.transport.recipients == ["acme@example.com"]
+
+
+async def test_resumed_campaign_counts_earlier_usage(db):
+    recorder = LLMUsageRecorder()
+    recorder.set_campaign(CampaignBudget("spring", budget=None))
+    recorder.record("email", "local:email", 100, 20, 5.0)
+    recorder.set_campaign(None)
+
+    campaign = await recorder.load_campaign(db, "spring", 150)
+
+    assert (campaign.used, campaign.exceeded) == (120, False)
+
+
+async def test_stats_break_down_calls_tokens_and_cost(db):
+    recorder = LLMUsageRecorder(prices={"groq:big": {"input": 1.0, "output": 2.0}})
+    recorder.set_campaign(CampaignBudget("spring", budget=None))
+    recorder.record("email", "groq:big", 1000, 500, 10.0)
+    recorder.record("email", "groq:big", 0, 0, 0.0, cached=True)
+    recorder.record("advice", "local:advice", 100, 10, 2.0)
+    recorder.set_campaign(None)
+
+    stats = await recorder.stats(db, campaign="spring")
+
+    big = next(row for row in stats["by_model"] if row["model_id"] == "groq:big")
+    assert (big["calls"], big["cached_calls"], big["input_tokens"], big["avg_latency_ms"]) == (2, 1, 1000, 10.0)
+    assert big["cost_usd"] == 0.002
+    assert stats["by_campaign"] == [
+        {"campaign": "spring", "calls": 3, "input_tokens": 1100, "output_tokens": 510, "cost_usd": 0.002}
+    ]
+
+
+async def test_rows_are_written_once_flush_size_is_reached(db):
+    recorder = LLMUsageRecorder(flush_size=2, flush_seconds=60)
+    recorder.record("email", "local:email", 1, 1, 1.0)
+    recorder.record("email", "local:email", 1, 1, 1.0)
+    await asyncio.gather(*recorder._writes)
+
+    assert len((await db.scalars(select(LLMUsage))).all()) == 2
@@ -0,0 +1,26 @@
+from prometheus_client import REGISTRY
+from tests.utils import add_prospect
+
+
+def stage_count(stage: str, route: str, industry: str) -> float:
+    return REGISTRY.get_sample_value(
+        "outreach_stage_seconds_count", {"stage": stage, "route": route, "industry": industry}
+    ) or 0.0
+
+
+async def test_stages_are_labelled_with_the_route_template(db, client):
+    prospect = await add_prospect(db)
+    before = stage_count("llm_generate", "POST /emails/generate", "technology")
+
+    response = await client.post(f"/emails/generate?prospect_id={prospect.id}&bypass_cache=true")
+
+    assert response.status_code == 200
+    assert stage_count("llm_generate", "POST /emails/generate", "technology") == before + 1
+    assert stage_count("prospect_load", "POST /emails/generate", "unknown") >= 1
+
+
+async def test_metrics_endpoint(client):
+    response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "outreach_stage_seconds" in response.text
@@ -0,0 +1,41 @@
+import pytest
+from app.models.prospect import Prospect
+from app.services.ai_service import AIService
+from app.services.prompt_templates import EMAIL_TEMPLATE, PromptTemplate
+
+
+def test_render_fills_dedented_prompt():
+    template = PromptTemplate("test", system="  Be brief.  ", prompt="""
+        Company: {company}
+        Industry: {industry}
+    """)
+
+    system, prompt = template.render(company="Acme", industry="Software", unused="ignored")
+
+    assert system == "Be brief."
+    assert prompt == "Company: Acme\nIndustry: Software"
+    assert template.fields == {"company", "industry"}
+    assert template.stats()["renders"] == 1
+
+
+def test_render_requires_every_field():
+    template = PromptTemplate("test", system="s", prompt="{company} in {industry}")
+
+    with pytest.raises(KeyError, match="industry"):
+        template.render(company="Acme")
+
+
+@pytest.mark.parametrize("prompt", ["{}", "{score:.2f}", "{name!r}"])
+def test_only_plain_named_fields_are_allowed(prompt):
+    with pytest.raises(ValueError):
+        PromptTemplate("test", system="s", prompt=prompt)
+
+
+def test_prospects_share_the_system_prefix():
+    service = AIService()
+    first = service._build_email_prompt(EMAIL_TEMPLATE, Prospect(company_name="Acme", industry="Software"), None)
+    second = service._build_email_prompt(EMAIL_TEMPLATE, Prospect(company_name="Globex", industry="Banking"), None)
+
+    assert first[0] == second[0]
+    assert "Acme" in first[1] and "Globex" in second[1]
+    assert "Acme" not in first[0]
@@ -0,0 +1,71 @@
+from datetime import datetime
+from sqlalchemy import select
+from app.models.engagement import Engagement
+from app.models.engagement_event import EngagementEvent
+from app.models.engagement_summary import EngagementSummary
+from app.models.job import Job, JobItem
+from app.models.prospect import Prospect
+from tests.utils import add_prospect
+
+
+async def test_delete_prospect_with_history(db, client):
+    prospect = await add_prospect(db)
+    engagement = Engagement(prospect_id=prospect.id, type="email", sent_at=datetime.utcnow())
+    job = Job(type="send_batch", status="completed", total=1)
+    db.add_all([engagement, job])
+    await db.flush()
+    db.add_all([
+        EngagementSummary(prospect_id=prospect.id, total_count=1),
+        EngagementEvent(engagement_id=engagement.id, prospect_id=prospect.id, event_type="open"),
+        JobItem(job_id=job.id, prospect_id=prospect.id, status="sent", engagement_id=engagement.id),
+    ])
+    await db.commit()
+    prospect_id = prospect.id
+    db.expunge_all()
+
+    response = await client.delete(f"/prospects/{prospect_id}")
+
+    assert response.status_code == 204
+    assert await db.get(Prospect, prospect_id) is None
+    assert await db.get(EngagementSummary, prospect_id) is None
+    assert (await db.scalars(select(EngagementEvent))).all() == []
+    item = await db.scalar(select(JobItem))
+    assert item.prospect_id is None and item.status == "sent"
+
+    results = await client.get(f"/jobs/{job.id}/results")
+    assert results.status_code == 200
+    assert results.json()["results"][0]["prospect_id"] is None
+
+
+async def test_list_prospects_pages_by_cursor(db, client):
+    for i in range(5):
+        await add_prospect(db, f"Prospect {i}", industry="Software" if i % 2 else "Software 100%")
+    await add_prospect(db, "Other", industry="Retail")
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, "industry": "Software"}
+        if cursor:
+            params["after_id"] = cursor
+        response = await client.get("/prospects/", params=params)
+        seen += [prospect["company_name"] for prospect in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+
+    assert seen == [f"Prospect {i}" for i in range(5)]
+
+
+async def test_list_prospects_industry_match(db, client):
+    await add_prospect(db, "Literal", industry="100% Software")
+    await add_prospect(db, "Wildcard", industry="1000 Software")
+    await add_prospect(db, "Longer", industry="100% Software Inc")
+
+    prefix = await client.get("/prospects/", params={"industry": "100%", "fields": "company_name"})
+    exact = await client.get(
+        "/prospects/", params={"industry": "100% Software", "industry_match": "exact", "include_total": True}
+    )
+
+    assert [prospect["company_name"] for prospect in prefix.json()] == ["Literal", "Longer"]
+    assert [prospect["company_name"] for prospect in exact.json()] == ["Literal"]
+    assert exact.headers["X-Total-Count"] == "1"
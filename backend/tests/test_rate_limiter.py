@@ -0,0 +1,33 @@
+import asyncio
+import time
+from app.config import settings
+from app.services.rate_limiter import TokenBucket, groq_limiter
+
+
+def test_factories_set_rate_and_burst():
+    per_minute = TokenBucket.per_minute(30)
+    per_second = TokenBucket.per_second(10)
+
+    assert (per_minute.rate, per_minute.capacity) == (0.5, 30)
+    assert (per_second.rate, per_second.capacity) == (10.0, 10)
+
+
+async def test_acquire_waits_for_tokens_to_refill():
+    bucket = TokenBucket(rate=50.0, capacity=2)
+    started = time.monotonic()
+
+    await asyncio.gather(*(bucket.acquire() for _ in range(4)))
+
+    # Two tokens were there up front, the other two take 20ms each to refill
+    assert time.monotonic() - started >= 0.035
+
+
+def test_groq_models_get_their_own_limiters(monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_MODEL_REQUESTS_PER_MINUTE", {"limited-model": 6})
+    monkeypatch.setattr(settings, "GROQ_REQUESTS_PER_MINUTE", 30)
+
+    limited = groq_limiter("limited-model")
+
+    assert groq_limiter("limited-model") is limited
+    assert groq_limiter("other-model") is not limited
+    assert (limited.capacity, groq_limiter("other-model").capacity) == (6, 30)
@@ -0,0 +1,56 @@
+import httpx
+import pytest
+from app.config import settings
+from app.services.sendgrid_transport import SendGridError, SendGridTransport
+
+
+def transport_for(outcomes, monkeypatch) -> tuple:
+    """
+    A transport whose requests get the given responses or raise the given errors, in order.
+    """
+    monkeypatch.setattr(settings, "SENDGRID_RETRY_BACKOFF_SECONDS", 0)
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    transport = SendGridTransport(base_url="https://sendgrid.test", max_retries=2)
+    transport._client = httpx.AsyncClient(base_url=transport.base_url, transport=httpx.MockTransport(handler))
+    return transport, requests
+
+
+async def test_connect_errors_and_throttling_are_retried(monkeypatch):
+    transport, requests = transport_for([
+        httpx.ConnectError("connection refused"),
+        httpx.Response(429),
+        httpx.Response(202, headers={"X-Message-Id": "message-1"}),
+    ], monkeypatch)
+
+    assert await transport.send({}) == "message-1"
+    assert len(requests) == 3
+
+
+async def test_read_timeouts_are_not_retried(monkeypatch):
+    # SendGrid may have accepted the mail already, so a retry could deliver it twice
+    transport, requests = transport_for([
+        httpx.ReadTimeout("timed out"),
+        httpx.Response(202, headers={"X-Message-Id": "message-1"}),
+    ], monkeypatch)
+
+    with pytest.raises(SendGridError) as error:
+        await transport.send({})
+    assert error.value.status_code is None
+    assert len(requests) == 1
+
+
+async def test_client_errors_are_not_retried(monkeypatch):
+    transport, requests = transport_for([httpx.Response(400, text="bad request")], monkeypatch)
+
+    with pytest.raises(SendGridError) as error:
+        await transport.send({})
+    assert error.value.status_code == 400
+    assert len(requests) == 1
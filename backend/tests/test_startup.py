@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+from benchmarks.startup_benchmark import SDK_MODULES
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_app_import_defers_provider_sdks():
+    probe = f"import json, sys\nimport app.main\nprint(json.dumps([name for name in {SDK_MODULES!r} if name in sys.modules]))"
+
+    result = subprocess.run(
+        [sys.executable, "-c", probe], cwd=BACKEND_DIR, env=os.environ, check=True, capture_output=True, text=True
+    )
+
+    assert json.loads(result.stdout.splitlines()[-1]) == []
+
+
+async def test_lifespan_leaves_the_schema_to_migrations(monkeypatch):
+    from app.database import Base
+    from app.main import app
+
+    def create_all(*args, **kwargs):
+        raise AssertionError("create_all called on startup")
+
+    monkeypatch.setattr(Base.metadata, "create_all", create_all)
+
+    async with app.router.lifespan_context(app):
+        pass
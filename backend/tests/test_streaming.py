@@ -0,0 +1,44 @@
+import json
+from app.services.streaming import JsonFieldStreamer
+from tests.utils import add_prospect
+
+
+def parse_sse(text):
+    events = []
+    for frame in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_fields_stream_across_chunk_boundaries():
+    reply = json.dumps({"subject": "Hi \"there\"", "other": "skip", "body": "Line\nnext é"})
+    streamer = JsonFieldStreamer(["subject", "body"])
+
+    deltas = [delta for i in range(0, len(reply), 3) for delta in streamer.feed(reply[i:i + 3])]
+
+    assert "".join(text for field, text in deltas if field == "subject") == 'Hi "there"'
+    assert "".join(text for field, text in deltas if field == "body") == "Line\nnext é"
+
+
+async def test_email_stream_ends_with_the_deltas_it_sent(db, client):
+    prospect = await add_prospect(db)
+
+    response = await client.get("/emails/generate/stream", params={"prospect_id": prospect.id})
+
+    events = parse_sse(response.text)
+    event, done = events[-1]
+    streamed = {}
+    for name, data in events[:-1]:
+        streamed[name] = streamed.get(name, "") + data["delta"]
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert event == "done"
+    assert (streamed["subject"], streamed["body"], streamed["advice"]) == (
+        done["email_subject"], done["email_body"], done["engagement_advice"]
+    )
+
+
+async def test_email_stream_of_unknown_prospect_is_not_found(client):
+    response = await client.get("/emails/generate/stream", params={"prospect_id": 404})
+
+    assert response.status_code == 404
@@ -0,0 +1,67 @@
+import pytest
+from app.services.ai_service import AIService
+from app.services.llm_cache import llm_cache
+from app.services.llm_providers import LLMProvider
+from app.services.structured_output import (
+    EmailOutput,
+    StructuredOutputError,
+    StructuredOutputParser
+)
+
+
+class ScriptedProvider(LLMProvider):
+    """
+    Replies with the given responses in turn.
+    """
+    name = "scripted"
+
+    def __init__(self, *responses):
+        super().__init__("test")
+        self.responses = list(responses)
+        self.prompts = []
+
+    async def complete(self, system, prompt, json_mode=False, usage=None):
+        self.prompts.append(prompt)
+        self._record_usage(0, 0, usage)
+        return self.responses.pop(0)
+
+
+def test_parse_finds_the_object_among_prose():
+    content = 'Sure! {not json} ```json\n{"subject": " Hi ", "body": "Text {with braces}"}\n``` Hope it helps {"x": 1}'
+
+    email = StructuredOutputParser().parse(content, EmailOutput)
+
+    assert (email.subject, email.body) == ("Hi", "Text {with braces}")
+
+
+@pytest.mark.parametrize("content, kind", [
+    ("No JSON here", "no_json"),
+    ('{"subject": "Hi", "body": ', "invalid_json"),
+    ('{"subject": "", "body": "Text"}', "schema"),
+])
+def test_parse_errors_say_what_went_wrong(content, kind):
+    with pytest.raises(StructuredOutputError) as error:
+        StructuredOutputParser().parse(content, EmailOutput)
+
+    assert error.value.kind == kind
+
+
+async def test_malformed_reply_is_repaired_once():
+    service = AIService()
+    provider = ScriptedProvider('{"subject": "Hi"}', '{"subject": "Hi", "body": "Fixed"}')
+    service.providers["email"] = provider
+
+    email = await service.complete_structured("system", "prompt", EmailOutput)
+
+    assert email.body == "Fixed"
+    assert "body: Field required" in provider.prompts[1]
+    key = llm_cache.make_key(provider.model_id, "system", "prompt")
+    assert EmailOutput.model_validate_json(await llm_cache.get(key)) == email
+
+
+async def test_reply_still_malformed_after_repair_raises():
+    service = AIService()
+    service.providers["email"] = ScriptedProvider("no json", "still no json")
+
+    with pytest.raises(StructuredOutputError):
+        await service.complete_structured("system", "prompt", EmailOutput)
@@ -0,0 +1,51 @@
+import pytest
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from app import tracing
+from app.tracing import RecentSpanExporter, set_attributes, traced
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = RecentSpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    monkeypatch.setattr(tracing, "tracer", provider.get_tracer("test"))
+    return exporter
+
+
+class Pipeline:
+    @traced()
+    async def run(self, fail: bool = False):
+        set_attributes(**{"prospect.id": 7, "skipped": None})
+        return await self.step(fail)
+
+    @traced("pipeline.step")
+    async def step(self, fail: bool):
+        if fail:
+            raise RuntimeError("boom")
+        return "done"
+
+
+async def test_traced_calls_nest_into_one_trace(exporter):
+    assert await Pipeline().run() == "done"
+
+    [trace] = exporter.traces()
+    run, step = trace["spans"]
+    assert (run["name"], step["name"]) == ("Pipeline.run", "pipeline.step")
+    assert step["parent_id"] == run["span_id"] and run["parent_id"] is None
+    assert run["attributes"] == {"prospect.id": 7}
+
+
+async def test_traced_records_exceptions(exporter):
+    with pytest.raises(RuntimeError):
+        await Pipeline().run(fail=True)
+
+    statuses = [span["status"] for span in exporter.traces()[0]["spans"]]
+    assert statuses == ["ERROR", "ERROR"]
+
+
+def test_setup_is_a_no_op_without_an_exporter():
+    tracing.setup_tracing()
+
+    assert tracing.memory_exporter is None
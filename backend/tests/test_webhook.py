@@ -0,0 +1,41 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from app.models.engagement import Engagement
+from app.models.engagement_event import EngagementEvent
+from tests.utils import add_prospect
+
+
+def event(event_id, event_type="open", **fields):
+    return {"event": event_type, "sg_event_id": event_id, "timestamp": 1700000000, **fields}
+
+
+async def add_engagement(db, message_id="message-1"):
+    prospect = await add_prospect(db)
+    engagement = Engagement(prospect_id=prospect.id, type="email", sent_at=datetime.utcnow(), message_id=message_id)
+    db.add(engagement)
+    await db.commit()
+    return engagement
+
+
+async def test_redelivered_events_are_recorded_once(db, client):
+    engagement = await add_engagement(db)
+    batch = [
+        event("a", sg_message_id="message-1.filter0001"),
+        event("a", sg_message_id="message-1.filter0001"),
+        event("b", "click", engagement_id=str(engagement.id)),
+        event("c", "delivered", sg_message_id="message-1.filter0001"),
+        event("d", sg_message_id="unknown.filter0001"),
+    ]
+
+    first = (await client.post("/emails/webhook/sendgrid", json=batch)).json()
+    second = (await client.post("/emails/webhook/sendgrid", json=batch)).json()
+
+    assert first == {"received": 5, "recorded": 2, "duplicates": 1, "ignored": 1, "unmatched": 1}
+    assert second == {"received": 5, "recorded": 0, "duplicates": 4, "ignored": 1, "unmatched": 0}
+    assert await db.scalar(select(func.count(EngagementEvent.id))) == 2
+
+
+async def test_webhook_rejects_a_body_that_is_not_a_list(client):
+    response = await client.post("/emails/webhook/sendgrid", json={"event": "open"})
+
+    assert response.status_code == 400
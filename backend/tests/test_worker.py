@@ -0,0 +1,104 @@
+import asyncio
+import pytest
+from app.config import settings
+from app.models.engagement import Engagement
+from app.models.job import Job
+from app.services.job_service import JobService
+from app.worker import JobWorker
+from tests.test_engagement_event_service import add_engagement
+from tests.utils import add_prospect
+
+
+class StopWorker(BaseException):
+    pass
+
+
+async def test_worker_survives_queue_errors(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_POLL_INTERVAL_SECONDS", 0)
+    outcomes = [ConnectionError("database unavailable"), None, StopWorker()]
+    calls = []
+
+    async def claim():
+        calls.append(1)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    worker = JobWorker()
+    monkeypatch.setattr(worker, "claim", claim)
+
+    with pytest.raises(StopWorker):
+        await worker.run()
+    assert len(calls) == 3
+
+
+async def test_run_job_sends_and_finishes(db, monkeypatch):
+    prospect = await add_prospect(db)
+    job = await JobService().enqueue_batch_send(db, [prospect.id])
+    worker = JobWorker()
+    sent = []
+
+    async def send_batch_emails(prospect_ids, on_result):
+        for prospect_id in prospect_ids:
+            sent.append(prospect_id)
+            await on_result({"prospect_id": prospect_id, "status": "sent"})
+
+    monkeypatch.setattr(worker.workflow_service, "send_batch_emails", send_batch_emails)
+    assert await worker.claim() == job.id
+
+    await worker.run_job(job.id)
+
+    db.expunge_all()
+    job = await db.get(Job, job.id)
+    assert sent == [prospect.id]
+    assert (job.status, job.processed) == ("completed", 1)
+
+
+async def test_run_job_stops_when_reclaimed(db, monkeypatch):
+    prospect = await add_prospect(db)
+    job = await JobService().enqueue_batch_send(db, [prospect.id])
+    worker = JobWorker()
+
+    async def send_batch_emails(prospect_ids, on_result):
+        # Another worker takes the job over mid-batch
+        await db.execute(Job.__table__.update().values(worker_id="someone-else"))
+        await db.commit()
+        await on_result({"prospect_id": prospect_ids[0], "status": "sent"})
+
+    monkeypatch.setattr(worker.workflow_service, "send_batch_emails", send_batch_emails)
+    await worker.claim()
+
+    await worker.run_job(job.id)
+
+    db.expunge_all()
+    job = await db.get(Job, job.id)
+    assert (job.status, job.worker_id, job.processed) == ("running", "someone-else", 0)
+
+
+async def test_events_roll_up_while_a_job_runs(db, monkeypatch):
+    monkeypatch.setattr(settings, "ENGAGEMENT_ROLLUP_INTERVAL_SECONDS", 0.01)
+    engagement = await add_engagement(db)
+    prospect = await add_prospect(db, "Second Prospect")
+    job = await JobService().enqueue_batch_send(db, [prospect.id])
+    worker = JobWorker()
+
+    async def send_batch_emails(prospect_ids, on_result):
+        # The job is still running when a tracked click comes in
+        await worker.event_service.record(db, engagement, "click")
+        await db.commit()
+        for _ in range(100):
+            db.expunge_all()
+            if (await db.get(Engagement, engagement.id)).clicked:
+                break
+            await asyncio.sleep(0.01)
+        raise StopWorker()
+
+    monkeypatch.setattr(worker.workflow_service, "send_batch_emails", send_batch_emails)
+
+    with pytest.raises(StopWorker):
+        await worker.run()
+
+    db.expunge_all()
+    assert (await db.get(Job, job.id)).status == "running"
+    assert (await db.get(Engagement, engagement.id)).engagement_score == 2.0
@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+from sqlalchemy import func, select
+from app.config import settings
+from app.models.engagement import Engagement
+from app.models.job import Job
+from app.routers.emails import MAX_REPORTED_MISSING_IDS
+from app.services.email_service import EmailService
+from app.services.workflow_service import WorkflowService, _chunks
+from tests.utils import FakeTransport, add_prospect
+
+
+@pytest.fixture
+def transport():
+    return FakeTransport()
+
+
+@pytest.fixture
+def service(transport):
+    email_service = EmailService()
+    email_service.transport = transport
+    return WorkflowService(email_service=email_service)
+
+
+async def test_duplicate_prospects_are_sent_once(db, service, transport):
+    prospect = await add_prospect(db)
+
+    results = await service.send_batch_emails([prospect.id, prospect.id, prospect.id])
+
+    assert [result["status"] for result in results] == ["sent"]
+    assert transport.recipients == ["acme@example.com"]
+    assert await db.scalar(select(func.count(Engagement.id))) == 1
+
+
+async def test_failing_callback_stops_other_workers(db, service, transport, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_SEND_WORKERS", 2)
+    prospects = [await add_prospect(db, f"Prospect {i}") for i in range(4)]
+
+    failures = [RuntimeError("progress store unavailable")]
+
+    async def on_result(result):
+        if failures:
+            raise failures.pop()
+
+    with pytest.raises(RuntimeError):
+        await service.send_batch_emails([prospect.id for prospect in prospects], on_result=on_result)
+
+    # Give a worker left running time to send another batch
+    await asyncio.sleep(settings.SENDGRID_BATCH_LINGER_SECONDS * 2)
+    assert len(transport.recipients) == 2
+
+
+async def test_check_prospects_splits_found_and_missing(db, service):
+    prospects = [await add_prospect(db, name) for name in ["Acme", "Globex"]]
+    ids = [prospect.id for prospect in prospects]
+
+    found, missing = await service.check_prospects(db, ids + [404, 405, 404])
+
+    assert (found, missing) == (set(ids), {404, 405})
+    assert list(_chunks(list(range(5)), size=2)) == [[0, 1], [2, 3], [4]]
+
+
+async def test_send_batch_reports_missing_prospects(db, client):
+    prospect = await add_prospect(db)
+    missing = list(range(1000, 1000 + MAX_REPORTED_MISSING_IDS + 2))
+
+    rejected = await client.post("/emails/send-batch", json={"prospect_ids": [prospect.id] + missing})
+    queued = await client.post("/emails/send-batch", json={"prospect_ids": [prospect.id]})
+
+    assert rejected.status_code == 404
+    assert rejected.json()["detail"].endswith(f"{missing[MAX_REPORTED_MISSING_IDS - 1]} and 2 more not found")
+    assert queued.json()[0]["status"] == "processing"
+    assert await db.get(Job, queued.json()[0]["job_id"]) is not None
+
+
+async def test_send_batch_runs_a_bounded_pool_of_workers(db, service, monkeypatch):
+    monkeypatch.setattr(settings, "BATCH_SEND_WORKERS", 3)
+    prospects = [await add_prospect(db, f"Prospect {i}") for i in range(8)]
+    running = peak = 0
+
+    async def send_one(prospect_id, snapshot, batcher):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return {"prospect_id": prospect_id, "status": "sent"}
+
+    monkeypatch.setattr(service, "_send_one", send_one)
+
+    results = await service.send_batch_emails([prospect.id for prospect in prospects])
+
+    assert peak == 3
+    assert sorted(result["prospect_id"] for result in results) == sorted(prospect.id for prospect in prospects)
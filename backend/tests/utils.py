@@ -0,0 +1,27 @@
+from app.models.prospect import Prospect
+
+
+async def add_prospect(db, name: str = "Acme", industry: str = "Software", **fields) -> Prospect:
+    prospect = Prospect(company_name=name, industry=industry, email=f"{name.lower().replace(' ', '-')}@example.com", **fields)
+    db.add(prospect)
+    await db.commit()
+    return prospect
+
+
+class FakeTransport:
+    """
+    Stands in for SendGridTransport, recording each payload it's asked to send.
+    """
+    def __init__(self):
+        self.payloads = []
+
+    @property
+    def recipients(self):
+        return [
+            personalization["to"][0]["email"]
+            for payload in self.payloads for personalization in payload["personalizations"]
+        ]
+
+    async def send(self, payload):
+        self.payloads.append(payload)
+        return f"message-{len(self.payloads)}"
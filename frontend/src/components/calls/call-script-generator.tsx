@@ -1,6 +1,7 @@
-import { useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useProspects } from '../../hooks/use-prospects';
 import { useCalls } from '../../hooks/use-calls';
+import { callsApi } from '../../services/api';
 import { CallScriptGenerateResponse } from '../../types';
 import Button from '../ui/button';
 import { Card, CardHeader, CardTitle, CardContent, CardFooter } from '../ui/card';
@@ -8,27 +9,49 @@ import Select from '../ui/select';
 
 export default function CallScriptGenerator() {
   const { prospects, loading: loadingProspects } = useProspects();
-  const { generateCallScript, makeCall, loading: loadingCall } = useCalls();
+  const { makeCall } = useCalls();
   
   const [selectedProspectId, setSelectedProspectId] = useState<number | ''>('');
   const [generatedScript, setGeneratedScript] = useState<CallScriptGenerateResponse | null>(null);
+  // Script text as it streams in, before the final response arrives
+  const [streamedScript, setStreamedScript] = useState<string | null>(null);
   const [isCalling, setIsCalling] = useState(false);
   const [callStatus, setCallStatus] = useState<'success' | 'error' | null>(null);
+  const closeStream = useRef<(() => void) | null>(null);
 
-  const handleGenerateScript = async () => {
+  const stopStreaming = () => {
+    closeStream.current?.();
+    closeStream.current = null;
+    setStreamedScript(null);
+  };
+
+  // Don't leave the stream open after navigating away
+  useEffect(() => () => closeStream.current?.(), []);
+
+  const handleGenerateScript = () => {
     if (!selectedProspectId) {
       alert('Please select a prospect first');
       return;
     }
 
-    try {
-      const data = await generateCallScript(Number(selectedProspectId));
-      setGeneratedScript(data);
-      setCallStatus(null);
-    } catch (error) {
-      console.error('Error generating call script:', error);
-      alert('Failed to generate call script. Please try again.');
-    }
+    stopStreaming();
+    setGeneratedScript(null);
+    setCallStatus(null);
+    setStreamedScript('');
+
+    closeStream.current = callsApi.streamScript(
+      Number(selectedProspectId),
+      (_field, delta) => setStreamedScript((script) => script !== null ? script + delta : script),
+      (data) => {
+        stopStreaming();
+        setGeneratedScript(data);
+      },
+      (detail) => {
+        stopStreaming();
+        console.error('Error generating call script:', detail);
+        alert('Failed to generate call script. Please try again.');
+      },
+    );
   };
 
   const handleMakeCall = async () => {
@@ -47,11 +70,15 @@ export default function CallScriptGenerator() {
   };
 
   const handleProspectChange = (e: React.ChangeEvent<HTMLSelectElement>) => {
+    stopStreaming();
     setSelectedProspectId(e.target.value ? Number(e.target.value) : '');
     setGeneratedScript(null);
     setCallStatus(null);
   };
 
+  const isStreaming = streamedScript !== null;
+  const selectedProspect = prospects.find((prospect) => prospect.id === selectedProspectId);
+
   return (
     <div className="space-y-6">
       <Card>
@@ -86,8 +113,8 @@ export default function CallScriptGenerator() {
               <div className="flex justify-end">
                 <Button 
                   onClick={handleGenerateScript}
-                  isLoading={loadingCall}
-                  disabled={!selectedProspectId || loadingCall}
+                  isLoading={isStreaming}
+                  disabled={!selectedProspectId || isStreaming}
                 >
                   Generate Call Script
                 </Button>
@@ -97,18 +124,18 @@ export default function CallScriptGenerator() {
         </CardContent>
       </Card>
 
-      {generatedScript && (
+      {(generatedScript || isStreaming) && (
         <Card variant="elevated">
           <CardHeader className="bg-gray-50 border-b border-gray-200">
-            <CardTitle>{generatedScript.script_title}</CardTitle>
+            <CardTitle>{generatedScript?.script_title ?? 'Generating Call Script...'}</CardTitle>
             <p className="text-sm text-gray-500 mt-1">
-              Personalized for {generatedScript.company_name} ({generatedScript.industry})
+              Personalized for {generatedScript?.company_name ?? selectedProspect?.company_name} ({generatedScript?.industry ?? selectedProspect?.industry})
             </p>
           </CardHeader>
           
           <CardContent className="mt-4">
             <div className="whitespace-pre-wrap bg-gray-50 p-4 rounded-md border border-gray-200">
-              {generatedScript.script_content}
+              {generatedScript?.script_content ?? streamedScript}
             </div>
           </CardContent>
           
@@ -116,7 +143,7 @@ export default function CallScriptGenerator() {
             <Button
               onClick={handleMakeCall}
               isLoading={isCalling}
-              disabled={isCalling}
+              disabled={isCalling || isStreaming}
             >
               Make Call Now
             </Button>
@@ -1,34 +1,61 @@
-import { useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import { useProspects } from '../../hooks/use-prospects';
 import { useEmails } from '../../hooks/use-emails';
+import { emailsApi } from '../../services/api';
 import { EmailGenerateResponse } from '../../types';
 import Button from '../ui/button';
 import { Card, CardHeader, CardTitle, CardContent, CardFooter } from '../ui/card';
 import Select from '../ui/select';
 
+// Fields of the email as they stream in, before the final response arrives
+type StreamedEmail = Record<'subject' | 'body' | 'advice', string>;
+
 export default function EmailGenerator() {
   const { prospects, loading: loadingProspects } = useProspects();
-  const { generateEmail, sendEmail, loading: loadingEmail } = useEmails();
+  const { sendEmail } = useEmails();
   
   const [selectedProspectId, setSelectedProspectId] = useState<number | ''>('');
   const [generatedContent, setGeneratedContent] = useState<EmailGenerateResponse | null>(null);
+  const [streamedContent, setStreamedContent] = useState<StreamedEmail | null>(null);
   const [isSending, setIsSending] = useState(false);
   const [sentStatus, setSentStatus] = useState<'success' | 'error' | null>(null);
+  const closeStream = useRef<(() => void) | null>(null);
+
+  const stopStreaming = () => {
+    closeStream.current?.();
+    closeStream.current = null;
+    setStreamedContent(null);
+  };
 
-  const handleGenerateEmail = async () => {
+  // Don't leave the stream open after navigating away
+  useEffect(() => () => closeStream.current?.(), []);
+
+  const handleGenerateEmail = () => {
     if (!selectedProspectId) {
       alert('Please select a prospect first');
       return;
     }
 
-    try {
-      const data = await generateEmail(Number(selectedProspectId));
-      setGeneratedContent(data);
-      setSentStatus(null);
-    } catch (error) {
-      console.error('Error generating email:', error);
-      alert('Failed to generate email. Please try again.');
-    }
+    stopStreaming();
+    setGeneratedContent(null);
+    setSentStatus(null);
+    setStreamedContent({ subject: '', body: '', advice: '' });
+
+    closeStream.current = emailsApi.streamGenerate(
+      Number(selectedProspectId),
+      (field, delta) => {
+        setStreamedContent((content) => content && { ...content, [field]: content[field as keyof StreamedEmail] + delta });
+      },
+      (data) => {
+        stopStreaming();
+        setGeneratedContent(data);
+      },
+      (detail) => {
+        stopStreaming();
+        console.error('Error generating email:', detail);
+        alert('Failed to generate email. Please try again.');
+      },
+    );
   };
 
   const handleSendEmail = async () => {
@@ -47,11 +74,22 @@ export default function EmailGenerator() {
   };
 
   const handleProspectChange = (e: React.ChangeEvent<HTMLSelectElement>) => {
+    stopStreaming();
     setSelectedProspectId(e.target.value ? Number(e.target.value) : '');
     setGeneratedContent(null);
     setSentStatus(null);
   };
 
+  const isStreaming = streamedContent !== null;
+  const selectedProspect = prospects.find((prospect) => prospect.id === selectedProspectId);
+  const displayedContent: StreamedEmail | null = generatedContent
+    ? {
+        subject: generatedContent.email_subject,
+        body: generatedContent.email_body,
+        advice: generatedContent.engagement_advice,
+      }
+    : streamedContent;
+
   return (
     <div className="space-y-6">
       <Card>
@@ -85,8 +123,8 @@ export default function EmailGenerator() {
               <div className="flex justify-end">
                 <Button 
                   onClick={handleGenerateEmail}
-                  isLoading={loadingEmail}
-                  disabled={!selectedProspectId || loadingEmail}
+                  isLoading={isStreaming}
+                  disabled={!selectedProspectId || isStreaming}
                 >
                   Generate Personalized Email
                 </Button>
@@ -96,12 +134,12 @@ export default function EmailGenerator() {
         </CardContent>
       </Card>
 
-      {generatedContent && (
+      {displayedContent && (
         <Card variant="elevated">
           <CardHeader className="bg-gray-50 border-b border-gray-200">
-            <CardTitle>Generated Email Content</CardTitle>
+            <CardTitle>{isStreaming ? 'Generating Email Content...' : 'Generated Email Content'}</CardTitle>
             <p className="text-sm text-gray-500 mt-1">
-              Personalized for {generatedContent.company_name} ({generatedContent.industry})
+              Personalized for {generatedContent?.company_name ?? selectedProspect?.company_name} ({generatedContent?.industry ?? selectedProspect?.industry})
             </p>
           </CardHeader>
           
@@ -110,21 +148,21 @@ export default function EmailGenerator() {
               <div>
                 <h4 className="text-sm font-medium text-gray-700">Subject Line</h4>
                 <div className="mt-1 p-3 bg-gray-50 rounded-md border border-gray-200">
-                  {generatedContent.email_subject}
+                  {displayedContent.subject}
                 </div>
               </div>
               
               <div>
                 <h4 className="text-sm font-medium text-gray-700">Email Body</h4>
                 <div className="mt-1 p-3 bg-gray-50 rounded-md border border-gray-200 whitespace-pre-wrap">
-                  {generatedContent.email_body}
+                  {displayedContent.body}
                 </div>
               </div>
               
               <div>
                 <h4 className="text-sm font-medium text-gray-700">Engagement Advice</h4>
                 <div className="mt-1 p-3 bg-blue-50 text-blue-800 rounded-md border border-blue-200 whitespace-pre-wrap">
-                  {generatedContent.engagement_advice}
+                  {displayedContent.advice}
                 </div>
               </div>
             </div>
@@ -134,7 +172,7 @@ export default function EmailGenerator() {
             <Button
               onClick={handleSendEmail}
               isLoading={isSending}
-              disabled={isSending}
+              disabled={isSending || isStreaming}
             >
               Send Email Now
             </Button>
@@ -31,10 +31,10 @@ export default function ImportProspects() {
 
     setIsLoading(true);
     try {
-      const importedProspects = await importCsv(csvFile);
+      const importResult = await importCsv(csvFile);
       setResult({
-        success: importedProspects.length,
-        failed: 0 // We would calculate this in a real app
+        success: importResult.inserted,
+        failed: importResult.skipped + (importResult.invalid ?? 0)
       });
       if (fileInputRef.current) {
         fileInputRef.current.value = '';
@@ -82,10 +82,10 @@ export default function ImportProspects() {
       }
 
       if (prospects.length > 0) {
-        const importedProspects = await importProspects(prospects);
+        const importResult = await importProspects(prospects);
         setResult({
-          success: importedProspects.length,
-          failed
+          success: importResult.inserted,
+          failed: failed + importResult.skipped
         });
         setManualData('');
       } else {
@@ -228,7 +228,7 @@ export default function ImportProspects() {
               Successfully imported: <strong>{result.success}</strong> prospects
               {result.failed > 0 && (
                 <span className="ml-2">
-                  (Failed: <strong>{result.failed}</strong>)
+                  (Skipped: <strong>{result.failed}</strong>)
                 </span>
               )}
             </p>
@@ -63,9 +63,9 @@ export const useProspects = (initialSkip = 0, initialLimit = 100, initialIndustr
 
   const importProspects = async (prospectsToImport: ProspectCreate[]) => {
     try {
-      const importedProspects = await prospectsApi.importProspects(prospectsToImport);
-      setProspects(prevProspects => [...prevProspects, ...importedProspects]);
-      return importedProspects;
+      const importResult = await prospectsApi.importProspects(prospectsToImport);
+      await fetchProspects();
+      return importResult;
     } catch (err) {
       setError(err instanceof Error ? err : new Error('Failed to import prospects'));
       throw err;
@@ -74,9 +74,9 @@ export const useProspects = (initialSkip = 0, initialLimit = 100, initialIndustr
 
   const importCsv = async (file: File) => {
     try {
-      const importedProspects = await prospectsApi.importCsv(file);
-      setProspects(prevProspects => [...prevProspects, ...importedProspects]);
-      return importedProspects;
+      const importResult = await prospectsApi.importCsv(file);
+      await fetchProspects();
+      return importResult;
     } catch (err) {
       setError(err instanceof Error ? err : new Error('Failed to import CSV'));
       throw err;
@@ -2,6 +2,7 @@ import axios from 'axios';
 import { 
   Prospect, 
   ProspectCreate, 
+  ProspectImportResult,
   EmailGenerateResponse, 
   EmailSendResponse,
   CallScriptGenerateResponse,
@@ -17,6 +18,37 @@ const api = axios.create({
   },
 });
 
+// Server-Sent Events stream; calls onDelta for each text delta and onDone with the final payload.
+// Returns a function that closes the stream.
+const streamGeneration = <T>(
+  path: string,
+  params: Record<string, string | number | boolean>,
+  onDelta: (field: string, delta: string) => void,
+  onDone: (result: T) => void,
+  onError: (detail: string) => void,
+  fields: string[],
+): (() => void) => {
+  const query = new URLSearchParams(Object.entries(params).map(([key, value]) => [key, String(value)]));
+  const source = new EventSource(`${env.API_URL}${path}?${query}`);
+
+  fields.forEach((field) => {
+    source.addEventListener(field, (event) => {
+      onDelta(field, JSON.parse((event as MessageEvent).data).delta);
+    });
+  });
+  source.addEventListener('done', (event) => {
+    onDone(JSON.parse((event as MessageEvent).data));
+    source.close();
+  });
+  source.addEventListener('error', (event) => {
+    const data = (event as MessageEvent).data;
+    onError(data ? JSON.parse(data).detail : 'Stream connection failed');
+    source.close();
+  });
+
+  return () => source.close();
+};
+
 // Prospects API
 export const prospectsApi = {
   getAll: async (skip = 0, limit = 100, industry?: string): Promise<Prospect[]> => {
@@ -25,6 +57,29 @@ export const prospectsApi = {
     return response.data;
   },
   
+  // Keyset pagination: pass the returned nextCursor as afterId to get the next page
+  getPage: async (
+    afterId?: number,
+    limit = 100,
+    industry?: string,
+    includeTotal = false,
+  ): Promise<{ prospects: Prospect[]; nextCursor: number | null; total: number | null }> => {
+    const params = {
+      limit,
+      include_total: includeTotal,
+      ...(afterId !== undefined && { after_id: afterId }),
+      ...(industry && { industry }),
+    };
+    const response = await api.get('/prospects', { params });
+    const nextCursor = response.headers['x-next-cursor'];
+    const total = response.headers['x-total-count'];
+    return {
+      prospects: response.data,
+      nextCursor: nextCursor ? Number(nextCursor) : null,
+      total: total ? Number(total) : null,
+    };
+  },
+  
   getById: async (id: number): Promise<Prospect> => {
     const response = await api.get(`/prospects/${id}`);
     return response.data;
@@ -44,12 +99,12 @@ export const prospectsApi = {
     await api.delete(`/prospects/${id}`);
   },
   
-  importProspects: async (prospects: ProspectCreate[]): Promise<Prospect[]> => {
+  importProspects: async (prospects: ProspectCreate[]): Promise<ProspectImportResult> => {
     const response = await api.post('/prospects/import', { prospects });
     return response.data;
   },
   
-  importCsv: async (file: File): Promise<Prospect[]> => {
+  importCsv: async (file: File): Promise<ProspectImportResult> => {
     const formData = new FormData();
     formData.append('file', file);
     
@@ -70,11 +125,27 @@ export const prospectsApi = {
 
 // Emails API
 export const emailsApi = {
-  generate: async (prospectId: number): Promise<EmailGenerateResponse> => {
-    const response = await api.post('/emails/generate', null, { params: { prospect_id: prospectId } });
+  generate: async (prospectId: number, bypassCache = false): Promise<EmailGenerateResponse> => {
+    const response = await api.post('/emails/generate', null, { params: { prospect_id: prospectId, bypass_cache: bypassCache } });
     return response.data;
   },
   
+  streamGenerate: (
+    prospectId: number,
+    onDelta: (field: string, delta: string) => void,
+    onDone: (result: EmailGenerateResponse) => void,
+    onError: (detail: string) => void,
+    bypassCache = false,
+  ): (() => void) =>
+    streamGeneration<EmailGenerateResponse>(
+      '/emails/generate/stream',
+      { prospect_id: prospectId, bypass_cache: bypassCache },
+      onDelta,
+      onDone,
+      onError,
+      ['subject', 'body', 'advice'],
+    ),
+  
   send: async (prospectId: number): Promise<EmailSendResponse> => {
     const response = await api.post('/emails/send', null, { params: { prospect_id: prospectId } });
     return response.data;
@@ -98,11 +169,27 @@ export const emailsApi = {
 
 // Calls API (Bonus Feature)
 export const callsApi = {
-  generateScript: async (prospectId: number): Promise<CallScriptGenerateResponse> => {
-    const response = await api.post('/calls/generate-script', null, { params: { prospect_id: prospectId } });
+  generateScript: async (prospectId: number, bypassCache = false): Promise<CallScriptGenerateResponse> => {
+    const response = await api.post('/calls/generate-script', null, { params: { prospect_id: prospectId, bypass_cache: bypassCache } });
     return response.data;
   },
   
+  streamScript: (
+    prospectId: number,
+    onDelta: (field: string, delta: string) => void,
+    onDone: (result: CallScriptGenerateResponse) => void,
+    onError: (detail: string) => void,
+    bypassCache = false,
+  ): (() => void) =>
+    streamGeneration<CallScriptGenerateResponse>(
+      '/calls/generate-script/stream',
+      { prospect_id: prospectId, bypass_cache: bypassCache },
+      onDelta,
+      onDone,
+      onError,
+      ['script'],
+    ),
+  
   makeCall: async (prospectId: number): Promise<CallMakeResponse> => {
     const response = await api.post('/calls/make-call', null, { params: { prospect_id: prospectId } });
     return response.data;
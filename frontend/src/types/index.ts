@@ -23,6 +23,19 @@ export interface Prospect {
     prospects: ProspectCreate[];
   }
   
+  export interface ProspectImportError {
+    row: number;
+    error: string;
+  }
+  
+  export interface ProspectImportResult {
+    total: number;
+    inserted: number;
+    skipped: number;
+    invalid?: number;
+    errors?: ProspectImportError[];
+  }
+  
   export interface Engagement {
     id: number;
     prospect_id: number;